@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 import shutil
+import uuid
 from datetime import datetime
 import numpy as np
 
@@ -10,31 +11,70 @@ import numpy as np
 try:
     from exam_functions import (
         grade_exam, 
-        analyze_weakness_from_graded_file,
+        analyze_weakness,                 # 채점 결과(메모리) -> 취약점 갱신
         generate_exam_7_passages_from_db, # 시험지 생성(랜덤)
-        generate_exam_irt_weakness        # 시험지 생성(IRT)
+        generate_exam_irt_weakness,       # 시험지 생성(IRT)
+        save_adaptive_exam,               # 적응형 시험 저장/채점
+        _load_weakness_sets,
+        DEFAULT_DOCX_ENGINE               # Windows: MS Word / 그 외: 내장 조립기
     )
-    from run_CREATE_DASHBOARD import create_dashboard
+    from theta_estimation import latest_theta, get_theta_scorer
+    from item_bank import get_item_bank
+    from weakness_store import weakness_store_path, export_weakness_xlsx
+    from cat_engine import CatSession, get_cat_pool, CAT_MAX_ITEMS, CAT_SE_TARGET
+    from docx_assembler import fragment_text
+    from file_locks import session_workspace
+    from job_queue import JobQueue, FINISHED_STATUSES
+    from run_CREATE_DASHBOARD import create_dashboard, create_dashboard_from_sheets
 except ImportError:
     st.error("오류: `exam_functions.py` 또는 `run_CREATE_DASHBOARD.py` 파일을 찾을 수 없습니다. `app.py`와 동일한 폴더에 있는지 확인하세요.")
     st.stop()
 
 # --- 상수 및 디렉토리 설정 ---
-TEMP_DIR = "./temp"
+TEMP_DIR = "./temp"              # 세션마다 이 아래에 따로 임시 폴더(session_xxx)를 만듭니다.
+STUDENT_CACHE_TTL = 300          # 학생별 조회(최근 능력치, 취약점) 캐시 유지 시간(초)
 # OUTPUT_DIR은 사이드바에서 설정한 값을 사용합니다.
 os.makedirs(TEMP_DIR, exist_ok=True)
 os.makedirs("./answers", exist_ok=True) # 답안 예시 폴더
 
 # --- 헬퍼 함수 ---
-def save_uploaded_file(uploaded_file, directory=TEMP_DIR):
-    """업로드된 파일을 임시 디렉토리에 저장하고 경로를 반환합니다."""
+def session_temp_dir():
+    """이 브라우저 세션 전용 임시 폴더. 여러 교사가 같은 이름의 파일을 올려도 서로 덮어쓰지 않습니다."""
+    path = st.session_state.get("temp_dir")
+    if not path or not os.path.isdir(path):
+        path = session_workspace(TEMP_DIR)
+        st.session_state["temp_dir"] = path
+    return path
+
+def save_uploaded_file(uploaded_file, directory=None):
+    """업로드된 파일을 세션 임시 디렉토리에 저장하고 경로를 반환합니다."""
     if uploaded_file is not None:
-        path = os.path.join(directory, uploaded_file.name)
+        path = os.path.join(directory or session_temp_dir(), os.path.basename(uploaded_file.name))
         with open(path, "wb") as f:
             f.write(uploaded_file.getbuffer())
         return path
     return None
 
+def session_owner():
+    """작업 큐에서 이 세션이 넣은 작업을 구분하는 ID"""
+    if "job_owner" not in st.session_state:
+        st.session_state["job_owner"] = uuid.uuid4().hex
+    return st.session_state["job_owner"]
+
+def save_job_upload(uploaded_file):
+    """워커(다른 PC 포함)가 읽을 수 있도록 업로드 파일을 출력 폴더 아래 작업 폴더에 저장합니다."""
+    directory = os.path.join(OUTPUT_DIR, "jobs", "uploads", uuid.uuid4().hex)
+    os.makedirs(directory, exist_ok=True)
+    return save_uploaded_file(uploaded_file, directory)
+
+def submit_job(kind, params):
+    """작업 큐에 작업을 넣고 안내한 뒤 이번 실행을 끝냅니다. (결과는 '작업 현황' 메뉴에서 확인)"""
+    with JobQueue(JOB_QUEUE_PATH) as queue:
+        job_id = queue.submit(kind, params, owner=session_owner())
+    st.success(f"작업 #{job_id} 을(를) 등록했습니다. '작업 현황' 메뉴에서 진행 상황과 결과 파일을 확인하세요.")
+    st.info("작업은 `run_WORKER.py` 워커가 처리합니다. 워커가 실행 중인지 확인하세요.")
+    st.stop()
+
 def read_file_for_download(file_path):
     """다운로드 버튼을 위해 파일을 읽습니다."""
     try:
@@ -44,6 +84,46 @@ def read_file_for_download(file_path):
         st.error(f"파일을 찾을 수 없습니다: {file_path}")
         return None
 
+# --- 캐시 ---
+# 문항 DB / 인덱스 / IRT 채점기는 프로세스 전체(모든 세션)가 공유하고, 파일이 바뀌면(stamp) 새로 만듭니다.
+# 학생별 조회는 STUDENT_CACHE_TTL 동안 재사용하되, 출력 폴더나 저장소 파일이 바뀌면 바로 다시 읽습니다.
+def _file_stamp(*paths):
+    """파일(폴더)들의 (수정 시각, 크기). 없는 파일은 None"""
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+@st.cache_resource(max_entries=2, show_spinner="문항 DB 불러오는 중...")
+def _load_bank_resources(db_path, stamp):
+    return get_item_bank(db_path), get_theta_scorer(db_path)
+
+def bank_resources(db_path):
+    """(ItemBank, ThetaScorer). 라이브러리 함수들도 같은 객체를 쓰므로 버튼을 눌러도 DB를 다시 파싱하지 않습니다."""
+    return _load_bank_resources(os.path.abspath(db_path), _file_stamp(db_path))
+
+@st.cache_data(ttl=STUDENT_CACHE_TTL, max_entries=1000, show_spinner=False)
+def _cached_latest_theta(graded_dir, student_id, db_path, stamp):
+    return latest_theta(graded_dir, student_id, db_path=db_path)
+
+def cached_latest_theta(graded_dir, student_id, db_path=None):
+    """학생의 최근 (theta, theta_se). 폴더에 파일이 추가/교체되면 폴더 수정 시각이 바뀌어 다시 계산합니다."""
+    stamp = _file_stamp(graded_dir, db_path) if db_path else _file_stamp(graded_dir)
+    return _cached_latest_theta(graded_dir, str(student_id), db_path, stamp)
+
+@st.cache_data(ttl=STUDENT_CACHE_TTL, max_entries=1000, show_spinner=False)
+def _cached_weak_sets(store_path, student_id, stamp):
+    return _load_weakness_sets(store_path, student_id)
+
+def cached_weak_sets(store_path, student_id):
+    """학생의 (취약 지문유형, 취약 문제유형) 집합. 저장소(WAL 포함)가 바뀌면 다시 읽습니다."""
+    stamp = _file_stamp(store_path, store_path + "-wal")
+    return _cached_weak_sets(store_path, str(student_id), stamp)
+
 # --- Streamlit UI ---
 
 st.set_page_config(layout="wide")
@@ -69,16 +149,37 @@ OUTPUT_DIR = st.sidebar.text_input(
     help="생성된 시험지, 메타파일, 채점 결과, 취약점 파일이 저장될 폴더입니다."
 )
 
+ENGINE_LABELS = {"word": "MS Word (Windows 전용)", "ooxml": "내장 조립기 (모든 OS)"}
+DOCX_ENGINE = st.sidebar.selectbox(
+    "시험지 조립 엔진",
+    list(ENGINE_LABELS.keys()),
+    index=list(ENGINE_LABELS).index(DEFAULT_DOCX_ENGINE),
+    format_func=lambda k: ENGINE_LABELS[k],
+    help="'내장 조립기'는 MS Word 없이 지문/문제 .docx 를 직접 병합하므로 Linux 서버에서도 동작합니다."
+)
+
 # 앱 실행 시 출력 폴더 생성
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+USE_JOB_QUEUE = st.sidebar.checkbox(
+    "백그라운드 작업 큐 사용", value=False,
+    help="시험지 생성/채점/대시보드를 워커 프로세스(run_WORKER.py)가 처리합니다. "
+         "화면은 기다리지 않고 '작업 현황' 메뉴에서 결과를 받습니다."
+)
+JOB_QUEUE_PATH = os.path.join(OUTPUT_DIR, "jobs.sqlite")    # run_WORKER.py 의 JOB_QUEUE_PATH 와 같은 파일
+
+# 문항 DB를 미리 올려 둡니다. (처음 한 번만 파싱, 이후 모든 세션/페이지가 공유)
+if os.path.exists(DB_PATH):
+    bank_resources(DB_PATH)
+
 # --- 2. 페이지 선택 (사이드바) ---
-page = st.sidebar.radio("메뉴", ["시험지 생성", "채점 및 취약점 분석", "대시보드 생성"])
+page = st.sidebar.radio("메뉴", ["시험지 생성", "적응형 시험 (CAT)", "채점 및 취약점 분석", "대시보드 생성", "작업 현황"])
 
 st.sidebar.header("사용 안내")
 st.sidebar.warning(
-    "**시험지 생성 (로컬 전용)**\n"
-    "'시험지 생성' 메뉴는 **MS Word가 설치된 Windows PC**에서 로컬로 Streamlit을 실행할 때만 동작합니다.\n\n",
+    "**시험지 생성 엔진**\n"
+    "'MS Word' 엔진은 **MS Word가 설치된 Windows PC**에서 로컬로 Streamlit을 실행할 때만 동작합니다. "
+    "서버에서는 '내장 조립기' 엔진을 사용하세요.\n\n",
     icon="💻"
 )
 st.sidebar.info(
@@ -101,12 +202,13 @@ st.sidebar.info(
 # 페이지 1: 시험지 생성
 # ==============================================================================
 if page == "시험지 생성":
-    st.header("1. 시험지 생성 (로컬 Windows 전용)")
-    st.warning(
-        "이 기능은 **MS Word가 설치된 Windows PC**에서 로컬로 실행할 때만 정상 동작합니다. "
-        "웹 서버(Streamlit Cloud 등)에서는 Word 파일(.docx)을 생성할 수 없습니다.",
-        icon="⚠️"
-    )
+    st.header("1. 시험지 생성")
+    if DOCX_ENGINE == "word":
+        st.warning(
+            "'MS Word' 엔진은 **MS Word가 설치된 Windows PC**에서 로컬로 실행할 때만 정상 동작합니다. "
+            "웹 서버(Streamlit Cloud 등)에서는 사이드바에서 '내장 조립기' 엔진을 선택하세요.",
+            icon="⚠️"
+        )
     
     st.subheader("학생 정보 입력")
     col1, col2 = st.columns(2)
@@ -120,9 +222,16 @@ if page == "시험지 생성":
 
     user_theta = 0.0
     if mode == "IRT (맞춤형)":
-        user_theta = st.number_input("학생 능력치 (Theta)", min_value=-3.0, max_value=3.0, value=0.3, step=0.1)
+        est_theta, est_se = cached_latest_theta(OUTPUT_DIR, student_id, db_path=DB_PATH) if os.path.exists(DB_PATH) else (None, None)
+        use_estimate = est_theta is not None and st.checkbox(
+            f"최근 채점 결과의 추정 능력치 사용 (Theta={est_theta:.2f}, SE={est_se:.2f})" if est_se is not None
+            else f"최근 채점 결과의 추정 능력치 사용 (Theta={est_theta:.2f})", value=True)
+        if use_estimate:
+            user_theta = round(est_theta, 2)
+        else:
+            user_theta = st.number_input("학생 능력치 (Theta)", min_value=-3.0, max_value=3.0, value=0.3, step=0.1)
         st.info(f"IRT 모드 선택됨: {student_id} 학생의 Theta 값 {user_theta}를 사용합니다.\n"
-                f"취약점 파일: `{os.path.join(OUTPUT_DIR, f'user_weakness_{student_id}.xlsx')}` 를 참조합니다.")
+                f"취약점 저장소: `{weakness_store_path(OUTPUT_DIR)}` 의 {student_id} 학생 기록을 참조합니다.")
 
     if st.button("시험지 생성 시작하기", type="primary"):
         
@@ -136,8 +245,20 @@ if page == "시험지 생성":
         if not os.path.exists(os.path.join(BASE_DIR, "지문")) or not os.path.exists(os.path.join(BASE_DIR, "문제")):
             st.warning(f"'{BASE_DIR}' 폴더 내에 '지문' 또는 '문제' 폴더가 있는지 확인하세요.")
 
-        
-        with st.spinner(f"{mode} 모드로 시험지 생성 중... (MS Word가 실행될 수 있습니다)"):
+        if USE_JOB_QUEUE:
+            common = dict(db_path=DB_PATH, base_dir=BASE_DIR, output_dir=OUTPUT_DIR, student_id=student_id,
+                          student_name=student_name, two_columns=True, engine=DOCX_ENGINE)
+            if mode == "RANDOM (첫 사용자용)":
+                submit_job("generate_random", dict(common, title="[첫 사용자용] 국어 영역 시험지",
+                                                   subtitle=f"{student_name} 학생"))
+            else:
+                submit_job("generate_irt", dict(
+                    common, user_weakness_path=weakness_store_path(OUTPUT_DIR), user_theta=user_theta,
+                    title="[맞춤형] 국어 영역 시험지", subtitle=f"{student_name}님 취약점 보완 (Theta={user_theta})",
+                    num_passages=7, num_problems_per_passage=4, weak_passage_target_prop=0.6, weak_problem_boost=1.5))
+
+        spinner_note = " (MS Word가 실행될 수 있습니다)" if DOCX_ENGINE == "word" else ""
+        with st.spinner(f"{mode} 모드로 시험지 생성 중...{spinner_note}"):
             gen_result = None
             try:
                 if mode == "RANDOM (첫 사용자용)":
@@ -152,13 +273,15 @@ if page == "시험지 생성":
                         student_name=student_name,
                         # num_passages=7,                 # <-- 이 인자가 오류의 원인입니다. (제거)
                         # num_problems_per_passage=4,     # <-- 이 인자도 제거합니다.
-                        two_columns=True
+                        two_columns=True,
+                        engine=DOCX_ENGINE
                     )
                 
                 elif mode == "IRT (맞춤형)":
-                    weakness_file_path = os.path.join(OUTPUT_DIR, f"user_weakness_{student_id}.xlsx")
-                    if not os.path.exists(weakness_file_path):
-                        st.warning(f"취약점 파일({weakness_file_path})을 찾을 수 없습니다. IRT 모드이지만 취약점 가중치 없이 생성됩니다.")
+                    weakness_file_path = weakness_store_path(OUTPUT_DIR)
+                    if not os.path.exists(weakness_file_path) and \
+                            not os.path.exists(os.path.join(OUTPUT_DIR, f"user_weakness_{student_id}.xlsx")):
+                        st.warning(f"취약점 기록({weakness_file_path})을 찾을 수 없습니다. IRT 모드이지만 취약점 가중치 없이 생성됩니다.")
                     
                     # [참고] generate_exam_irt_weakness 함수는 해당 인자를 받으므로 그대로 둡니다.
                     gen_result = generate_exam_irt_weakness(
@@ -175,7 +298,8 @@ if page == "시험지 생성":
                         two_columns=True,
                         output_dir=OUTPUT_DIR,
                         student_id=student_id,
-                        student_name=student_name
+                        student_name=student_name,
+                        engine=DOCX_ENGINE
                     )
 
                 # --- 결과 처리 ---
@@ -232,6 +356,107 @@ if page == "시험지 생성":
                 if "win32com" in str(e) or "pywintypes" in str(e):
                     st.error("오류 상세: 'win32com' 라이브러리 관련 문제입니다. MS Word가 설치된 Windows 환경에서만 이 기능을 사용할 수 있습니다.")
 
+# ==============================================================================
+# 페이지 1-2: 적응형 시험 (CAT)
+# ==============================================================================
+elif page == "적응형 시험 (CAT)":
+    st.header("적응형 시험 (CAT)")
+    st.info("브라우저에서 바로 문제를 풉니다. 답을 제출할 때마다 능력치(Theta)를 다시 추정하고, "
+            "현재 능력치에서 정보량이 가장 큰 문항(취약 유형 가중)을 다음 문제로 출제합니다.")
+
+    cat = st.session_state.get("cat")
+
+    if cat is None:
+        col1, col2 = st.columns(2)
+        with col1:
+            cat_student_id = st.text_input("학생 ID", "S001", key="cat_student_id")
+            cat_mode = st.radio("출제 단위", ["testlet", "item"], horizontal=True,
+                                format_func=lambda m: "지문 단위 (지문 + 문항 묶음)" if m == "testlet" else "문항 단위")
+        with col2:
+            cat_student_name = st.text_input("학생 이름", "김철수", key="cat_student_name")
+            cat_max_items = st.number_input("최대 문항 수", min_value=4, max_value=60, value=CAT_MAX_ITEMS, step=1)
+            cat_se_target = st.number_input("종료 기준 표준오차", min_value=0.1, max_value=1.0, value=CAT_SE_TARGET, step=0.05)
+
+        if st.button("적응형 시험 시작", type="primary"):
+            if not os.path.exists(DB_PATH):
+                st.error(f"DB 파일을 찾을 수 없습니다. (경로: {DB_PATH})")
+                st.stop()
+            pool = get_cat_pool(DB_PATH, BASE_DIR)
+            if len(pool) == 0:
+                st.error(f"출제 가능한 문항이 없습니다. '{BASE_DIR}' 폴더의 지문/문제 파일과 DB의 IRT 값을 확인하세요.")
+                st.stop()
+
+            weak_passages, weak_problems = set(), set()
+            if os.path.isdir(OUTPUT_DIR):
+                weak_passages, weak_problems = cached_weak_sets(weakness_store_path(OUTPUT_DIR), cat_student_id)
+            start_theta, _ = cached_latest_theta(OUTPUT_DIR, cat_student_id, db_path=DB_PATH)
+
+            st.session_state["cat"] = CatSession(
+                pool, weak_passages, weak_problems, mode=cat_mode, max_items=int(cat_max_items),
+                se_target=float(cat_se_target), start_theta=start_theta if start_theta is not None else 0.0
+            )
+            st.session_state["cat_student"] = (cat_student_id, cat_student_name)
+            st.session_state["cat_result"] = None
+            st.rerun()
+
+    else:
+        cat_student_id, cat_student_name = st.session_state["cat_student"]
+        m1, m2, m3 = st.columns(3)
+        m1.metric("푼 문항", f"{cat.n_items} / {cat.max_items}")
+        m2.metric("추정 능력치 (Theta)", f"{cat.theta:.2f}")
+        m3.metric("표준오차", f"{cat.se:.2f}" if cat.se is not None else "-")
+        st.progress(min(cat.n_items / cat.max_items, 1.0))
+
+        items = cat.next_items()
+        if items:
+            pool = cat.pool
+            passage_id = pool.passage_ids[pool.passage_of[items[0]]]
+            with st.expander(f"지문 {passage_id}", expanded=(cat.mode == "testlet")):
+                st.markdown("\n\n".join(p for p in fragment_text(pool.passage_path(passage_id)) if p.strip()))
+
+            with st.form(f"cat_form_{cat.n_items}"):
+                for j in items:
+                    qid = pool.item_ids[j]
+                    st.markdown(f"**문항 {qid}**")
+                    st.markdown("\n\n".join(p for p in fragment_text(pool.problem_path(qid)) if p.strip()))
+                    st.radio("답", ["1", "2", "3", "4", "5"], index=None, horizontal=True, key=f"cat_answer_{j}")
+                submitted = st.form_submit_button("답안 제출", type="primary")
+            if submitted:
+                cat.answer({j: st.session_state.get(f"cat_answer_{j}") or "" for j in items})
+                st.rerun()
+        else:
+            st.success(f"적응형 시험 종료! 문항 {cat.n_items}개, 추정 능력치 Theta={cat.theta:.2f} "
+                       f"(표준오차 {cat.se:.2f})" if cat.se is not None else "적응형 시험 종료!")
+            if cat.history:
+                st.line_chart(pd.DataFrame(cat.history).set_index("n_items")[["theta"]])
+
+            if st.session_state.get("cat_result") is None:
+                with st.spinner("결과 저장 및 취약점 분석 중..."):
+                    grade_result = save_adaptive_exam(cat, OUTPUT_DIR, cat_student_id, cat_student_name, db_path=DB_PATH)
+                    if grade_result:
+                        analyze_weakness(grade_result["sheets"], output_dir=OUTPUT_DIR,
+                                         passage_threshold=70.0, problem_threshold=60.0)
+                    st.session_state["cat_result"] = grade_result
+
+            grade_result = st.session_state["cat_result"]
+            if grade_result:
+                st.info(f"**{grade_result['score']}점** ({grade_result['correct']} / {grade_result['total']}) - "
+                        f"결과가 `{OUTPUT_DIR}` 폴더에 저장되었습니다.")
+                graded_filename = os.path.basename(grade_result["graded_path"])
+                st.download_button(
+                    label=f"상세 채점 파일\n({graded_filename})",
+                    data=read_file_for_download(grade_result["graded_path"]),
+                    file_name=graded_filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+            else:
+                st.warning("결과 저장에 실패했습니다. 터미널 로그를 확인하세요.")
+
+        if st.button("새 적응형 시험 시작" if not items else "시험 중단"):
+            for key in ("cat", "cat_student", "cat_result"):
+                st.session_state.pop(key, None)
+            st.rerun()
+
 # ==============================================================================
 # 페이지 2: 채점 및 취약점 분석
 # ==============================================================================
@@ -247,7 +472,17 @@ elif page == "채점 및 취약점 분석":
         answer_sheet_file = st.file_uploader("2. 학생 답안 파일 (.xlsx)", type="xlsx", help="학생이 답을 입력한 엑셀 파일. 첫 번째 열에 답이 있어야 합니다.")
 
     if st.button("채점 시작하기", type="primary", disabled=(not exam_meta_file or not answer_sheet_file)):
-        
+
+        if USE_JOB_QUEUE:
+            job_meta_path = save_job_upload(exam_meta_file)
+            job_exam_id = os.path.splitext(os.path.basename(job_meta_path))[0]
+            has_db = os.path.exists(DB_PATH)
+            submit_job("grade", dict(
+                exam_xlsx_path=job_meta_path, answers_xlsx_path=save_job_upload(answer_sheet_file),
+                output_dir=OUTPUT_DIR, db_path=DB_PATH if has_db else None,
+                weakness_dir=OUTPUT_DIR, export_weakness_xlsx=True,
+                dashboard_path=os.path.join(OUTPUT_DIR, f"DASHBOARD_{job_exam_id}.xlsx") if has_db else None))
+
         # 1. 업로드된 파일 임시 저장
         temp_meta_path = save_uploaded_file(exam_meta_file)
         temp_answers_path = save_uploaded_file(answer_sheet_file)
@@ -260,7 +495,8 @@ elif page == "채점 및 취약점 분석":
                         exam_xlsx_path=temp_meta_path,
                         interactive=False, # 파일 업로드 방식 사용
                         answers_xlsx_path=temp_answers_path,
-                        output_dir=OUTPUT_DIR # 통합된 출력 폴더 사용
+                        output_dir=OUTPUT_DIR, # 통합된 출력 폴더 사용
+                        db_path=DB_PATH if os.path.exists(DB_PATH) else None # 능력치(theta) 추정용
                     )
                     
                     if not grade_result or not grade_result.get("graded_path"):
@@ -268,10 +504,13 @@ elif page == "채점 및 취약점 분석":
                         st.stop()
 
                     st.success(f"채점 완료! **{grade_result['score']}점** ({grade_result['correct']} / {grade_result['total']})")
+                    if grade_result.get("theta") is not None:
+                        st.info(f"추정 능력치: Theta={grade_result['theta']:.2f} (표준오차 {grade_result['theta_se']:.2f}) "
+                                f"- 다음 맞춤형 시험지 생성 시 자동으로 사용됩니다.")
 
-                    # 3. 취약점 분석 실행
-                    updated_weakness_file = analyze_weakness_from_graded_file(
-                        graded_xlsx_path=grade_result["graded_path"], # 채점 결과 파일
+                    # 3. 취약점 분석 실행 (채점 결과를 파일에서 다시 읽지 않고 메모리에서 바로 사용)
+                    updated_weakness_file = analyze_weakness(
+                        grade_result["sheets"], # 채점 결과 시트
                         output_dir=OUTPUT_DIR, # 통합된 출력 폴더 사용
                         passage_threshold=70.0,
                         problem_threshold=60.0
@@ -282,6 +521,16 @@ elif page == "채점 및 취약점 분석":
                     else:
                         st.warning("취약점 분석에 실패했습니다.")
                         st.stop()
+                    # 다운로드용 엑셀 보기는 저장소에서 이 학생 기록만 새로 만듭니다.
+                    updated_weakness_file = export_weakness_xlsx(OUTPUT_DIR, grade_result["student_id"])
+
+                    # 대시보드도 같은 채점 결과로 바로 생성
+                    dashboard_path = None
+                    if os.path.exists(DB_PATH):
+                        dashboard_path = os.path.join(OUTPUT_DIR, f"DASHBOARD_{grade_result['exam_id']}.xlsx")
+                        create_dashboard_from_sheets(grade_result["sheets"], DB_PATH, dashboard_path)
+                        if not os.path.exists(dashboard_path):
+                            dashboard_path = None
 
                     # 4. 결과 파일 다운로드 버튼 제공
                     st.subheader("결과 파일 다운로드")
@@ -291,7 +540,7 @@ elif page == "채점 및 취약점 분석":
                     result_filename = os.path.basename(grade_result["result_path"])
                     weakness_filename = os.path.basename(updated_weakness_file)
 
-                    dl_col1, dl_col2, dl_col3 = st.columns(3)
+                    dl_col1, dl_col2, dl_col3, dl_col4 = st.columns(4)
                     with dl_col1:
                         st.download_button(
                             label=f"1. 상세 채점 파일\n({graded_filename})",
@@ -313,6 +562,14 @@ elif page == "채점 및 취약점 분석":
                             file_name=weakness_filename,
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                         )
+                    if dashboard_path:
+                        with dl_col4:
+                            st.download_button(
+                                label=f"4. 대시보드\n({os.path.basename(dashboard_path)})",
+                                data=read_file_for_download(dashboard_path),
+                                file_name=os.path.basename(dashboard_path),
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                            )
 
                 except Exception as e:
                     st.error(f"실행 중 오류가 발생했습니다: {e}")
@@ -338,9 +595,14 @@ elif page == "대시보드 생성":
             st.error(f"DB 파일을 찾을 수 없습니다. (경로: {DB_PATH})")
             st.stop()
 
+        if USE_JOB_QUEUE:
+            submit_job("dashboard", dict(
+                graded_path=save_job_upload(graded_file), db_path=DB_PATH,
+                output_path=os.path.join(OUTPUT_DIR, f"DASHBOARD_{os.path.basename(graded_file.name)}")))
+
         # 1. 임시 파일 저장
         temp_graded_path = save_uploaded_file(graded_file)
-        dashboard_output_path = os.path.join(TEMP_DIR, f"DASHBOARD_{graded_file.name}")
+        dashboard_output_path = os.path.join(session_temp_dir(), f"DASHBOARD_{os.path.basename(graded_file.name)}")
 
         if temp_graded_path:
             with st.spinner("대시보드 생성 중..."):
@@ -364,3 +626,49 @@ elif page == "대시보드 생성":
                     # 임시 파일 삭제
                     if os.path.exists(temp_graded_path): os.remove(temp_graded_path)
                     if os.path.exists(dashboard_output_path): os.remove(dashboard_output_path)
+
+# ==============================================================================
+# 페이지 4: 작업 현황 (백그라운드 작업 큐)
+# ==============================================================================
+elif page == "작업 현황":
+    st.header("4. 작업 현황")
+    st.info("이 세션에서 등록한 백그라운드 작업입니다. 워커: `python run_WORKER.py` (다른 PC 에서도 같은 폴더를 공유하면 실행 가능)")
+
+    if not os.path.exists(JOB_QUEUE_PATH):
+        st.warning(f"작업 큐가 없습니다. (경로: {JOB_QUEUE_PATH}) 사이드바에서 '백그라운드 작업 큐 사용'을 켜고 작업을 등록하세요.")
+        st.stop()
+    if st.button("새로고침"):
+        st.rerun()
+
+    STATUS_LABELS = {"queued": "대기", "running": "실행 중", "done": "완료", "failed": "실패", "cancelled": "취소됨"}
+    with JobQueue(JOB_QUEUE_PATH) as queue:
+        jobs = queue.jobs(owner=session_owner(), limit=50)
+        if jobs.empty:
+            st.write("등록한 작업이 없습니다.")
+        for job_id in jobs["job_id"]:
+            job = queue.get(int(job_id))
+            status = job["status"]
+            with st.container(border=True):
+                st.markdown(f"**#{job_id} {job['kind']}** - {STATUS_LABELS.get(status, status)}"
+                            f" (시도 {job['attempts']}/{job['max_attempts']})")
+                if status not in FINISHED_STATUSES:
+                    st.progress(float(job["progress"] or 0), text=job["message"] or "")
+                    if st.button("취소", key=f"cancel_job_{job_id}"):
+                        queue.cancel(int(job_id))
+                        st.rerun()
+                elif status == "failed":
+                    st.error(job["error"] or "실패 (워커 로그 확인)")
+                elif status == "done":
+                    result = job["result"] or {}
+                    if "score" in result:
+                        st.write(f"점수: **{result['score']}점** ({result.get('correct')} / {result.get('total')})")
+                    for i, path in enumerate(job["artifacts"] or []):
+                        if os.path.exists(path):
+                            st.download_button(
+                                label=os.path.basename(path),
+                                data=read_file_for_download(path),
+                                file_name=os.path.basename(path),
+                                key=f"job_{job_id}_file_{i}"
+                            )
+                        else:
+                            st.caption(f"파일을 찾을 수 없습니다: {path}")
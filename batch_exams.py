@@ -0,0 +1,203 @@
+import os
+import logging
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+
+import exam_functions as ef
+from item_bank import get_item_bank
+from theta_estimation import latest_thetas
+from output_writers import DEFAULT_OUTPUT_FORMAT, find_outputs
+from weakness_store import WeaknessStore, weakness_store_path
+from exam_counter import allocate_exam_counts
+from docx_assembler import configure_fragment_cache, FRAGMENT_CACHE_MAX_BYTES
+
+# --- 로깅 설정 ---
+log_batch = logging.getLogger("exam_batch")
+
+ROSTER_COLUMNS = ["student_id", "student_name", "theta", "weakness_path"]
+MANIFEST_COLUMNS = ["student_id", "student_name", "theta", "exam_id", "doc_path", "meta_path",
+                    "n_problems", "status", "error"]
+
+DEFAULT_TITLES = {"IRT": "[맞춤형] 국어 영역 시험지", "RANDOM": "[진단] 국어 영역 시험지"}
+DEFAULT_SUBTITLES = {"IRT": "{student_name}님 취약점 보완 (Theta={theta})", "RANDOM": "{student_name}님 진단 평가"}
+
+
+def load_roster(path: str) -> pd.DataFrame:
+    """
+    학생 명단(.xlsx/.csv)을 읽습니다.
+    필수 컬럼: student_id / 선택 컬럼: student_name, theta, weakness_path
+    """
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype={"student_id": str})
+    else:
+        df = pd.read_excel(path, sheet_name=0, dtype={"student_id": str})
+    if "student_id" not in df.columns:
+        raise ValueError(f"명단에 student_id 컬럼이 없습니다: {path}")
+    df = df.dropna(subset=["student_id"]).copy()
+    df["student_id"] = df["student_id"].astype(str).str.strip()
+    if "student_name" not in df.columns:
+        df["student_name"] = "학생"
+    df["student_name"] = df["student_name"].fillna("학생").astype(str)
+    df["theta"] = pd.to_numeric(df["theta"], errors="coerce") if "theta" in df.columns else np.nan
+    if "weakness_path" not in df.columns:
+        df["weakness_path"] = None
+    return df[ROSTER_COLUMNS].reset_index(drop=True)
+
+
+def _assemble_exam(job: dict, word_app=None) -> dict:
+    """선택이 끝난 한 학생의 시험지(docx)와 메타 파일을 만듭니다. (프로세스 풀 작업 단위)"""
+    row = {k: job[k] for k in ("student_id", "student_name", "theta", "exam_id")}
+    row.update({"doc_path": None, "meta_path": None, "n_problems": len(job["records"]), "status": "failed", "error": ""})
+    try:
+        # 시험지 파일 이름에는 학생 ID 대신 시험 ID 를 씁니다. (같은 학생이 명단에 여러 번 있어도 서로 덮어쓰지 않음)
+        row["doc_path"] = ef._create_word_document(
+            job["tasks"], job["title"], job["subtitle"], job["student_name"], job["two_columns"],
+            job["output_dir"], job["exam_id"], engine=job["engine"], word_app=word_app
+        )
+        row["meta_path"] = ef._write_exam_meta(
+            job["output_dir"], job["exam_id"], job["student_id"], job["student_name"], job["title"],
+            job["now"], job["records"], extra_meta=job["extra_meta"], output_format=job["output_format"]
+        )
+        row["status"] = "ok" if row["doc_path"] else "meta_only"
+        if not row["doc_path"]:
+            row["error"] = "시험지(docx) 생성 실패"
+    except Exception as e:
+        row["error"] = str(e)
+        log_batch.error(f"{job['student_id']} 시험지 조립 실패: {e}")
+        log_batch.debug(traceback.format_exc())
+    return row
+
+
+def generate_exams_for_roster(
+    roster: pd.DataFrame, db_path: str, base_dir: str, mode: str = "IRT",
+    title: str | None = None, subtitle: str | None = None, output_dir: str = "./output",
+    weakness_dir: str | None = None, engine: str = "ooxml", max_workers: int | None = None,
+    seed: int | None = None, num_passages: int = 7, num_problems_per_passage: int = 4,
+    weak_passage_target_prop: float = 0.6, weak_problem_boost: float = 1.5, two_columns: bool = True,
+    fragment_cache_dir: str | None = None, graded_dir: str | None = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> pd.DataFrame:
+    """
+    명단의 모든 학생에 대해 시험지를 한 번에 생성하고 학생별 결과 목록(manifest)을 반환합니다.
+
+    1) 문항 DB를 한 번만 읽고, 학생마다 독립된 난수 스트림(SeedSequence.spawn)으로 문항을 선택합니다.
+    2) 시험지 조립과 메타 파일 저장은 프로세스 풀에 분산합니다.
+       ("word" 엔진은 Word 를 한 번만 띄워 순차 처리합니다.)
+       작업 프로세스들은 파싱된 지문/문제 조각을 fragment_cache_dir(기본: base_dir/.cache/fragments)에 공유합니다.
+    seed 를 지정하면 같은 명단/DB 에 대해 같은 문항 선택이 재현됩니다.
+    IRT 모드에서 명단에 theta 가 비어 있는 학생은 graded_dir(기본: output_dir)의 최근 채점 결과에서 추정한 값을 씁니다.
+    메타 파일 형식은 output_format 으로 고릅니다. (output_writers.OUTPUT_FORMATS)
+    """
+    mode = mode.upper()
+    if mode not in DEFAULT_TITLES:
+        raise ValueError(f"알 수 없는 모드: {mode} (가능: IRT, RANDOM)")
+    title = title or DEFAULT_TITLES[mode]
+    subtitle = subtitle if subtitle is not None else DEFAULT_SUBTITLES[mode]
+    weakness_dir = weakness_dir or output_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    bank = get_item_bank(db_path)
+    need = ef.IRT_NEED_COLS if mode == "IRT" else ef.RANDOM_NEED_COLS
+    if not all(c in bank.columns for c in need):
+        raise ValueError(f"DB에 필요한 컬럼 부족: {set(need) - set(bank.columns)}")
+
+    known_thetas = pd.Series(dtype=float)
+    if mode == "IRT" and roster["theta"].isna().any():
+        graded_paths = find_outputs(graded_dir or output_dir, "*_graded")
+        if graded_paths:
+            missing_ids = roster.loc[roster["theta"].isna(), "student_id"].astype(str).unique()
+            known_thetas = latest_thetas(graded_paths, db_path=db_path, student_ids=missing_ids)["theta"]
+            log_batch.info(f"theta 가 비어 있는 학생 {len(missing_ids)}명 중 {len(known_thetas)}명은 최근 채점 결과의 추정값을 사용합니다.")
+
+    # 취약점 저장소는 한 번만 열어 명단 학생들의 기록을 미리 읽어 둡니다. (명단의 weakness_path 가 있으면 그 파일 우선)
+    stored_weakness: dict[str, tuple[set, set]] = {}
+    if mode == "IRT":
+        use_store = roster["student_id"].astype(str)[~roster["weakness_path"].map(lambda p: isinstance(p, str) and bool(p))]
+        if len(use_store) and os.path.isdir(weakness_dir):
+            with WeaknessStore(weakness_store_path(weakness_dir)) as store:
+                stored_weakness = {sid: store.weak_sets(sid) for sid in use_store.unique() if store.has_student(sid)}
+
+    seed_seq = np.random.SeedSequence(seed)
+    log_batch.info(f"일괄 생성 시작: {len(roster)}명, 모드={mode}, 엔진={engine}, seed entropy={seed_seq.entropy}")
+    child_seeds = seed_seq.spawn(len(roster))
+
+    now = datetime.now(ef.KST)
+    jobs, manifest = [], []
+    for (_, r), child in zip(roster.iterrows(), child_seeds):
+        student_id, student_name = str(r["student_id"]), str(r["student_name"])
+        theta = float(r["theta"]) if pd.notna(r["theta"]) else None
+        rng = np.random.default_rng(child)
+        base_row = {"student_id": student_id, "student_name": student_name, "theta": theta, "exam_id": None,
+                    "doc_path": None, "meta_path": None, "n_problems": 0, "status": "failed", "error": ""}
+
+        extra_meta = {}
+        if mode == "IRT":
+            if theta is None and student_id in known_thetas.index:
+                theta = float(known_thetas[student_id])
+                base_row["theta"] = theta
+            if theta is None:
+                log_batch.warning(f"{student_id}: theta 값도 채점 기록도 없어 0.0 으로 진행합니다.")
+                theta = 0.0
+                base_row["theta"] = theta
+            weakness_path = r["weakness_path"] if isinstance(r["weakness_path"], str) and r["weakness_path"] else None
+            weak_passages, weak_problems, prop = set(), set(), weak_passage_target_prop
+            if weakness_path is None and student_id in stored_weakness:
+                weak_passages, weak_problems = stored_weakness[student_id]
+            elif weakness_path is not None and os.path.exists(weakness_path):
+                try:
+                    weak_passages, weak_problems = ef._load_weakness_sets(weakness_path, student_id)
+                except Exception as e:
+                    base_row["error"] = f"취약점 파일 읽기 실패: {e}"
+                    manifest.append(base_row)
+                    continue
+            else:
+                prop = 0.0
+            selection = ef._select_irt_exam(bank, base_dir, weak_passages, weak_problems, theta, num_passages,
+                                            num_problems_per_passage, prop, weak_problem_boost, rng)
+            extra_meta = {"user_theta": theta}
+        else:
+            selection = ef._select_random_exam(bank, base_dir, rng)
+
+        if not selection or not selection[0]:
+            base_row["error"] = "삽입할 유효한 파일(지문/문제)이 없습니다."
+            manifest.append(base_row)
+            continue
+        tasks, records = selection
+
+        fmt = {"student_id": student_id, "student_name": student_name, "theta": theta}
+        jobs.append({
+            "student_id": student_id, "student_name": student_name, "theta": theta, "exam_id": None,
+            "tasks": tasks, "records": records, "title": title.format(**fmt),
+            "subtitle": subtitle.format(**fmt) if subtitle else None, "two_columns": two_columns,
+            "output_dir": output_dir, "engine": engine, "now": now, "extra_meta": extra_meta,
+            "output_format": output_format,
+        })
+
+    # 시험 ID 는 선택에 성공한 학생들에게 한 번에 발급합니다. (같은 학생이 명단에 여러 번 있어도 ID 와 시험지 파일이 겹치지 않음)
+    for job, count in zip(jobs, allocate_exam_counts(output_dir, [job["student_id"] for job in jobs])):
+        job["exam_id"] = ef.make_exam_id(student_id=job["student_id"], now=now, exam_count=count)
+    log_batch.info(f"문항 선택 완료: {len(jobs)}건 조립 예정 ({len(manifest)}건 실패)")
+
+    if engine == "word":
+        from word_com import start_word
+        word_app = start_word(visible=False)
+        try:
+            manifest.extend(_assemble_exam(job, word_app=word_app) for job in jobs)
+        finally:
+            if word_app[0]:
+                try: word_app[0].Quit()
+                except Exception: pass
+    elif max_workers == 1 or len(jobs) <= 1:
+        manifest.extend(_assemble_exam(job) for job in jobs)
+    else:
+        cache_dir = fragment_cache_dir or os.path.join(base_dir, ".cache", "fragments")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=configure_fragment_cache,
+                                 initargs=(FRAGMENT_CACHE_MAX_BYTES, cache_dir)) as pool:
+            manifest.extend(pool.map(_assemble_exam, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    result = pd.DataFrame(manifest, columns=MANIFEST_COLUMNS)
+    log_batch.info(f"일괄 생성 완료: 성공 {int((result['status'] == 'ok').sum())} / 전체 {len(result)}")
+    return result
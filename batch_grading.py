@@ -0,0 +1,223 @@
+# 한 시험(메타 파일)을 반 전체가 본 경우의 일괄 채점입니다.
+# - 답안표: 학생 1명 = 1행, 문항 1개 = 1열 (student_id, student_name 컬럼 + 문항 열)
+#   문항 열 이름이 selected_problems 의 problem_id 와 같으면 이름으로, 아니면 순서대로 맞춥니다.
+# - 답안 정규화(normalize_answer_num 과 같은 규칙)와 채점은 반 전체를 하나의 배열로 한 번에 계산합니다.
+# - 학생별 ..._graded.xlsx / ..._result.xlsx (grade_exam 과 같은 형식)와 반 전체 요약 파일을 만듭니다.
+#   학생별 파일은 output_format 으로 형식을 고를 수 있고, 사람이 보는 반 전체 요약은 항상 xlsx 입니다.
+import os
+import logging
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+import exam_functions as ef
+from graded_reader import read_sheets
+from theta_estimation import get_theta_scorer
+from irt_model import MISSING
+from output_writers import DEFAULT_OUTPUT_FORMAT, output_path, write_sheets
+from results_warehouse import WAREHOUSE_COLUMNS, append_grading_rows
+
+# --- 로깅 설정 ---
+log_bgrade = logging.getLogger("batch_grading")
+
+ID_COLUMNS = ["student_id", "student_name"]
+PARALLEL_MIN_STUDENTS = 16      # 이보다 적으면 학생별 파일을 순차로 저장
+_ALPHA_TO_NUM = {"A": "1", "B": "2", "C": "3", "D": "4", "E": "5"}
+_VALID_ANSWERS = ["1", "2", "3", "4", "5"]
+
+
+def normalize_answer_array(values) -> np.ndarray:
+    """
+    normalize_answer_num 의 벡터 버전. 2차원 배열/DataFrame 도 그대로 받아 같은 모양의 문자열 배열을 반환합니다.
+    엑셀에서 실수로 읽힌 정수(3.0)도 "3" 으로 처리합니다.
+    """
+    arr = np.asarray(values, dtype=object)
+    s = pd.Series(arr.ravel(), dtype=object)
+    s = s.where(s.notna(), "").astype(str).str.strip().str.upper()
+    s = s.str.replace(r"[\s\(\)]", "", regex=True).str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+    s = s.replace(_ALPHA_TO_NUM)
+    s = s.where(s.isin(_VALID_ANSWERS), "")
+    return s.to_numpy(dtype=object).reshape(arr.shape)
+
+
+def load_answer_matrix(path: str, problem_ids: list[str]) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    넓은 형식 답안표(.xlsx/.csv)를 읽습니다. student_id 가 겹치면 ValueError 를 발생시킵니다.
+    반환: (학생 DataFrame[student_id, student_name], 정규화된 답안 배열 (학생 수 x 문항 수))
+    """
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype=object)
+    else:
+        df = pd.read_excel(path, sheet_name=0, dtype=object)
+    df.columns = [str(c).strip() for c in df.columns]
+    if "student_id" not in df.columns:
+        raise ValueError(f"답안표에 student_id 컬럼이 없습니다: {path}")
+    df = df.dropna(subset=["student_id"])
+    sheet_rows = df.index.to_numpy() + 2        # 파일의 행 번호 (1행 = 머리글)
+    df = df.reset_index(drop=True)
+
+    students = pd.DataFrame({"student_id": df["student_id"].astype(str).str.strip()})
+    # 같은 학생이 두 줄이면 학생별 채점 파일이 서로 덮어쓰므로 채점하지 않고 알립니다.
+    dup = students["student_id"].duplicated(keep=False).to_numpy()
+    if dup.any():
+        groups = pd.Series(sheet_rows[dup]).groupby(students["student_id"].to_numpy()[dup]).agg(list)
+        listing = ", ".join(f"{sid} (행 {', '.join(map(str, rows))})" for sid, rows in groups.items())
+        raise ValueError(f"답안표에 같은 student_id 가 여러 번 있습니다: {listing}")
+    students["student_name"] = df["student_name"].fillna("학생").astype(str) if "student_name" in df.columns else "학생"
+
+    item_cols = [c for c in df.columns if c not in ID_COLUMNS]
+    if set(problem_ids) <= set(item_cols):
+        raw = df[problem_ids].to_numpy(dtype=object)
+    else:
+        if len(item_cols) != len(problem_ids):
+            log_bgrade.warning(f"답안 열 수({len(item_cols)})와 문항 수({len(problem_ids)})가 다릅니다. 순서대로 맞추고 나머지는 무응답 처리합니다.")
+        raw = np.full((len(df), len(problem_ids)), "", dtype=object)
+        n = min(len(item_cols), len(problem_ids))
+        raw[:, :n] = df[item_cols[:n]].to_numpy(dtype=object)
+    return students, normalize_answer_array(raw)
+
+
+def _write_student(job: dict) -> tuple[str, str | None]:
+    """학생 한 명의 채점 파일 저장 (프로세스 풀 작업 단위). 반환: (student_id, 오류 메시지 또는 None)"""
+    try:
+        ef._write_grade_files(job["graded_path"], job["result_path"], job["meta"], job["sel"], job["g"],
+                              job["summary"], job["submitted_at"], job["student_id"], job["student_name"],
+                              job["output_format"])
+        return job["student_id"], None
+    except Exception as e:
+        log_bgrade.debug(traceback.format_exc())
+        return job["student_id"], str(e)
+
+
+def grade_class(
+    exam_xlsx_path: str, answers_path: str, output_dir: str | None = None, db_path: str | None = None,
+    write_student_files: bool = True, max_workers: int | None = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT, use_warehouse: bool = True
+) -> dict:
+    """
+    반 전체 답안표를 한 번에 채점합니다.
+    use_warehouse 이면 반 전체 채점 행을 출력 폴더의 결과 저장소에 한 번에 추가합니다.
+    반환: {"summary_path", "students": 학생별 요약 DataFrame, "items": 문항별 정답률 DataFrame, "errors": [(student_id, 오류)]}
+    실패 시 {}
+    """
+    if not os.path.exists(exam_xlsx_path):
+        log_bgrade.error(f"파일을 찾을 수 없습니다: {exam_xlsx_path}")
+        return {}
+    try:
+        sheets = read_sheets(exam_xlsx_path, ["selected_problems", "meta"])
+        sel, meta = sheets["selected_problems"], sheets["meta"]
+    except Exception as e:
+        log_bgrade.error(f"파일 시트 읽기 실패. 'selected_problems'/'meta' 시트 필요. ({e})")
+        return {}
+    if meta.empty or not ef.GRADING_NEED_COLS <= set(sel.columns):
+        log_bgrade.error(f"메타 파일 형식 오류 (meta 시트 또는 selected_problems 필수 컬럼 {ef.GRADING_NEED_COLS} 확인)")
+        return {}
+
+    sel["problem_id"] = sel["problem_id"].astype(str)
+    sel["answer_num"] = normalize_answer_array(sel["answer"].to_numpy())
+    problem_ids = sel["problem_id"].tolist()
+    meta_row = meta.iloc[0]
+    exam_id, exam_name = str(meta_row.get("exam_id", "")), str(meta_row.get("exam_name", ""))
+    created_ts = str(meta_row.get("timestamp", ""))
+
+    try:
+        students, answers = load_answer_matrix(answers_path, problem_ids)
+    except Exception as e:
+        log_bgrade.error(f"답안표 읽기 실패: {e}")
+        return {}
+    n_students, n_items = answers.shape
+    log_bgrade.info(f"일괄 채점 시작 - 시험 ID: {exam_id}, 학생 {n_students}명 x 문항 {n_items}개")
+
+    # --- 채점 (학생 x 문항 한 번에) ---
+    key = sel["answer_num"].to_numpy(dtype=object)
+    keyed = key != ""
+    correct = ((answers == key[None, :]) & keyed[None, :]).astype(np.int8)
+    n_correct = correct.sum(axis=1).astype(np.int64)
+    scores = np.round(n_correct / n_items * 100, 2) if n_items else np.zeros(n_students)
+
+    theta = se = n_used = None
+    if db_path:
+        try:
+            scorer = get_theta_scorer(db_path)
+            X = np.where(keyed[None, :], correct, MISSING).astype(np.int8)
+            theta, se, n_used = scorer.score_matrix(X, item_ids=problem_ids)
+        except Exception as e:
+            log_bgrade.warning(f"능력치(theta) 추정 실패 ({e}). 추정값 없이 저장합니다.")
+
+    submitted_at = datetime.now(ef.KST).isoformat(timespec="seconds")
+    summary = pd.DataFrame({
+        "exam_id": exam_id, "exam_name": exam_name, "created_at": created_ts, "submitted_at": submitted_at,
+        "student_id": students["student_id"], "student_name": students["student_name"],
+        "total": n_items, "correct": n_correct, "score": scores,
+    })
+    if theta is not None:
+        summary["theta"], summary["theta_se"], summary["theta_n_items"] = np.round(theta, 4), np.round(se, 4), n_used
+
+    if output_dir is None: output_dir = os.path.dirname(exam_xlsx_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # --- 학생별 채점 파일 ---
+    errors = []
+    if write_student_files:
+        summary["graded_path"] = [output_path(os.path.join(output_dir, f"{sid}_{exam_id}_graded"), output_format)
+                                  for sid in summary["student_id"]]
+        summary["result_path"] = [output_path(os.path.join(output_dir, f"{sid}_{exam_id}_result"), output_format)
+                                  for sid in summary["student_id"]]
+        jobs = []
+        for i in range(n_students):
+            row = summary.iloc[i]
+            sid, sname = row["student_id"], row["student_name"]
+            g = sel.assign(student_answer_num=answers[i], is_correct=correct[i])
+            student_summary = summary.iloc[[i]].drop(columns=["graded_path", "result_path"]).reset_index(drop=True)
+            student_meta = meta.assign(student_id=sid, student_name=sname)
+            if theta is not None:
+                student_meta = student_meta.assign(theta=row["theta"], theta_se=row["theta_se"])
+            jobs.append({"graded_path": row["graded_path"], "result_path": row["result_path"], "meta": student_meta,
+                         "sel": sel, "g": g, "summary": student_summary, "submitted_at": submitted_at,
+                         "student_id": sid, "student_name": sname, "output_format": output_format})
+
+        if max_workers == 1 or len(jobs) < PARALLEL_MIN_STUDENTS:
+            results = [_write_student(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_write_student, jobs, chunksize=max(1, len(jobs) // 64)))
+        errors = [(sid, err) for sid, err in results if err is not None]
+        for sid, err in errors:
+            log_bgrade.error(f"{sid} 채점 파일 저장 실패: {err}")
+
+    # --- 결과 저장소 (학생 x 문항 행을 한 조각으로) ---
+    if use_warehouse:
+        sids = students["student_id"].to_numpy(dtype=object)
+        rows = pd.DataFrame({
+            "exam_id": exam_id, "student_id": np.repeat(sids, n_items), "seq": np.tile(np.arange(1, n_items + 1), n_students),
+            "problem_id": np.tile(sel["problem_id"].to_numpy(dtype=object), n_students),
+            "subject": np.tile(sel["subject"].to_numpy(dtype=object), n_students),
+            "problem_type": np.tile(sel["problem_type"].to_numpy(dtype=object), n_students),
+            "answer_num": np.tile(key, n_students), "student_answer_num": answers.ravel(),
+            "is_correct": correct.ravel(), "created_at": created_ts, "submitted_at": submitted_at,
+        }, columns=WAREHOUSE_COLUMNS)
+        append_grading_rows(output_dir, rows)
+
+    # --- 반 전체 요약 ---
+    answered = answers != ""
+    items = sel[["problem_id", "subject", "problem_type", "answer_num"]].rename(columns={"answer_num": "answer"})
+    items["n_answered"] = answered.sum(axis=0)
+    items["n_correct"] = correct.sum(axis=0)
+    items["accuracy(%)"] = np.round(items["n_correct"] / max(n_students, 1) * 100, 2)
+    for choice in _VALID_ANSWERS:
+        items[f"choice_{choice}(%)"] = np.round((answers == choice).sum(axis=0) / max(n_students, 1) * 100, 2)
+
+    subj_codes, subjects = pd.factorize(sel["subject"])
+    onehot = np.eye(len(subjects), dtype=np.int64)[subj_codes]           # (문항 x 과목)
+    by_subject = pd.DataFrame(correct.astype(np.int64) @ onehot / onehot.sum(axis=0) * 100,
+                              columns=[f"{s}(%)" for s in subjects]).round(2)
+    by_subject.insert(0, "student_id", summary["student_id"])
+    by_subject.insert(1, "student_name", summary["student_name"])
+
+    summary_path = os.path.join(output_dir, f"{exam_id}_class_summary.xlsx")
+    write_sheets(summary_path, {"students": summary, "items": items, "by_subject": by_subject, "meta": meta}, "xlsx")
+
+    log_bgrade.info(f"일괄 채점 완료: 학생 {n_students}명, 평균 {float(np.mean(scores)) if n_students else 0:.2f}점 ({summary_path})")
+    return {"summary_path": summary_path, "students": summary, "items": items, "errors": errors}
@@ -0,0 +1,221 @@
+# 컴퓨터 적응형 검사(CAT) 엔진입니다.
+# - CatItemPool: DB 문항마다 능력 격자(ThetaScorer 와 같은 81점) 위의 피셔 정보량 a^2 * P * (1 - P) 를 미리 계산해 둡니다.
+#   여러 세션이 같은 풀을 공유하며, 문항 선택은 현재 theta 에 가장 가까운 격자 행을 꺼내 곱하고 argmax 하는 것이 전부입니다.
+# - CatSession: 학생 한 명의 진행 상태 (출제 문항, 응답, theta / 표준오차).
+#   응답이 들어올 때마다 EAP 로 theta 를 다시 추정하고 다음 문항(또는 지문 묶음)을 고릅니다.
+#   취약 문제유형 / 취약 지문유형은 정보량에 가중치(boost)를 곱해 우선 출제합니다.
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from item_bank import ItemBank, get_item_bank
+from theta_estimation import ThetaScorer, get_theta_scorer
+
+# --- 로깅 설정 ---
+log_cat = logging.getLogger("cat_engine")
+
+CAT_MODES = ("testlet", "item")     # testlet: 지문 단위로 묶어 출제 / item: 문항 하나씩 출제
+CAT_MAX_ITEMS = 20
+CAT_MIN_ITEMS = 8
+CAT_SE_TARGET = 0.35                # 표준오차가 이 값 이하가 되면 (최소 문항 수 이후) 종료
+
+
+class CatItemPool:
+    """
+    적응형 검사에 쓸 문항 풀. 같은 문제id 는 한 번만, 모수가 유효한 문항만 포함합니다.
+    base_dir 를 주면 지문/문제 docx 가 모두 있는 문항만 남깁니다.
+    문항은 지문별로 연속되게 정렬되어 있습니다. (passage_items: 지문 x 문항 번호, 빈칸은 len(pool))
+    """
+
+    def __init__(self, bank: ItemBank, scorer: ThetaScorer, base_dir: str | None = None):
+        self.bank = bank
+        self.scorer = scorer
+        self.base_dir = base_dir
+
+        first = {}
+        for i, pid in enumerate(bank.problem_ids):
+            first.setdefault(pid, i)
+        rows = np.fromiter(first.values(), dtype=np.int64, count=len(first))
+        keep = np.append(scorer.valid, False)[scorer.index(bank.problem_ids[rows])] & (bank.passage_of_row[rows] != "")
+        if base_dir:
+            keep &= np.fromiter((os.path.exists(self.problem_path(bank.problem_ids[i])) and
+                                 os.path.exists(self.passage_path(bank.passage_of_row[i])) for i in rows),
+                                dtype=bool, count=len(rows))
+        rows = rows[keep]
+
+        # 지문별로 연속되게 (지문은 DB 첫 등장 순서, 지문 안에서는 DB 순서)
+        passage_codes, passage_ids = pd.factorize(bank.passage_of_row[rows])
+        order = np.argsort(passage_codes, kind="stable")
+        self.rows = rows[order]
+        self.passage_of = passage_codes[order].astype(np.int64)
+        self.passage_ids = np.asarray(passage_ids, dtype=object)
+        self.item_ids = bank.problem_ids[self.rows]
+        self.problem_types = bank.problem_types[self.rows]
+        self.answers = bank.answers[self.rows]
+        self.scorer_index = scorer.index(self.item_ids)
+
+        passage_type_of = dict(zip(bank.passage_ids, bank.passage_types))
+        self.passage_types = np.array([passage_type_of.get(p, "") for p in self.passage_ids], dtype=object)
+
+        n = len(self.rows)
+        counts = np.bincount(self.passage_of, minlength=len(self.passage_ids))
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        width = int(counts.max()) if n else 0
+        self.passage_items = np.full((len(self.passage_ids), width), n, dtype=np.int64)
+        within = np.arange(n) - starts[self.passage_of]
+        self.passage_items[self.passage_of, within] = np.arange(n)
+
+        # 정보량 표 (격자점 x 문항)
+        self.nodes = scorer.nodes
+        self._step = float(self.nodes[1] - self.nodes[0])
+        a, b = bank.item_params(self.item_ids)
+        p = 1.0 / (1.0 + np.exp(-a[None, :] * (self.nodes[:, None] - b[None, :])))
+        self.info = np.ascontiguousarray(a[None, :] ** 2 * p * (1.0 - p))
+        log_cat.info(f"CAT 문항 풀 준비: 문항 {n}개, 지문 {len(self.passage_ids)}개")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def grid_index(self, theta: float) -> int:
+        """theta 에 가장 가까운 격자점 번호"""
+        q = int(round((theta - self.nodes[0]) / self._step))
+        return min(max(q, 0), len(self.nodes) - 1)
+
+    def passage_path(self, passage_id) -> str:
+        return os.path.join(self.base_dir or "", "지문", f"{passage_id}.docx")
+
+    def problem_path(self, problem_id) -> str:
+        return os.path.join(self.base_dir or "", "문제", f"{problem_id}.docx")
+
+    def record(self, j: int) -> dict:
+        """메타 파일(selected_problems 시트)용 문항 레코드"""
+        return self.bank.problem_record(int(self.rows[j]))
+
+
+_POOL_CACHE: dict[tuple, tuple[object, CatItemPool]] = {}
+
+
+def get_cat_pool(db_path: str, base_dir: str | None = None) -> CatItemPool:
+    """CatItemPool 을 반환합니다. DB 파일이 바뀌지 않으면 프로세스 안의 모든 세션이 같은 풀을 공유합니다."""
+    scorer = get_theta_scorer(db_path)
+    bank = get_item_bank(db_path)
+    key = (bank.source, os.path.abspath(base_dir) if base_dir else None)
+    cached = _POOL_CACHE.get(key)
+    if cached and cached[0] is scorer:
+        return cached[1]
+    pool = CatItemPool(bank, scorer, base_dir)
+    _POOL_CACHE[key] = (scorer, pool)
+    return pool
+
+
+class CatSession:
+    """
+    학생 한 명의 적응형 검사 진행 상태.
+    next_items() 로 다음 문항(들)을 받고, answer() 로 응답을 넣으면 theta 가 갱신됩니다.
+    """
+
+    def __init__(
+        self, pool: CatItemPool, weak_passage_set=(), weak_problem_set=(), mode: str = "testlet",
+        items_per_passage: int = 4, max_items: int = CAT_MAX_ITEMS, min_items: int = CAT_MIN_ITEMS,
+        se_target: float = CAT_SE_TARGET, weak_problem_boost: float = 1.5, weak_passage_boost: float = 1.5,
+        start_theta: float = 0.0
+    ):
+        if mode not in CAT_MODES:
+            raise ValueError(f"알 수 없는 CAT 모드: {mode} (가능: {', '.join(CAT_MODES)})")
+        self.pool = pool
+        self.mode = mode
+        self.items_per_passage = items_per_passage
+        self.max_items, self.min_items, self.se_target = max_items, min_items, se_target
+
+        self.boost = np.where(np.isin(pool.problem_types, [str(x) for x in weak_problem_set]), weak_problem_boost, 1.0)
+        self.passage_boost = np.where(np.isin(pool.passage_types, [str(x) for x in weak_passage_set]),
+                                      weak_passage_boost, 1.0)
+        self.available = np.ones(len(pool), dtype=bool)
+
+        self.administered: list[int] = []       # 풀 안의 문항 번호 (출제 순서)
+        self.responses: list[int] = []          # 1 = 정답, 0 = 오답/무응답
+        self.submitted: list[str] = []          # 학생이 고른 번호 ("" = 무응답)
+        self.pending: list[int] = []
+        self.start_theta = float(start_theta)
+        self.theta, self.se = self.start_theta, None
+        self.history: list[dict] = []
+
+    @property
+    def n_items(self) -> int:
+        return len(self.administered)
+
+    @property
+    def finished(self) -> bool:
+        if self.pending:
+            return False
+        if self.n_items >= self.max_items or not self.available.any():
+            return True
+        return self.n_items >= self.min_items and self.se is not None and self.se <= self.se_target
+
+    def next_items(self) -> list[int]:
+        """다음에 출제할 풀 문항 번호 목록 (item 모드: 1개, testlet 모드: 한 지문의 문항들). 끝났으면 []"""
+        if self.pending:
+            return self.pending
+        if self.finished:
+            return []
+        score = self.pool.info[self.pool.grid_index(self.theta)] * self.boost
+        score[~self.available] = -np.inf
+        budget = self.max_items - self.n_items
+
+        if self.mode == "item":
+            # 문항 하나씩 고를 때도 그 문항이 속한 지문의 가중치를 곱합니다.
+            score = score * self.passage_boost[self.pool.passage_of]
+            j = int(np.argmax(score))
+            picked = [j] if np.isfinite(score[j]) else []
+        else:
+            # 지문 점수 = 남은 문항 중 정보량 상위 k 개의 합 x 지문 가중치
+            k = min(self.items_per_passage, budget)
+            ext = np.append(score, -np.inf)[self.pool.passage_items]
+            top = -np.sort(-ext, axis=1)[:, :k]
+            passage_score = np.where(np.isfinite(top), top, 0.0).sum(axis=1) * self.passage_boost
+            passage_score[~np.isfinite(top[:, 0])] = -np.inf
+            p = int(np.argmax(passage_score))
+            if not np.isfinite(passage_score[p]):
+                picked = []
+            else:
+                cand = self.pool.passage_items[p]
+                cand = cand[cand < len(self.pool)]
+                self.available[cand] = False          # 지문은 한 번만 출제
+                cand = cand[np.isfinite(score[cand])]
+                picked = sorted(cand[np.argsort(-score[cand], kind="stable")[:k]].tolist())
+
+        self.available[picked] = False
+        self.pending = picked
+        return picked
+
+    def answer(self, choices) -> list[bool]:
+        """
+        출제 중인 문항의 응답을 넣습니다. choices: 문항 순서대로의 선택 번호 목록 또는 {풀 문항 번호: 선택 번호}
+        반환: 문항별 정답 여부
+        """
+        if isinstance(choices, dict):
+            choices = [choices.get(j, "") for j in self.pending]
+        results = []
+        for j, choice in zip(self.pending, choices):
+            choice = "" if choice is None else str(choice).strip()
+            correct = bool(choice) and self.pool.answers[j] != 0 and choice == str(int(self.pool.answers[j]))
+            self.administered.append(j)
+            self.submitted.append(choice)
+            self.responses.append(int(correct))
+            results.append(correct)
+        self.pending = []
+
+        idx = self.pool.scorer_index[self.administered]
+        theta, se, _ = self.pool.scorer.score_long(np.zeros(len(idx), dtype=np.int64), idx, self.responses, 1)
+        self.theta, self.se = float(theta[0]), float(se[0])
+        self.history.append({"n_items": self.n_items, "theta": round(self.theta, 4), "theta_se": round(self.se, 4)})
+        return results
+
+    def records(self) -> list[dict]:
+        """출제된 문항 레코드 (출제 순서, 메타 파일용)"""
+        return [self.pool.record(j) for j in self.administered]
+
+    def answer_map(self) -> dict[str, str]:
+        """{문제id: 학생 선택 번호} (grade_exam 의 answers 인자 형식)"""
+        return {str(self.pool.item_ids[j]): c for j, c in zip(self.administered, self.submitted)}
@@ -0,0 +1,190 @@
+# 여러 학생의 채점 결과(..._graded.xlsx)를 한 곳에 모아 두는 저장소입니다. (SQLite)
+# - graded_files: 채점 파일별 시험 요약 (경로, mtime/크기, 시험/학생 ID, 제출 시각, 점수)
+# - graded_items: 채점 파일별 문항 결과 (문제id, 제출 답, 정답 여부, 과목, 문제유형)
+# 반 전체 대시보드를 만들 때 파일 수천 개를 매번 열지 않도록, 새로 생기거나 바뀐 파일만 읽어 반영합니다.
+# 조회는 학생 / 제출 날짜 범위로 거른 두 개의 DataFrame(시험 요약, 문항 결과)으로 돌려줍니다.
+import os
+import sqlite3
+import logging
+from datetime import datetime
+import pandas as pd
+
+from graded_reader import read_graded_files, SOURCE_COL
+from output_writers import find_outputs
+
+# --- 로깅 설정 ---
+log_cohort = logging.getLogger("cohort_store")
+
+COHORT_STORE_NAME = "cohort_results.sqlite"
+SUMMARY_COLS = ["exam_id", "student_id", "student_name", "submitted_at", "total", "correct", "score"]
+ITEM_COLS = ["problem_id", "student_answer_num", "is_correct", "subject", "problem_type"]
+COHORT_COLUMNS = {"summary": SUMMARY_COLS, "grading": ITEM_COLS}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graded_files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER, size INTEGER,
+    exam_id TEXT, student_id TEXT, student_name TEXT,
+    submitted_at TEXT,
+    total INTEGER, correct INTEGER, score REAL,
+    ingested_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_graded_student ON graded_files (student_id);
+CREATE INDEX IF NOT EXISTS ix_graded_submitted ON graded_files (submitted_at);
+CREATE TABLE IF NOT EXISTS graded_items (
+    file_id INTEGER NOT NULL REFERENCES graded_files (file_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    problem_id TEXT NOT NULL,
+    student_answer_num TEXT,
+    is_correct INTEGER NOT NULL,
+    subject TEXT, problem_type TEXT,
+    PRIMARY KEY (file_id, seq)
+);
+"""
+
+
+def _text(v):
+    """엑셀에서 숫자로 읽힌 ID / 답 번호를 문자열로 (3.0 -> '3', 빈 값 -> None)"""
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _number(v, cast):
+    try:
+        return None if pd.isna(v) else cast(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class CohortStore:
+    """채점 결과 모음 저장소"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 반영 ---
+    def _stamps(self) -> dict[str, tuple]:
+        return {path: (mtime_ns, size) for path, mtime_ns, size
+                in self.conn.execute("SELECT path, mtime_ns, size FROM graded_files")}
+
+    def _ingest(self, path: str, st, summary: pd.DataFrame, grading: pd.DataFrame, now: str) -> None:
+        s = summary.iloc[0] if not summary.empty else pd.Series(dtype=object)
+        g = grading.reindex(columns=ITEM_COLS)
+        self.conn.execute("DELETE FROM graded_files WHERE path = ?", (path,))
+        cur = self.conn.execute(
+            """INSERT INTO graded_files (path, mtime_ns, size, exam_id, student_id, student_name, submitted_at,
+                                         total, correct, score, ingested_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (path, st.st_mtime_ns, st.st_size, _text(s.get("exam_id")), _text(s.get("student_id")),
+             _text(s.get("student_name")), _text(s.get("submitted_at")),
+             _number(s.get("total"), int), _number(s.get("correct"), int), _number(s.get("score"), float), now))
+        file_id = cur.lastrowid
+        self.conn.executemany(
+            """INSERT INTO graded_items (file_id, seq, problem_id, student_answer_num, is_correct, subject, problem_type)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(file_id, seq, _text(pid), _text(ans), int(ok) if _number(ok, int) is not None else 0, _text(subj), _text(ptype))
+             for seq, (pid, ans, ok, subj, ptype) in enumerate(g.itertuples(index=False, name=None))
+             if _text(pid) is not None])
+
+    def sync_dir(
+        self, graded_dir: str, pattern: str = "*_graded", max_workers: int | None = None
+    ) -> tuple[int, int, list[tuple[str, str]]]:
+        """
+        폴더의 채점 파일과 저장소를 맞춥니다. (pattern: 확장자 제외, 모든 출력 형식)
+        새로 생기거나 mtime/크기가 바뀐 파일만 graded_reader 로 한꺼번에(병렬로) 읽고,
+        폴더에서 사라진 파일의 결과는 지웁니다.
+        반환: (새로 반영한 파일 수, 지운 파일 수, [(파일, 오류 메시지)])
+        """
+        graded_dir = os.path.abspath(graded_dir)
+        stamps = self._stamps()
+        found, pending, errors = set(), [], []
+        for path in find_outputs(graded_dir, pattern):
+            path = os.path.abspath(path)
+            found.add(path)
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                errors.append((path, str(e)))
+                continue
+            if stamps.get(path) != (st.st_mtime_ns, st.st_size):
+                pending.append((path, st))
+
+        removed = [p for p in stamps if os.path.dirname(p) == graded_dir and p not in found and not os.path.exists(p)]
+        with self.conn:
+            self.conn.executemany("DELETE FROM graded_files WHERE path = ?", [(p,) for p in removed])
+        if not pending:
+            return 0, len(removed), errors
+
+        frames, read_errors = read_graded_files([p for p, _ in pending], ["summary", "grading"],
+                                                columns=COHORT_COLUMNS, max_workers=max_workers)
+        errors.extend(read_errors)
+        failed = {path for path, _ in read_errors}
+        summaries = {path: df for path, df in frames["summary"].groupby(SOURCE_COL, sort=False)}
+        gradings = {path: df for path, df in frames["grading"].groupby(SOURCE_COL, sort=False)}
+        empty = pd.DataFrame(columns=ITEM_COLS)
+
+        now = datetime.now().isoformat(timespec="seconds")
+        n_new = 0
+        with self.conn:
+            for path, st in pending:
+                if path in failed:
+                    continue
+                self._ingest(path, st, summaries.get(path, empty), gradings.get(path, empty), now)
+                n_new += 1
+        log_cohort.info(f"채점 결과 반영: 새 파일 {n_new}개, 삭제 {len(removed)}개, 오류 {len(errors)}개 ({graded_dir})")
+        return n_new, len(removed), errors
+
+    # --- 조회 ---
+    def _where(self, student_ids=None, date_from=None, date_to=None, graded_dir=None) -> tuple[str, list]:
+        """학생 / 제출 날짜(YYYY-MM-DD, 양 끝 포함) / 폴더 조건"""
+        conds, params = [], []
+        if student_ids is not None:
+            ids = [str(s) for s in student_ids]
+            conds.append(f"f.student_id IN ({','.join('?' * len(ids)) or 'NULL'})")
+            params.extend(ids)
+        if date_from:
+            conds.append("substr(f.submitted_at, 1, 10) >= ?")
+            params.append(str(date_from)[:10])
+        if date_to:
+            conds.append("substr(f.submitted_at, 1, 10) <= ?")
+            params.append(str(date_to)[:10])
+        if graded_dir:
+            prefix = os.path.join(os.path.abspath(graded_dir), "")
+            conds.append("substr(f.path, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+    def exams(self, student_ids=None, date_from=None, date_to=None, graded_dir=None) -> pd.DataFrame:
+        """시험(채점 파일)별 요약: file_id, path, exam_id, student_id, student_name, submitted_at, total, correct, score"""
+        where, params = self._where(student_ids, date_from, date_to, graded_dir)
+        return pd.read_sql_query(
+            f"""SELECT f.file_id, f.path, f.exam_id, f.student_id, f.student_name, f.submitted_at, f.total, f.correct, f.score
+                FROM graded_files f{where} ORDER BY f.student_id, f.submitted_at, f.exam_id""",
+            self.conn, params=params)
+
+    def items(self, student_ids=None, date_from=None, date_to=None, graded_dir=None) -> pd.DataFrame:
+        """문항 결과: file_id, exam_id, student_id, problem_id, student_answer_num, is_correct, subject, problem_type"""
+        where, params = self._where(student_ids, date_from, date_to, graded_dir)
+        return pd.read_sql_query(
+            f"""SELECT i.file_id, f.exam_id, f.student_id, i.problem_id, i.student_answer_num, i.is_correct, i.subject, i.problem_type
+                FROM graded_items i JOIN graded_files f ON f.file_id = i.file_id{where}
+                ORDER BY i.file_id, i.seq""",
+            self.conn, params=params)
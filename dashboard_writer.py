@@ -0,0 +1,218 @@
+# 대시보드 엑셀 파일을 쓰는 도구입니다.
+# 차트/요약 칸처럼 작은 부분은 openpyxl 로 만들고, 행이 많은 표는 값을 셀 객체 없이 XML 로 바로 흘려 씁니다.
+# - prepare_frame_sheet: 표 시트의 머리글 / 열 너비 / 틀 고정만 openpyxl 로 준비 (열 너비는 열 단위 벡터 연산)
+# - add_answer_highlight: 정답/오답/선지 하이라이트를 셀 서식 대신 조건부 서식 규칙으로 추가 (행 수와 관계없이 규칙 수 일정)
+# - add_heatmap: 정답률 표에 0~100 색 눈금(빨강-노랑-초록) 조건부 서식 추가
+# - save_workbook: openpyxl 로 저장한 뒤 표 시트의 2행부터 DataFrame 값을 열 단위로 만든 XML 로 이어 씀 (스트리밍)
+# 서식은 통합 문서에 한 번 등록한 이름 있는 스타일(NamedStyle)을 공유합니다.
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from openpyxl.cell import Cell
+from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.formatting.rule import Rule, ColorScaleRule
+from openpyxl.utils import get_column_letter
+
+# --- 스타일 정의 ---
+GREEN_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+RED_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+RED_FONT = Font(color="9C0006", bold=True)
+GREEN_FONT = Font(color="006100", bold=True)
+BOLD_FONT = Font(bold=True)
+HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center')
+HEATMAP_COLORS = ("F8696B", "FFEB84", "63BE7B")    # 정답률 0% / 50% / 100%
+
+# 통합 문서에 등록하는 이름 있는 스타일 (셀은 이름만 참조)
+STYLE_HEADER = "dash_header"        # 표 머리글
+STYLE_CENTER = "dash_center"        # 숫자 칸
+_NAMED_STYLES = {
+    STYLE_HEADER: dict(font=BOLD_FONT, fill=HEADER_FILL, alignment=CENTER_ALIGN),
+    STYLE_CENTER: dict(alignment=CENTER_ALIGN),
+}
+
+MIN_COL_WIDTH = 12
+MAX_COL_WIDTH = 30
+CHUNK_ROWS = 5000                   # 한 번에 XML 로 만들어 쓰는 행 수
+
+_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+       "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+       "pr": "http://schemas.openxmlformats.org/package/2006/relationships"}
+_RE_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def register_styles(wb) -> None:
+    """이름 있는 스타일을 통합 문서에 등록합니다. (이미 있으면 건너뜀)"""
+    for name, attrs in _NAMED_STYLES.items():
+        if name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=name, **attrs))
+
+
+def _style_id(ws, style: str) -> int:
+    """이름 있는 스타일의 셀 서식 번호 (XML 의 s 속성)"""
+    cell = Cell(ws)             # 시트에 넣지 않는 임시 셀: 서식 번호만 통합 문서에 등록
+    cell.style = style
+    return cell.style_id
+
+
+def _numeric_cols(df: pd.DataFrame) -> list[bool]:
+    return [pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) for _, s in df.items()]
+
+
+def column_widths(df: pd.DataFrame, scale: float = 1.1) -> list[float]:
+    """열 이름과 값의 최대 글자 수로 열 너비를 구합니다. (열 단위 벡터 연산)"""
+    widths = []
+    for (col, s), is_num in zip(df.items(), _numeric_cols(df)):
+        if s.dropna().empty:
+            n = 3
+        elif is_num:
+            # 숫자 열은 표시될 문자열(_column_text)의 길이
+            n = int(pd.Series(_number_text(s.to_numpy(dtype="float64", na_value=np.nan))).str.len().max())
+        else:
+            n = int(s.astype(str).str.len().max())
+        width = max(len(str(col)), n) * scale
+        widths.append(min(max(width, MIN_COL_WIDTH), MAX_COL_WIDTH))
+    return widths
+
+
+def prepare_frame_sheet(ws, df: pd.DataFrame, freeze_header: bool = True) -> None:
+    """
+    save_workbook 으로 DataFrame 을 쓸 시트의 머리글(1행, STYLE_HEADER), 열 너비, 틀 고정을 정합니다.
+    데이터 행(2행부터)은 save_workbook 이 저장할 때 씁니다.
+    """
+    register_styles(ws.parent)
+    for i, (col, width) in enumerate(zip(df.columns, column_widths(df)), 1):
+        cell = ws.cell(row=1, column=i, value=str(col))
+        cell.style = STYLE_HEADER
+        ws.column_dimensions[get_column_letter(i)].width = width
+    if freeze_header:
+        ws.freeze_panes = "A2"
+
+
+def add_rule(ws, cell_range: str, formula: str, fill=None, font=None) -> None:
+    """조건식이 참인 칸에 서식을 입히는 조건부 서식 규칙 (먼저 추가한 규칙이 우선)"""
+    rule = Rule(type="expression", dxf=DifferentialStyle(fill=fill, font=font), formula=[formula])
+    ws.conditional_formatting.add(cell_range, rule)
+
+
+def add_answer_highlight(ws, columns: list, n_rows: int, distractor_cols: dict,
+                         answer_col: str = "정답", student_col: str = "제출 답안", correct_col: str = "정답 여부") -> None:
+    """
+    상세 성적 표(2행부터 n_rows 행)의 하이라이트를 조건부 서식으로 추가합니다.
+    - 틀린 문제 행 전체: 빨간 배경 (가장 우선)
+    - 정답 선지 칸: 초록 배경
+    - 학생이 고른 선지 칸: 맞으면 초록 굵은 글씨, 틀리면 빨간 굵은 글씨
+    distractor_cols: {"1": 열 이름, ...} 선지 번호 -> 선지정답률 열
+    정답/제출 답안은 숫자든 문자든 같게 비교하도록 문자열로 바꿔 비교합니다.
+    """
+    if n_rows <= 0:
+        return
+    letter = {c: get_column_letter(i) for i, c in enumerate(columns, 1)}
+    last_row = n_rows + 1
+    ans, stu, ok = f"${letter[answer_col]}2", f"${letter[student_col]}2", f"${letter[correct_col]}2"
+
+    add_rule(ws, f"A2:{get_column_letter(len(columns))}{last_row}", f"{ok}=0", fill=RED_FILL)
+    for choice, col in distractor_cols.items():
+        rng = f"{letter[col]}2:{letter[col]}{last_row}"
+        add_rule(ws, rng, f'{ans}&""="{choice}"', fill=GREEN_FILL)
+        add_rule(ws, rng, f'AND({stu}&""="{choice}",{ok}=1)', font=GREEN_FONT)
+        add_rule(ws, rng, f'AND({stu}&""="{choice}",{ok}<>1)', font=RED_FONT)
+
+
+def add_heatmap(ws, first_col: int, last_col: int, n_rows: int, low: float = 0, high: float = 100) -> None:
+    """표(2행부터 n_rows 행)의 first_col~last_col 열에 low~high 색 눈금을 입힙니다. (빈 칸은 색 없음)"""
+    if n_rows <= 0 or last_col < first_col:
+        return
+    lo, mid, hi = HEATMAP_COLORS
+    rng = f"{get_column_letter(first_col)}2:{get_column_letter(last_col)}{n_rows + 1}"
+    ws.conditional_formatting.add(rng, ColorScaleRule(
+        start_type="num", start_value=low, start_color=lo,
+        mid_type="num", mid_value=(low + high) / 2, mid_color=mid,
+        end_type="num", end_value=high, end_color=hi))
+
+
+# ---------- 표 데이터 XML ----------
+def _number_text(arr: np.ndarray) -> np.ndarray:
+    """숫자 배열 -> XML 값 문자열 (정수 값은 정수로, 빈 값/무한대는 빈 문자열)"""
+    out = np.full(arr.shape, "", dtype=object)
+    finite = np.isfinite(arr)
+    is_int = finite & (arr == np.floor(arr)) & (np.abs(arr) < 2 ** 53)
+    out[is_int] = arr[is_int].astype(np.int64).astype(str)
+    rest = finite & ~is_int
+    out[rest] = [repr(float(v)) for v in arr[rest]]
+    return out
+
+
+def _column_cells(letter: str, s: pd.Series, rows: list[str], style: str) -> list[str]:
+    """열 하나를 <c> 요소 문자열 목록으로 (빈 값은 빈 문자열 = 칸 생략)"""
+    if pd.api.types.is_bool_dtype(s):
+        vals = s.astype(object).to_numpy()
+        return ["" if v is None or v is pd.NA else f'<c r="{letter}{r}"{style} t="b"><v>{int(v)}</v></c>'
+                for r, v in zip(rows, vals)]
+    if pd.api.types.is_numeric_dtype(s):
+        text = _number_text(s.to_numpy(dtype="float64", na_value=np.nan))
+        return [f'<c r="{letter}{r}"{style}><v>{t}</v></c>' if t else "" for r, t in zip(rows, text)]
+    vals = s.astype(object).where(s.notna(), None).to_numpy()
+    return ["" if v is None else
+            f'<c r="{letter}{r}" t="inlineStr"><is><t xml:space="preserve">'
+            f'{escape(_RE_ILLEGAL_XML.sub("", str(v)))}</t></is></c>'
+            for r, v in zip(rows, vals)]
+
+
+def _frame_rows_xml(df: pd.DataFrame, center_style: int, start_row: int = 2):
+    """DataFrame 을 CHUNK_ROWS 행씩 <row> XML 바이트로 만들어 내보냅니다. (숫자 칸은 center_style 서식)"""
+    letters = [get_column_letter(i) for i in range(1, df.shape[1] + 1)]
+    numeric = _numeric_cols(df)
+    for lo in range(0, len(df), CHUNK_ROWS):
+        part = df.iloc[lo:lo + CHUNK_ROWS]
+        rows = [str(r) for r in range(start_row + lo, start_row + lo + len(part))]
+        cols = [_column_cells(letter, part.iloc[:, j], rows, f' s="{center_style}"' if numeric[j] else "")
+                for j, letter in enumerate(letters)]
+        yield "".join(f'<row r="{r}">{"".join(cells)}</row>' for r, *cells in zip(rows, *cols)).encode("utf-8")
+
+
+def _sheet_parts(zin: zipfile.ZipFile) -> dict[str, str]:
+    """시트 이름 -> 통합 문서 안의 XML 파일 경로"""
+    workbook = ET.fromstring(zin.read("xl/workbook.xml"))
+    rels = ET.fromstring(zin.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("pr:Relationship", _NS)}
+    parts = {}
+    for sheet in workbook.find("m:sheets", _NS):
+        target = targets[sheet.get(f"{{{_NS['r']}}}id")]
+        parts[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return parts
+
+
+def save_workbook(wb, path: str, frames: dict[str, pd.DataFrame] | None = None) -> None:
+    """
+    wb 를 path 에 저장합니다.
+    frames 의 시트(prepare_frame_sheet 로 머리글만 만든 시트)에는 2행부터 DataFrame 값을 XML 로 바로 씁니다.
+    """
+    frames = frames or {}
+    center_styles = {name: _style_id(wb[name], STYLE_CENTER) for name in frames}
+    buf = io.BytesIO()
+    wb.save(buf)
+    with zipfile.ZipFile(buf) as zin, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zout:
+        parts = {part: name for name, part in _sheet_parts(zin).items() if name in frames}
+        for info in zin.infolist():
+            data = zin.read(info.filename)
+            name = parts.get(info.filename)
+            if name is None:
+                zout.writestr(info, data)
+                continue
+            df = frames[name]
+            xml = data.decode("utf-8")
+            if df.shape[1]:
+                last = f"{get_column_letter(df.shape[1])}{len(df) + 1}"
+                xml = re.sub(r'<dimension ref="[^"]*"\s*/>', f'<dimension ref="A1:{last}"/>', xml, count=1)
+            head, tail = xml.split("</sheetData>", 1)
+            with zout.open(info.filename, "w") as f:
+                f.write(head.encode("utf-8"))
+                for chunk in _frame_rows_xml(df, center_styles[name]):
+                    f.write(chunk)
+                f.write(("</sheetData>" + tail).encode("utf-8"))
@@ -0,0 +1,702 @@
+# Word(COM) 없이 지문/문제 .docx 를 XML/zip 수준에서 병합해 시험지를 만드는 엔진입니다.
+# - 첫 번째 원본 문서의 패키지(테마, 글꼴표, 설정, 기본 스타일)를 뼈대로 사용합니다.
+# - 각 원본의 본문(w:body)을 이어 붙이면서 스타일/번호매기기/관계(rId)/이미지를 새 문서 기준으로 재매핑합니다.
+# - 같은 styleId 라도 정의가 다르면 접미사를 붙여 분리하므로 원본 서식이 유지됩니다.
+import os
+import re
+import sys
+import pickle
+import zipfile
+import hashlib
+import logging
+import posixpath
+import threading
+from collections import OrderedDict
+from xml.sax.saxutils import escape, unescape
+
+# --- 로깅 설정 ---
+log_docx = logging.getLogger("docx_assembler")
+
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_BASE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+CT_DOCUMENT = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+CT_NUMBERING = "application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"
+CT_STYLES = "application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"
+
+# 뼈대 문서에서 그대로 유지할 관계 유형 (그 외 본문 관계는 조각별로 다시 연결)
+STRUCTURAL_REL_TYPES = {REL_BASE + t for t in
+                        ("styles", "settings", "webSettings", "fontTable", "theme", "footnotes", "endnotes", "customXml")}
+
+IMAGE_CONTENT_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif",
+                       ".bmp": "image/bmp", ".emf": "image/x-emf", ".wmf": "image/x-wmf", ".tif": "image/tiff",
+                       ".tiff": "image/tiff"}
+
+# 시험지 전용 스타일 (COM 엔진의 ensure_style 과 동일한 값)
+EXAM_STYLES = [
+    # (styleId, 표시 이름, 글꼴, 크기(pt), 굵게, 정렬, 단락 뒤 간격(pt))
+    ("ExamTitle", "제목", "학교안심 바른바탕 B", 24, True, "center", 12),
+    ("ExamSubtitle", "소제목", "학교안심 바른바탕 R", 16, False, "left", 6),
+    ("ExamItem", "문항", "학교안심 바른바탕 R", 11, False, "left", 6),
+]
+EXAM_STYLE_IDS = {name: sid for sid, name, *_ in EXAM_STYLES}
+
+PAGE_W, PAGE_H = 11906, 16838   # A4 (twip)
+MARGIN_TWIPS = 850              # 1.5cm
+COLUMN_SPACE_TWIPS = 720
+
+_RE_ROOT = re.compile(r"<w:document\b([^>]*)>")
+_RE_NUMBERING_ROOT = re.compile(r"<w:numbering\b([^>]*)>")
+_RE_XMLNS = re.compile(r'\sxmlns:(\w+)="([^"]*)"')
+_RE_IGNORABLE = re.compile(r'\bmc:Ignorable="([^"]*)"')
+_RE_BODY_OPEN = re.compile(r"<w:body\b[^>]*>")
+_RE_SECTPR = re.compile(r"<w:sectPr\b[^>]*?(?:/>|>.*?</w:sectPr>)", re.S)
+_RE_STYLE = re.compile(r"<w:style\b[^>]*?(?:/>|>.*?</w:style>)", re.S)
+_RE_STYLE_ID = re.compile(r'\bw:styleId="([^"]*)"')
+_RE_STYLE_TYPE = re.compile(r'\bw:type="(\w+)"')
+_RE_STYLE_NAME = re.compile(r'(<w:name\b[^>]*?\bw:val=")([^"]*)(")')
+_RE_STYLE_DEFAULT = re.compile(r'\sw:default="(?:1|true|on)"')
+_RE_STYLE_REF = re.compile(r'(<w:(?:pStyle|rStyle|tblStyle|basedOn|link|next|numStyleLink|styleLink)\b[^>]*?\bw:val=")([^"]*)(")')
+_RE_BODY_STYLE_REF = re.compile(r'<w:(?:pStyle|rStyle|tblStyle)\b[^>]*?\bw:val="([^"]*)"')
+_RE_NUM_ID_REF = re.compile(r'(<w:numId\b[^>]*?\bw:val=")(\d+)(")')
+_RE_ABSTRACT_NUM = re.compile(r"<w:abstractNum\b.*?</w:abstractNum>", re.S)
+_RE_ABSTRACT_NUM_ID = re.compile(r'(<w:abstractNum\b[^>]*?\bw:abstractNumId=")(\d+)(")')
+_RE_NUM = re.compile(r"<w:num\b[^>]*?\bw:numId=\"(\d+)\"[^>]*>.*?</w:num>", re.S)
+_RE_NUM_OPEN_ID = re.compile(r'(<w:num\b[^>]*?\bw:numId=")(\d+)(")')
+_RE_NUM_ABSTRACT_REF = re.compile(r'(<w:abstractNumId\b[^>]*?\bw:val=")(\d+)(")')
+_RE_NSID = re.compile(r'(<w:nsid\b[^>]*?\bw:val=")([0-9A-Fa-f]+)(")')
+_RE_REL = re.compile(r"<Relationship\b([^>]*?)/?>")
+_RE_ATTR = re.compile(r'(\w+)="([^"]*)"')
+_RE_REL_REF = re.compile(r'(\sr:(?:embed|id|link|pict|href)=")([^"]*)(")')
+_RE_BOOKMARK_ID = re.compile(r'(<w:bookmark(?:Start|End)\b[^>]*?\bw:id=")(\d+)(")')
+_RE_DOCPR_ID = re.compile(r'(<wp:docPr\b[^>]*?\bid=")(\d+)(")')
+_RE_W14_IDS = re.compile(r'\sw14:(?:paraId|textId)="[^"]*"')
+_RE_PARA_OPEN = re.compile(r"<w:p(?:\s[^>]*?)?(?<!/)>(?:<w:pPr>.*?</w:pPr>|<w:pPr/>)?", re.S)
+_RE_CT_DEFAULT = re.compile(r'<Default\b[^>]*?Extension="([^"]*)"[^>]*?ContentType="([^"]*)"')
+_RE_CT_OVERRIDE = re.compile(r'<Override\b[^>]*?PartName="([^"]*)"[^>]*?ContentType="([^"]*)"')
+
+
+# ---------- 원본 docx 파싱 ----------
+def _read_package(path: str) -> dict[str, bytes]:
+    """zip 패키지의 파트를 읽습니다. (일부 원본은 경로 구분자로 '\\' 를 사용하므로 '/' 로 정규화)"""
+    with zipfile.ZipFile(path) as z:
+        return {name.replace("\\", "/").lstrip("/"): z.read(name) for name in z.namelist()}
+
+
+def _parse_rels(xml: str) -> dict[str, dict]:
+    rels = {}
+    for m in _RE_REL.finditer(xml):
+        attrs = dict(_RE_ATTR.findall(m.group(1)))
+        if "Id" in attrs:
+            rels[attrs["Id"]] = {"type": attrs.get("Type", ""), "target": attrs.get("Target", ""),
+                                 "mode": attrs.get("TargetMode")}
+    return rels
+
+
+def _parse_content_types(xml: str) -> tuple[dict[str, str], dict[str, str]]:
+    defaults = {ext.lower(): ct for ext, ct in _RE_CT_DEFAULT.findall(xml)}
+    overrides = {name.lstrip("/"): ct for name, ct in _RE_CT_OVERRIDE.findall(xml)}
+    return defaults, overrides
+
+
+def _resolve_target(target: str, base: str = "word") -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base, target))
+
+
+def _style_refs(style_xml: str) -> list[str]:
+    return [m.group(2) for m in _RE_STYLE_REF.finditer(style_xml)]
+
+
+def _style_key(styles: dict, sid: str, seen: set | None = None) -> str:
+    """스타일 정의 + 상속/연결 스타일 정의까지 포함한 식별 해시"""
+    seen = seen if seen is not None else set()
+    seen.add(sid)
+    h = hashlib.sha1(_RE_STYLE_DEFAULT.sub("", styles.get(sid, "")).encode("utf-8"))
+    for ref in sorted(set(_style_refs(styles.get(sid, "")))):
+        if ref not in seen and ref in styles:
+            h.update(_style_key(styles, ref, seen).encode("ascii"))
+    return h.hexdigest()
+
+
+def parse_docx_fragment(path: str) -> dict:
+    """
+    .docx 한 개를 병합 가능한 조각(fragment)으로 파싱합니다.
+    반환값: body(구역 설정 제거된 본문 XML), 네임스페이스, 스타일/번호매기기 정의, 관계, 파트(바이트)
+    """
+    parts = _read_package(path)
+    doc_xml = parts["word/document.xml"].decode("utf-8")
+
+    root = _RE_ROOT.search(doc_xml)
+    root_attrs = root.group(1) if root else ""
+    namespaces = dict(_RE_XMLNS.findall(root_attrs))
+    ign = _RE_IGNORABLE.search(root_attrs)
+    ignorable = ign.group(1).split() if ign else []
+
+    body_open = _RE_BODY_OPEN.search(doc_xml)
+    body_end = doc_xml.rfind("</w:body>")
+    body = doc_xml[body_open.end():body_end] if body_open and body_end > 0 else ""
+    # 원본의 구역 설정(단 수, 여백 등)은 시험지 레이아웃을 깨뜨리므로 제거합니다.
+    body = _RE_SECTPR.sub("", body)
+    body = _RE_W14_IDS.sub("", body)
+
+    styles, style_types, default_styles = {}, {}, {}
+    styles_xml = parts.get("word/styles.xml", b"").decode("utf-8")
+    for m in _RE_STYLE.finditer(styles_xml):
+        sxml = m.group(0)
+        sid = _RE_STYLE_ID.search(sxml)
+        if not sid:
+            continue
+        sid = sid.group(1)
+        stype = (_RE_STYLE_TYPE.search(sxml) or [None, "paragraph"])[1]
+        styles[sid], style_types[sid] = sxml, stype
+        if _RE_STYLE_DEFAULT.search(sxml):
+            default_styles.setdefault(stype, sid)
+
+    abstract_nums, nums = {}, {}
+    numbering_xml = parts.get("word/numbering.xml", b"").decode("utf-8")
+    num_root = _RE_NUMBERING_ROOT.search(numbering_xml)
+    numbering_namespaces = dict(_RE_XMLNS.findall(num_root.group(1))) if num_root else {}
+    num_ign = _RE_IGNORABLE.search(num_root.group(1)) if num_root else None
+    numbering_ignorable = num_ign.group(1).split() if num_ign else []
+    for m in _RE_ABSTRACT_NUM.finditer(numbering_xml):
+        aid = _RE_ABSTRACT_NUM_ID.search(m.group(0))
+        if aid:
+            abstract_nums[aid.group(2)] = m.group(0)
+    for m in _RE_NUM.finditer(numbering_xml):
+        nums[m.group(1)] = m.group(0)
+
+    rels = _parse_rels(parts.get("word/_rels/document.xml.rels", b"").decode("utf-8"))
+    ct_defaults, ct_overrides = _parse_content_types(parts.get("[Content_Types].xml", b"").decode("utf-8"))
+
+    # 병합 때마다 다시 계산하지 않도록 스타일 식별 해시와 본문 관계 대상(이미지 등)의 해시를 미리 구해 둡니다.
+    style_keys = {sid: _style_key(styles, sid) for sid in styles}
+    part_digests = {}
+    for rel in rels.values():
+        if rel["mode"] != "External" and rel["type"] not in STRUCTURAL_REL_TYPES:
+            name = _resolve_target(rel["target"])
+            if name in parts:
+                part_digests[name] = hashlib.sha1(parts[name]).hexdigest()
+
+    return {
+        "path": path, "body": body, "namespaces": namespaces, "ignorable": ignorable,
+        "styles": styles, "style_types": style_types, "default_styles": default_styles,
+        "styles_xml": styles_xml, "abstract_nums": abstract_nums, "nums": nums,
+        "numbering_namespaces": numbering_namespaces, "numbering_ignorable": numbering_ignorable,
+        "rels": rels, "ct_defaults": ct_defaults, "ct_overrides": ct_overrides, "parts": parts,
+        "style_keys": style_keys, "part_digests": part_digests,
+    }
+
+
+# ---------- 파싱된 조각 캐시 ----------
+# 같은 지문/문제 docx 가 시험지마다 반복해서 쓰이므로, 파싱 결과를 프로세스 단위로 보관합니다.
+# - 키: (절대 경로, mtime_ns, 크기) -> 원본이 바뀌면 자동으로 다시 파싱
+# - 메모리 예산을 넘으면 가장 오래 쓰지 않은 조각부터 제거 (LRU)
+# - disk_dir 를 지정하면 파싱 결과를 pickle 로 저장해 다른 프로세스/재시작 후에도 재사용
+FRAGMENT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+FRAGMENT_CACHE_VERSION = 1
+
+
+def _fragment_nbytes(frag: dict) -> int:
+    """조각이 차지하는 메모리의 대략적인 크기 (XML 문자열 + 파트 바이트)"""
+    n = sys.getsizeof(frag["body"]) + sys.getsizeof(frag["styles_xml"])
+    n += sum(sys.getsizeof(x) for x in frag["styles"].values())
+    n += sum(sys.getsizeof(x) for x in frag["abstract_nums"].values())
+    n += sum(sys.getsizeof(x) for x in frag["nums"].values())
+    n += sum(len(data) for data in frag["parts"].values())
+    return n
+
+
+class FragmentCache:
+    """parse_docx_fragment 결과를 보관하는 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_bytes: int = FRAGMENT_CACHE_MAX_BYTES, disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: OrderedDict[str, tuple[tuple, dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _disk_path(self, path: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(path.encode("utf-8")).hexdigest()[:20] + ".pkl")
+
+    def _load_disk(self, path: str, stamp: tuple) -> dict | None:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(path), "rb") as f:
+                saved = pickle.load(f)
+            if saved.get("version") == FRAGMENT_CACHE_VERSION and saved.get("stamp") == stamp:
+                return saved["frag"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_docx.warning(f"조각 캐시 파일 읽기 실패 ({path}): {e}")
+        return None
+
+    def _save_disk(self, path: str, stamp: tuple, frag: dict) -> None:
+        if not self.disk_dir:
+            return
+        disk_path = self._disk_path(path)
+        tmp = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump({"version": FRAGMENT_CACHE_VERSION, "stamp": stamp, "frag": frag}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, disk_path)
+        except OSError as e:
+            log_docx.warning(f"조각 캐시 파일 저장 실패 ({path}): {e}")
+            try: os.remove(tmp)
+            except OSError: pass
+
+    def _put(self, path: str, stamp: tuple, frag: dict) -> None:
+        size = _fragment_nbytes(frag)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self.nbytes -= old[2]
+            self._entries[path] = (stamp, frag, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and self._entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def get(self, path: str) -> dict:
+        """
+        경로의 조각을 반환합니다. (메모리 -> 디스크 -> 파싱 순)
+        반환된 조각은 여러 시험지가 공유하므로 수정하면 안 됩니다.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+        frag = self._load_disk(path, stamp)
+        if frag is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            frag = parse_docx_fragment(path)
+            with self._lock:
+                self.misses += 1
+            self._save_disk(path, stamp, frag)
+        self._put(path, stamp, frag)
+        return frag
+
+    def warm(self, paths) -> int:
+        """경로 목록을 미리 읽어 둡니다. 반환: 읽기에 성공한 수"""
+        n = 0
+        for path in paths:
+            try:
+                self.get(path)
+                n += 1
+            except Exception as e:
+                log_docx.warning(f"조각 미리 읽기 실패 ({path}): {e}")
+        return n
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+_fragment_cache: FragmentCache | None = None
+
+
+def get_fragment_cache() -> FragmentCache:
+    """프로세스 공용 조각 캐시"""
+    global _fragment_cache
+    if _fragment_cache is None:
+        _fragment_cache = FragmentCache()
+    return _fragment_cache
+
+
+def configure_fragment_cache(max_bytes: int = FRAGMENT_CACHE_MAX_BYTES, disk_dir: str | None = None) -> FragmentCache:
+    """프로세스 공용 조각 캐시를 새 설정으로 교체합니다. (프로세스 풀 initializer 로도 사용)"""
+    global _fragment_cache
+    _fragment_cache = FragmentCache(max_bytes=max_bytes, disk_dir=disk_dir)
+    return _fragment_cache
+
+
+# ---------- 본문 텍스트 (화면 표시용) ----------
+_RE_PARAGRAPH = re.compile(r"<w:p\b[^>]*?(?:/>|>.*?</w:p>)", re.S)
+_RE_TEXT_RUN = re.compile(r"<w:t\b[^>]*?(?:/>|>(.*?)</w:t>)|<w:(tab|br|cr)\b[^>]*?/>", re.S)
+
+
+def fragment_text(path: str, cache: FragmentCache | None = None) -> list[str]:
+    """
+    docx 본문의 단락별 텍스트 목록. (웹 화면에 지문/문제를 보여줄 때 사용, 그림/수식은 제외)
+    파싱 결과는 조각 캐시를 같이 씁니다.
+    """
+    frag = (cache or get_fragment_cache()).get(path)
+    paragraphs = []
+    for m in _RE_PARAGRAPH.finditer(frag["body"]):
+        pieces = []
+        for t in _RE_TEXT_RUN.finditer(m.group(0)):
+            if t.group(2):
+                pieces.append("\t" if t.group(2) == "tab" else "\n")
+            elif t.group(1):
+                pieces.append(t.group(1))
+        paragraphs.append(unescape("".join(pieces)))
+    return paragraphs
+
+
+# ---------- 병합 ----------
+def _paragraph_xml(text: str, style_id: str | None = None, sect_pr: str = "") -> str:
+    ppr = ""
+    if style_id or sect_pr:
+        ppr = "<w:pPr>" + (f'<w:pStyle w:val="{style_id}"/>' if style_id else "") + sect_pr + "</w:pPr>"
+    run = f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>' if text else ""
+    return f"<w:p>{ppr}{run}</w:p>"
+
+
+def _sect_pr_xml(columns: int = 1, line_between: bool = False, continuous: bool = False) -> str:
+    sect_type = '<w:type w:val="continuous"/>' if continuous else ""
+    return (f"<w:sectPr>{sect_type}"
+            f'<w:pgSz w:w="{PAGE_W}" w:h="{PAGE_H}"/>'
+            f'<w:pgMar w:top="{MARGIN_TWIPS}" w:right="{MARGIN_TWIPS}" w:bottom="{MARGIN_TWIPS}" '
+            f'w:left="{MARGIN_TWIPS}" w:header="{MARGIN_TWIPS}" w:footer="{MARGIN_TWIPS}" w:gutter="0"/>'
+            f'<w:cols w:num="{columns}" w:space="{COLUMN_SPACE_TWIPS}" w:sep="{1 if line_between else 0}"/>'
+            "</w:sectPr>")
+
+
+def _exam_style_xml(style_id, name, font, size, bold, align, space_after) -> str:
+    jc = f'<w:jc w:val="{align}"/>' if align else ""
+    b = "<w:b/><w:bCs/>" if bold else '<w:b w:val="0"/><w:bCs w:val="0"/>'
+    return (f'<w:style w:type="paragraph" w:customStyle="1" w:styleId="{style_id}">'
+            f'<w:name w:val="{escape(name)}"/><w:qFormat/>'
+            f'<w:pPr><w:spacing w:after="{int(space_after * 20)}"/>{jc}</w:pPr>'
+            f'<w:rPr><w:rFonts w:ascii="{font}" w:eastAsia="{font}" w:hAnsi="{font}" w:cs="{font}"/>'
+            f'{b}<w:sz w:val="{int(size * 2)}"/><w:szCs w:val="{int(size * 2)}"/></w:rPr></w:style>')
+
+
+class OoxmlExamBuilder:
+    """
+    원본 조각들을 하나의 시험지 문서로 병합합니다.
+    첫 조각의 패키지를 뼈대로 삼고, 이후 조각의 스타일/번호/관계를 충돌 없이 재매핑합니다.
+    """
+
+    def __init__(self, base: dict):
+        self.namespaces = {"w": NS_W, "r": NS_R}
+        self.namespaces.update(base["namespaces"])
+        self.ignorable: list[str] = []
+        self.body: list[str] = []
+
+        # 스타일: 뼈대의 docDefaults/latentStyles 와 기본 스타일만 유지
+        styles_xml = base["styles_xml"]
+        first = _RE_STYLE.search(styles_xml)
+        self.styles_head = styles_xml[:first.start()] if first else styles_xml.replace("</w:styles>", "")
+        self.styles: dict[str, str] = {}
+        self.style_keys: dict[str, str] = {}
+        self.default_pstyle = base["default_styles"].get("paragraph")
+        for stype, sid in base["default_styles"].items():
+            self.styles[sid] = base["styles"][sid]
+            self.style_keys[sid] = self._style_key(base, sid)
+        for args in EXAM_STYLES:
+            self.styles[args[0]] = _exam_style_xml(*args)
+        self.style_names = {m.group(2) for sxml in self.styles.values() for m in [_RE_STYLE_NAME.search(sxml)] if m}
+
+        self.numbering_namespaces = {"w": NS_W, "r": NS_R}
+        self.numbering_ignorable: list[str] = []
+        self.abstract_nums: list[str] = []
+        self.nums: list[str] = []
+        self.next_abstract_id = 0
+        self.next_num_id = 1
+
+        # 관계/파트: 구조 관계만 남기고 본문 관계(이미지 등)는 조각 병합 시 새로 연결
+        self.parts: dict[str, bytes] = {}
+        self.rels: dict[str, dict] = {}
+        dropped = set()
+        for rid, rel in base["rels"].items():
+            target = _resolve_target(rel["target"]) if rel["mode"] != "External" else None
+            if rel["type"] in STRUCTURAL_REL_TYPES:
+                self.rels[rid] = rel
+            elif target:
+                dropped.add(target)
+        self.ct_defaults = dict(base["ct_defaults"])
+        self.ct_defaults.setdefault("rels", "application/vnd.openxmlformats-package.relationships+xml")
+        self.ct_defaults.setdefault("xml", "application/xml")
+        self.ct_overrides = {}
+        for name, data in base["parts"].items():
+            if (name in ("[Content_Types].xml", "word/document.xml", "word/_rels/document.xml.rels",
+                         "word/numbering.xml", "word/_rels/numbering.xml.rels", "word/styles.xml")
+                    or name in dropped or name.startswith("word/media/")):
+                continue
+            self.parts[name] = data
+            if name in base["ct_overrides"]:
+                self.ct_overrides[name] = base["ct_overrides"][name]
+        self.rel_counter = 1 + max([int(r[3:]) for r in self.rels if r[3:].isdigit()] or [0])
+        self.media_by_digest: dict[str, str] = {}
+        self.media_counter = 0
+        self.bookmark_counter = 0
+        self.docpr_counter = 0
+
+    # --- 내부 유틸 ---
+    def _new_rid(self) -> str:
+        rid = f"rId{self.rel_counter}"
+        self.rel_counter += 1
+        return rid
+
+    @staticmethod
+    def _style_key(frag: dict, sid: str) -> str:
+        key = frag.get("style_keys", {}).get(sid)
+        return key if key is not None else _style_key(frag["styles"], sid)
+
+    def _merge_style(self, frag: dict, sid: str, style_map: dict, num_map: dict) -> str:
+        if sid in style_map:
+            return style_map[sid]
+        if sid not in frag["styles"]:
+            return sid
+        key = self._style_key(frag, sid)
+        new_id = sid
+        if sid in self.styles and self.style_keys.get(sid) != key:
+            new_id = f"{sid}_{key[:6]}"
+        style_map[sid] = new_id
+        if new_id in self.styles:
+            return new_id
+
+        for ref in set(_style_refs(frag["styles"][sid])):
+            self._merge_style(frag, ref, style_map, num_map)
+        sxml = _RE_STYLE_DEFAULT.sub("", frag["styles"][sid])
+        sxml = _RE_STYLE_ID.sub(f'w:styleId="{new_id}"', sxml, count=1)
+        sxml = _RE_STYLE_REF.sub(lambda m: m.group(1) + style_map.get(m.group(2), m.group(2)) + m.group(3), sxml)
+        sxml = _RE_NUM_ID_REF.sub(lambda m: m.group(1) + num_map.get(m.group(2), m.group(2)) + m.group(3), sxml)
+        name = _RE_STYLE_NAME.search(sxml)
+        if name and name.group(2) in self.style_names:
+            # 같은 이름의 다른 스타일이 있으면 Word 가 하나로 합쳐버리므로 표시 이름에 접미사를 붙입니다.
+            sxml = _RE_STYLE_NAME.sub(lambda m: f"{m.group(1)}{m.group(2)} ({key[:6]}){m.group(3)}", sxml, count=1)
+        self.styles[new_id] = sxml
+        self.style_keys[new_id] = key
+        name = _RE_STYLE_NAME.search(sxml)
+        if name:
+            self.style_names.add(name.group(2))
+        return new_id
+
+    def _merge_numbering(self, frag: dict) -> dict[str, str]:
+        for prefix, uri in frag["numbering_namespaces"].items():
+            self.numbering_namespaces.setdefault(prefix, uri)
+        for prefix in frag["numbering_ignorable"]:
+            if prefix not in self.numbering_ignorable:
+                self.numbering_ignorable.append(prefix)
+        abstract_map = {}
+        for aid, axml in frag["abstract_nums"].items():
+            new_aid = str(self.next_abstract_id)
+            self.next_abstract_id += 1
+            abstract_map[aid] = new_aid
+            axml = _RE_ABSTRACT_NUM_ID.sub(lambda m: m.group(1) + new_aid + m.group(3), axml, count=1)
+            # nsid 가 같으면 Word 가 서로 다른 목록을 하나로 이어 번호를 매기므로 새로 부여합니다.
+            axml = _RE_NSID.sub(lambda m: m.group(1) + f"{0x1000000 + int(new_aid):08X}" + m.group(3), axml)
+            self.abstract_nums.append(axml)
+        num_map = {}
+        for nid, nxml in frag["nums"].items():
+            new_nid = str(self.next_num_id)
+            self.next_num_id += 1
+            num_map[nid] = new_nid
+            nxml = _RE_NUM_OPEN_ID.sub(lambda m: m.group(1) + new_nid + m.group(3), nxml, count=1)
+            nxml = _RE_NUM_ABSTRACT_REF.sub(
+                lambda m: m.group(1) + abstract_map.get(m.group(2), m.group(2)) + m.group(3), nxml)
+            self.nums.append(nxml)
+        return num_map
+
+    def _merge_rel(self, frag: dict, rid: str, rel_map: dict) -> str:
+        if rid in rel_map:
+            return rel_map[rid]
+        rel = frag["rels"].get(rid)
+        if rel is None:
+            return rid
+        new_rid = self._new_rid()
+        if rel["mode"] == "External":
+            self.rels[new_rid] = dict(rel)
+        else:
+            src_name = _resolve_target(rel["target"])
+            data = frag["parts"].get(src_name)
+            if data is None:
+                log_docx.warning(f"관계 대상 파트 없음 ({frag['path']}: {src_name})")
+                rel_map[rid] = rid
+                return rid
+            ext = posixpath.splitext(src_name)[1].lower()
+            digest = frag.get("part_digests", {}).get(src_name) or hashlib.sha1(data).hexdigest()
+            if digest in self.media_by_digest:
+                new_name = self.media_by_digest[digest]
+            else:
+                self.media_counter += 1
+                new_name = f"word/media/item{self.media_counter}{ext}"
+                self.media_by_digest[digest] = new_name
+                self.parts[new_name] = data
+                ct = frag["ct_overrides"].get(src_name)
+                if ct:
+                    self.ct_overrides[new_name] = ct
+                elif ext.lstrip(".") not in self.ct_defaults:
+                    self.ct_defaults[ext.lstrip(".")] = (frag["ct_defaults"].get(ext.lstrip("."))
+                                                         or IMAGE_CONTENT_TYPES.get(ext, "application/octet-stream"))
+            self.rels[new_rid] = {"type": rel["type"], "target": posixpath.relpath(new_name, "word"), "mode": None}
+        rel_map[rid] = new_rid
+        return new_rid
+
+    # --- 공개 API ---
+    def add_paragraph(self, text: str, style_name: str | None = None) -> None:
+        self.body.append(_paragraph_xml(text, EXAM_STYLE_IDS.get(style_name, style_name)))
+
+    def add_section_break(self, columns: int = 1, line_between: bool = False, continuous: bool = False) -> None:
+        """현재까지의 내용을 하나의 구역으로 닫습니다. (COM 엔진의 연속 구역 나누기와 동일)"""
+        self.body.append(_paragraph_xml("", sect_pr=_sect_pr_xml(columns, line_between, continuous)))
+
+    def add_fragment(self, frag: dict) -> None:
+        for prefix, uri in frag["namespaces"].items():
+            self.namespaces.setdefault(prefix, uri)
+        for prefix in frag["ignorable"]:
+            if prefix not in self.ignorable:
+                self.ignorable.append(prefix)
+
+        num_map = self._merge_numbering(frag)
+        style_map: dict[str, str] = {}
+        for sid in set(_RE_BODY_STYLE_REF.findall(frag["body"])):
+            self._merge_style(frag, sid, style_map, num_map)
+
+        body = frag["body"]
+        body = _RE_STYLE_REF.sub(lambda m: m.group(1) + style_map.get(m.group(2), m.group(2)) + m.group(3), body)
+        body = _RE_NUM_ID_REF.sub(lambda m: m.group(1) + num_map.get(m.group(2), m.group(2)) + m.group(3), body)
+        rel_map: dict[str, str] = {}
+        body = _RE_REL_REF.sub(lambda m: m.group(1) + self._merge_rel(frag, m.group(2), rel_map) + m.group(3), body)
+
+        bookmark_base = self.bookmark_counter
+        max_bm = [0]
+        def _bookmark(m):
+            max_bm[0] = max(max_bm[0], int(m.group(2)) + 1)
+            return m.group(1) + str(bookmark_base + int(m.group(2))) + m.group(3)
+        body = _RE_BOOKMARK_ID.sub(_bookmark, body)
+        self.bookmark_counter += max_bm[0]
+
+        def _docpr(m):
+            self.docpr_counter += 1
+            return m.group(1) + str(self.docpr_counter) + m.group(3)
+        body = _RE_DOCPR_ID.sub(_docpr, body)
+
+        # 스타일 지정이 없는 단락은 원본의 기본 단락 스타일을 따르도록 명시합니다.
+        src_default = frag["default_styles"].get("paragraph")
+        if src_default and src_default in frag["styles"]:
+            mapped = self._merge_style(frag, src_default, style_map, num_map)
+            if mapped != self.default_pstyle:
+                def _inject(m):
+                    s = m.group(0)
+                    if "<w:pStyle" in s:
+                        return s
+                    if s.endswith("<w:pPr/>"):
+                        return s[:-len("<w:pPr/>")] + f'<w:pPr><w:pStyle w:val="{mapped}"/></w:pPr>'
+                    if "<w:pPr>" in s:
+                        return s.replace("<w:pPr>", f'<w:pPr><w:pStyle w:val="{mapped}"/>', 1)
+                    return s + f'<w:pPr><w:pStyle w:val="{mapped}"/></w:pPr>'
+                body = _RE_PARA_OPEN.sub(_inject, body)
+
+        self.body.append(body)
+
+    @staticmethod
+    def _root_attrs(namespaces: dict, ignorable: list) -> str:
+        ns_decl = "".join(f' xmlns:{p}="{u}"' for p, u in namespaces.items())
+        ignorable = [p for p in ignorable if p in namespaces]
+        return ns_decl + (f' mc:Ignorable="{" ".join(ignorable)}"' if ignorable and "mc" in namespaces else "")
+
+    def save(self, out_path: str, columns: int = 1, line_between: bool = False, continuous: bool = False) -> str:
+        document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f"<w:document{self._root_attrs(self.namespaces, self.ignorable)}><w:body>{''.join(self.body)}<w:p/>"
+                    f"{_sect_pr_xml(columns, line_between, continuous)}</w:body></w:document>")
+
+        styles = self.styles_head + "".join(self.styles.values()) + "</w:styles>"
+        numbering = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                     f"<w:numbering{self._root_attrs(self.numbering_namespaces, self.numbering_ignorable)}>"
+                     + "".join(self.abstract_nums) + "".join(self.nums) + "</w:numbering>")
+
+        rels = dict(self.rels)
+        if not any(r["type"] == REL_BASE + "numbering" for r in rels.values()):
+            rels[self._new_rid()] = {"type": REL_BASE + "numbering", "target": "numbering.xml", "mode": None}
+        rels_xml = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    + "".join(f'<Relationship Id="{rid}" Type="{r["type"]}" Target="{escape(r["target"])}"'
+                              + (f' TargetMode="{r["mode"]}"' if r["mode"] else "") + "/>"
+                              for rid, r in rels.items())
+                    + "</Relationships>")
+
+        overrides = dict(self.ct_overrides)
+        overrides["word/document.xml"] = CT_DOCUMENT
+        overrides["word/numbering.xml"] = CT_NUMBERING
+        overrides["word/styles.xml"] = CT_STYLES
+        content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                         + "".join(f'<Default Extension="{e}" ContentType="{c}"/>' for e, c in self.ct_defaults.items())
+                         + "".join(f'<Override PartName="/{n}" ContentType="{c}"/>' for n, c in overrides.items())
+                         + "</Types>")
+
+        with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr("[Content_Types].xml", content_types)
+            z.writestr("word/document.xml", document)
+            z.writestr("word/styles.xml", styles)
+            z.writestr("word/numbering.xml", numbering)
+            z.writestr("word/_rels/document.xml.rels", rels_xml)
+            for name, data in self.parts.items():
+                z.writestr(name, data)
+        return out_path
+
+
+def assemble_exam_docx(tasks, title, subtitle, student_name, two_columns, out_path,
+                       cache: FragmentCache | None = None) -> str:
+    """
+    (태그, 경로) 작업 목록으로 시험지 .docx 를 만듭니다.
+    번호 체계와 머리말 구성은 COM 엔진(_create_word_document)과 동일합니다.
+    원본 조각은 cache(기본: 프로세스 공용 캐시)에서 가져오므로 같은 원본은 한 번만 파싱합니다.
+    """
+    cache = cache or get_fragment_cache()
+    fragments = []
+    for tag, path in tasks:
+        frag = None
+        if not os.path.exists(path):
+            log_docx.warning(f"파일 없음: {path}")
+        else:
+            try:
+                frag = cache.get(path)
+            except Exception as e:
+                log_docx.error(f"삽입 실패({path}): {e}")
+        fragments.append((tag, frag))
+    base = next((frag for _, frag in fragments if frag is not None), None)
+    if base is None:
+        raise ValueError("병합할 수 있는 원본 문서가 없습니다.")
+
+    builder = OoxmlExamBuilder(base)
+    builder.add_paragraph(title, style_name="제목")
+    if subtitle:
+        builder.add_paragraph(subtitle, style_name="소제목")
+    builder.add_paragraph(f"학년: ____  반: ____  번호: ____  이름: {student_name}")
+    if two_columns:
+        builder.add_section_break(columns=1)
+    else:
+        builder.add_paragraph("")
+
+    passage_number, problem_number_in_passage = 1, 1
+    for tag, frag in fragments:
+        if tag.startswith("지문 "):
+            if problem_number_in_passage > 1: passage_number += 1
+            builder.add_paragraph(f"[{passage_number}]", style_name="문항")
+            if frag is not None: builder.add_fragment(frag)
+            problem_number_in_passage = 1
+        else:
+            builder.add_paragraph(f"{passage_number}-{problem_number_in_passage})", style_name="문항")
+            if frag is not None: builder.add_fragment(frag)
+            problem_number_in_passage += 1
+
+    return builder.save(out_path, columns=2 if two_columns else 1, continuous=two_columns)
@@ -0,0 +1,133 @@
+# 학생별 시험 횟수(N차) 발급 장부입니다. (SQLite)
+# - exam_counters: student_id 별 마지막으로 발급한 횟수
+# - counter_info : 출력 폴더의 기존 메타 파일로 장부를 채웠는지(seed) 기록
+# 시험 ID({student_id}_{YYYYMMDD}_{N}) 의 N 을 출력 폴더를 훑지 않고 O(1) 로 발급합니다.
+# 발급은 쓰기 잠금(BEGIN IMMEDIATE) 안에서 하므로 여러 프로세스가 같은 학생의 시험지를 동시에 만들어도 번호가 겹치지 않습니다.
+# 장부가 처음 만들어질 때 한 번만 폴더의 기존 메타 파일({student_id}_{YYYYMMDD}_{N}.*)에서 학생별 최대 N 을 읽어 옵니다.
+import os
+import re
+import sqlite3
+import logging
+from datetime import datetime
+
+from output_writers import split_output_path, OUTPUT_EXTENSIONS
+
+# --- 로깅 설정 ---
+log_counter = logging.getLogger("exam_counter")
+
+EXAM_COUNTER_NAME = "exam_counter.sqlite"
+SQLITE_TIMEOUT = 30.0
+_RE_EXAM_ID = re.compile(r"^(?P<student_id>.+)_(?P<date>\d{8})_(?P<count>\d+)$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exam_counters (
+    student_id TEXT PRIMARY KEY,
+    last_count INTEGER NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS counter_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def scan_exam_counts(output_dir: str) -> dict[str, int]:
+    """폴더의 시험 메타 파일 이름에서 학생별 최대 시험 횟수를 읽습니다. (채점/결과 파일 등은 이름 형식이 달라 제외)"""
+    counts: dict[str, int] = {}
+    try:
+        names = os.listdir(output_dir)
+    except FileNotFoundError:
+        return counts
+    for fname in names:
+        stem, ext = split_output_path(fname)
+        m = _RE_EXAM_ID.match(stem) if ext.lower() in OUTPUT_EXTENSIONS else None
+        if m:
+            sid, n = m.group("student_id"), int(m.group("count"))
+            counts[sid] = max(counts.get(sid, 0), n)
+    return counts
+
+
+class ExamCounter:
+    """출력 폴더 하나의 시험 횟수 장부"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.db_path = os.path.join(output_dir, EXAM_COUNTER_NAME)
+        # 트랜잭션을 직접 관리 (isolation_level=None)
+        self.conn = sqlite3.connect(self.db_path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _seed_if_needed(self, now: str) -> None:
+        """(쓰기 잠금 안에서 호출) 장부를 처음 쓸 때 한 번만 폴더의 기존 메타 파일로 채웁니다."""
+        if self.conn.execute("SELECT 1 FROM counter_info WHERE key = 'seeded_at'").fetchone():
+            return
+        counts = scan_exam_counts(self.output_dir)
+        self.conn.executemany(
+            """INSERT INTO exam_counters (student_id, last_count, updated_at) VALUES (?, ?, ?)
+               ON CONFLICT(student_id) DO UPDATE SET last_count = MAX(last_count, excluded.last_count)""",
+            [(sid, n, now) for sid, n in counts.items()])
+        self.conn.execute("INSERT INTO counter_info (key, value) VALUES ('seeded_at', ?)", (now,))
+        if counts:
+            log_counter.info(f"시험 횟수 장부 초기화: 기존 메타 파일에서 학생 {len(counts)}명의 횟수를 읽었습니다. ({self.output_dir})")
+
+    def allocate(self, student_ids) -> list[int]:
+        """
+        학생 ID 목록의 순서대로 다음 시험 횟수를 발급합니다. (같은 학생이 여러 번 있으면 1씩 증가)
+        한 트랜잭션으로 처리되며, 발급한 번호는 다시 발급되지 않습니다.
+        """
+        student_ids = [str(s) for s in student_ids]
+        if not student_ids:
+            return []
+        now = datetime.now().isoformat(timespec="seconds")
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._seed_if_needed(now)
+            issued: dict[str, int] = {}
+            out = []
+            for sid in student_ids:
+                if sid not in issued:
+                    row = self.conn.execute("SELECT last_count FROM exam_counters WHERE student_id = ?", (sid,)).fetchone()
+                    issued[sid] = row[0] if row else 0
+                issued[sid] += 1
+                out.append(issued[sid])
+            self.conn.executemany(
+                """INSERT INTO exam_counters (student_id, last_count, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT(student_id) DO UPDATE SET last_count = excluded.last_count, updated_at = excluded.updated_at""",
+                [(sid, n, now) for sid, n in issued.items()])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return out
+
+    def next_count(self, student_id: str) -> int:
+        return self.allocate([student_id])[0]
+
+    def last_count(self, student_id: str) -> int:
+        """마지막으로 발급한 횟수 (발급 기록이 없으면 0, 장부를 채우기 전이면 폴더 기준)"""
+        if not self.conn.execute("SELECT 1 FROM counter_info WHERE key = 'seeded_at'").fetchone():
+            return scan_exam_counts(self.output_dir).get(str(student_id), 0)
+        row = self.conn.execute("SELECT last_count FROM exam_counters WHERE student_id = ?", (str(student_id),)).fetchone()
+        return row[0] if row else 0
+
+
+def allocate_exam_counts(output_dir: str, student_ids) -> list[int]:
+    """output_dir 의 장부에서 학생들의 다음 시험 횟수를 발급합니다."""
+    with ExamCounter(output_dir) as counter:
+        return counter.allocate(student_ids)
+
+
+def next_exam_count(output_dir: str, student_id: str) -> int:
+    """output_dir 의 장부에서 학생의 다음 시험 횟수를 발급합니다."""
+    return allocate_exam_counts(output_dir, [student_id])[0]
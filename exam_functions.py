@@ -1,12 +1,19 @@
 import os
+import sys
 import logging
 import pandas as pd
-import openpyxl
 import re
 import numpy as np
 from datetime import datetime, timezone, timedelta
 import traceback
-import pythoncom
+from item_bank import ItemBank, EXAM_CATEGORIES, get_item_bank
+from graded_reader import read_sheets, as_read
+from theta_estimation import estimate_theta, latest_theta
+from output_writers import DEFAULT_OUTPUT_FORMAT, split_output_path, write_sheets
+from exam_counter import next_exam_count
+from weakness_store import WeaknessStore, load_weak_sets, weakness_store_path
+from file_locks import student_lock
+from results_warehouse import rows_from_grading, append_grading_rows
 
 # --- 로깅 및 시간 설정 ---
 log_gen = logging.getLogger("exam_generator")
@@ -23,356 +30,286 @@ def make_exam_id(student_id: str, now: datetime, exam_count: int) -> str:
     date_str = now.strftime("%Y%m%d")
     return f"{student_id}_{date_str}_{exam_count}"
 
-# ---------- Word 유틸 ----------
-def cm_to_pt(v: float) -> float:
-    return (72.0 / 2.54) * float(v)
-
-def start_word(visible=True):
-    try:
-        pythoncom.CoInitialize()
-        import win32com.client as win32
-        word = win32.gencache.EnsureDispatch("Word.Application")
-    except Exception:
-        log_gen.error("Word Application 로드 실패. win32com 캐시를 정리하거나 Office 설치 복구가 필요할 수 있습니다.")
-        log_gen.error(traceback.format_exc())
-        return None, None
-    word.Visible = visible
-    wd = win32.constants
-    word.Options.PasteFormatBetweenDocuments = wd.wdKeepSourceFormatting
-    word.Options.PasteFormatBetweenStyledDocuments = wd.wdKeepSourceFormatting
-    word.Options.PasteAdjustTableFormatting = True
-    return word, wd
-
-def ensure_style(doc, name, wd, font="학교안심 바른바탕 R", size=11, bold=False, align=None, space_after=6):
-    try:
-        s = doc.Styles(name)
-    except Exception:
-        s = doc.Styles.Add(Name=name, Type=wd.wdStyleTypeParagraph)
-    s.Font.Name = font; s.Font.Size = size; s.Font.Bold = bold
-    if align is not None:
-        s.ParagraphFormat.Alignment = align
-    s.ParagraphFormat.SpaceAfter = space_after
-    return s
-
-def end_range(doc, wd):
-    rng = doc.Range()
-    rng.Collapse(wd.wdCollapseEnd)
-    return rng
-
-def insert_paragraph(doc, wd, text, style_name=None):
-    rng = end_range(doc, wd)
-    rng.InsertAfter(text)
-    rng.InsertParagraphAfter()
-    if style_name:
-        doc.Paragraphs.Last.Range.Style = style_name
-
-def insert_docx_with_source_format(doc, wd, path, word_app):
-    if not os.path.exists(path):
-        log_gen.warning(f"파일 없음: {path}")
-        return False
-    src = None
-    try:
-        src = word_app.Documents.Open(
-            FileName=os.path.abspath(path), ReadOnly=True,
-            AddToRecentFiles=False, Visible=False
-        )
-        src.Content.Copy()
-        dest = end_range(doc, wd)
-        dest.PasteAndFormat(wd.wdFormatOriginalFormatting)
-        return True
-    except Exception:
-        log_gen.error(f"삽입 실패({path}):")
-        log_gen.error(traceback.format_exc())
-        return False
-    finally:
-        if src is not None:
-            try: src.Close(False)
-            except Exception: pass
-
-def set_two_columns_current_section(doc, wd, line_between=False, count=2):
-    try:
-        last_para = doc.Paragraphs.Last
-        if last_para.Range.Text.strip() != "":
-            last_para.Range.InsertParagraphAfter()
-        rng_for_break = end_range(doc, wd)
-        rng_for_break.InsertBreak(wd.wdSectionBreakContinuous)
-        sec = doc.Sections.Last
-        sec.PageSetup.TextColumns.SetCount(count)
-        sec.PageSetup.TextColumns.LineBetween = bool(line_between)
-    except Exception:
-        log_gen.error("2단 나누기 설정 중 오류 발생:")
-        log_gen.error(traceback.format_exc())
-
 # ---------- Word 문서 생성 내부 함수 (안정화) ----------
-def _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, student_id):
-    word, wd = start_word(visible=True)
-    if not word: return None
-    
-    doc = None
-    out_path = None
-    try:
-        doc = word.Documents.Add()
-        ps = doc.Sections(1).PageSetup
-        ps.TopMargin = cm_to_pt(1.5); ps.BottomMargin = cm_to_pt(1.5)
-        ps.LeftMargin = cm_to_pt(1.5); ps.RightMargin = cm_to_pt(1.5)
-
-        ensure_style(doc, "제목", wd, font="학교안심 바른바탕 B", size=24, bold=True, align=wd.wdAlignParagraphCenter, space_after=12)
-        ensure_style(doc, "소제목", wd, font="학교안심 바른바탕 R", size=16, align=wd.wdAlignParagraphLeft, space_after=6)
-        ensure_style(doc, "문항", wd, font="학교안심 바른바탕 R", size=11, align=wd.wdAlignParagraphLeft, space_after=6)
-
-        insert_paragraph(doc, wd, title, style_name="제목")
-        if subtitle: insert_paragraph(doc, wd, subtitle, style_name="소제목")
-        insert_paragraph(doc, wd, f"학년: ____  반: ____  번호: ____  이름: {student_name}")
-        end_range(doc, wd).InsertParagraphAfter()
-
-        if two_columns:
-            set_two_columns_current_section(doc, wd, line_between=False, count=2)
-
-        passage_number, problem_number_in_passage = 1, 1
-        for tag, path in tasks:
-            if tag.startswith("지문 "):
-                if problem_number_in_passage > 1: passage_number += 1
-                insert_paragraph(doc, wd, f"[{passage_number}]", style_name="문항")
-                insert_docx_with_source_format(doc, wd, path, word_app=word)
-                problem_number_in_passage = 1
-            else:
-                insert_paragraph(doc, wd, f"{passage_number}-{problem_number_in_passage})", style_name="문항")
-                insert_docx_with_source_format(doc, wd, path, word_app=word)
-                problem_number_in_passage += 1
+# 시험지 조립 엔진: "word" (MS Word COM, Windows 전용, word_com) / "ooxml" (순수 Python, 모든 OS, docx_assembler)
+# 두 엔진 모두 선택됐을 때 처음 불러오므로, Word 가 없는 OS 에서도 채점 / 분석 기능은 그대로 씁니다.
+DOCX_ENGINES = ("word", "ooxml")
+DEFAULT_DOCX_ENGINE = "word" if sys.platform == "win32" else "ooxml"
+# 예전에 이 모듈에 있던 Word 유틸 (ef.start_word 등). 처음 접근할 때 word_com 에서 불러옵니다.
+_WORD_COM_NAMES = {"cm_to_pt", "start_word", "ensure_style", "end_range", "insert_paragraph",
+                   "insert_docx_with_source_format", "set_two_columns_current_section"}
+
+def __getattr__(name):
+    if name in _WORD_COM_NAMES:
+        import word_com
+        return getattr(word_com, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _exam_docx_path(title, output_dir, exam_id) -> str:
+    # 학생 ID 가 아닌 시험 ID 로 이름을 붙입니다. (같은 학생의 시험지를 동시에 만들어도 서로 덮어쓰지 않음)
+    out_name = f"{title.replace(' ', '_')}_{exam_id}.docx"
+    return os.path.abspath(os.path.join(output_dir, out_name))
+
+def _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id,
+                          engine=DEFAULT_DOCX_ENGINE, word_app=None):
+    if engine == "ooxml":
+        return _create_word_document_ooxml(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id)
+    if engine != "word":
+        log_gen.error(f"알 수 없는 시험지 엔진: {engine} (가능: {', '.join(DOCX_ENGINES)})")
+        return None
+    return _create_word_document_com(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id,
+                                     word_app=word_app)
 
-        out_name = f"{title.replace(' ', '_')}_{student_id}.docx"
-        out_path = os.path.abspath(os.path.join(output_dir, out_name))
-        doc.SaveAs(out_path)
+def _create_word_document_ooxml(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id):
+    from docx_assembler import assemble_exam_docx
+    out_path = _exam_docx_path(title, output_dir, exam_id)
+    try:
+        assemble_exam_docx(tasks, title, subtitle, student_name, two_columns, out_path)
         log_gen.info(f"시험지 생성 완료: {out_path}")
     except Exception:
-        log_gen.error("Word 문서 생성 프로세스에서 예외 발생:")
+        log_gen.error("OOXML 시험지 조립 중 예외 발생:")
         log_gen.error(traceback.format_exc())
         out_path = None
-    finally:
-        if doc:
-            try: doc.Close(False)
-            except Exception: pass
-        if word:
-            try: word.Quit()
-            except Exception: pass
     return out_path
 
-# ---------- 1. 첫 사용자용 시험지 생성 (랜덤 7지문) ----------
-def generate_exam_7_passages_from_db(
-    db_path: str, base_dir: str, title: str, subtitle: str | None = None,
-    two_columns: bool = True, output_dir: str = "./output",
-    student_id: str = "S000", student_name: str = "학생"
-):
-    log_gen.info(f"랜덤 시험지 생성 시작 (학생: {student_name}, ID: {student_id})")
-    os.makedirs(output_dir, exist_ok=True)
+def _create_word_document_com(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id, word_app=None):
+    # word_app=(word, wd) 를 넘기면 이미 실행 중인 Word 를 재사용하고 종료하지 않습니다. (일괄 생성용)
+    from word_com import create_exam_docx
+    return create_exam_docx(tasks, title, subtitle, student_name, two_columns,
+                            _exam_docx_path(title, output_dir, exam_id), word_app=word_app)
 
-    try:
-        df_db = pd.read_excel(db_path, sheet_name=0)
-    except Exception as e:
-        log_gen.error(f"DB 읽기 실패: {e}")
-        return None, None, None
-    
-    need = {"지문id","문제id","지문유형","문제유형","정답","과목"}
-    if not all(c in df_db.columns for c in need):
-        log_gen.error(f"DB에 필요한 컬럼 부족: {set(need) - set(df_db.columns)}")
-        return None, None, None
+# ---------- 시험지 생성 공통 단계 (문항 선택 / 시험 ID 할당 / 메타 저장) ----------
+RANDOM_NEED_COLS = {"지문id","문제id","지문유형","문제유형","정답","과목"}
+IRT_NEED_COLS = RANDOM_NEED_COLS | {"irt_difficulty_b", "irt_discrimination_a"}
 
-    df_passages = df_db.loc[:, ["지문id","지문유형"]].dropna().drop_duplicates(subset=["지문id"])
-    if df_passages.empty:
+def _select_random_exam(bank: ItemBank, base_dir: str, rng: np.random.Generator):
+    """랜덤(7지문) 모드의 문항을 선택합니다. 반환: (tasks, selected_records) 또는 None"""
+    if len(bank.passage_ids) == 0:
         log_gen.error("DB에 지문 후보가 없습니다.")
-        return None, None, None
+        return None
 
-    categories = {
-        "독서": [["인문","주제통합","예술"], ["과학","기술","과학기술","과학·기술"], ["사회"]],
-        "문학": [["현대시","현대시*"], ["현대소설"], ["고전시가","고전시가*"], ["고전소설"]],
-    }
-    rng = np.random.default_rng()
-    selected_passage_rows = []
-    for group_list in categories.values():
+    selected_pids = []
+    for group_list in EXAM_CATEGORIES.values():
         for group in group_list:
-            hits = df_passages[df_passages["지문유형"].astype(str).str.contains('|'.join(group), na=False)]
-            if not hits.empty:
-                selected_passage_rows.append(hits.sample(1, random_state=int(rng.integers(0, 1_000_000))).iloc[0])
+            hits = bank.category_passages(group)
+            if len(hits):
+                pid = hits[int(rng.integers(len(hits)))]
+                if pid not in selected_pids:
+                    selected_pids.append(pid)
 
-    if not selected_passage_rows:
+    if not selected_pids:
         log_gen.error("카테고리에 맞는 지문을 찾을 수 없습니다.")
-        return None, None, None
-    selected_passages = pd.DataFrame(selected_passage_rows).drop_duplicates(subset=["지문id"]).reset_index(drop=True)
+        return None
 
     tasks, selected_records = [], []
-    for _, row in selected_passages.iterrows():
-        pid = row["지문id"]
+    for pid in selected_pids:
         p_path = os.path.join(base_dir, "지문", f"{pid}.docx")
         if os.path.exists(p_path):
             tasks.append((f"지문 {pid}", p_path))
         else:
             log_gen.warning(f"지문 파일 없음: {p_path}")
 
-        rel = df_db[df_db["지문id"] == pid]
-        for _, q in rel.iterrows():
-            qid = str(q["문제id"])
+        for i in bank.rows_for_passage(pid):
+            qid = bank.problem_ids[i]
+            q_path = os.path.join(base_dir, "문제", f"{qid}.docx")
+            if os.path.exists(q_path):
+                tasks.append((f"문제 {qid}", q_path))
+                selected_records.append(bank.problem_record(i))
+            else:
+                log_gen.warning(f"문제 파일 없음: {q_path}")
+    return tasks, selected_records
+
+def _load_weakness_sets(user_weakness_path: str, student_id: str | None = None) -> tuple[set, set]:
+    """
+    취약점 저장소(.sqlite, student_id 필요) 또는 기존 취약점 엑셀 파일에서
+    (취약 지문유형, 취약 문제유형) 집합을 읽습니다. 읽기 실패 시 예외를 그대로 전달합니다.
+    """
+    return load_weak_sets(user_weakness_path, student_id)
+
+def _select_irt_exam(
+    bank: ItemBank, base_dir: str, weak_passage_set: set, weak_problem_set: set,
+    user_theta: float, num_passages: int, num_problems_per_passage: int,
+    weak_passage_target_prop: float, weak_problem_boost: float, rng: np.random.Generator
+):
+    """IRT + 취약점 모드의 문항을 선택합니다. 반환: (tasks, selected_records) 또는 None"""
+    if len(bank.passage_ids) == 0:
+        log_gen.error("DB에 지문 후보가 없습니다.")
+        return None
+
+    is_weak = np.isin(bank.passage_types, [str(x) for x in weak_passage_set])
+    weak_available = bank.passage_ids[is_weak]
+    other_available = bank.passage_ids[~is_weak]
+    n_weak_target = int(num_passages * weak_passage_target_prop)
+    n_weak = min(n_weak_target, len(weak_available))
+    n_other = num_passages - n_weak
+    if n_other > len(other_available):
+        log_gen.warning(f"비취약 지문 수 부족 (필요: {n_other}, 가능: {len(other_available)})")
+        n_other = len(other_available)
+        n_weak = min(num_passages - n_other, len(weak_available))
+
+    selected_pids = np.concatenate([rng.choice(weak_available, n_weak, replace=False),
+                                    rng.choice(other_available, n_other, replace=False)])
+    selected_pids = rng.permutation(selected_pids)
+    log_gen.info(f"지문 선택: 총 {len(selected_pids)}개 (취약 {n_weak}개, 일반 {n_other}개)")
+
+    weak_problem_list = [str(x) for x in weak_problem_set]
+    tasks, selected_records = [], []
+    for pid in selected_pids:
+        p_path = os.path.join(base_dir, "지문", f"{pid}.docx")
+        if os.path.exists(p_path):
+            tasks.append((f"지문 {pid}", p_path))
+        else:
+            log_gen.warning(f"지문 파일 없음: {p_path} (스킵)")
+            continue
+
+        rows = bank.rows_for_passage(pid)
+        if len(rows) == 0: continue
+
+        info_score = bank.irt_a[rows] / (1.0 + np.abs(bank.irt_b[rows] - user_theta))
+        weak_bonus = np.where(np.isin(bank.problem_types[rows], weak_problem_list), weak_problem_boost, 1.0)
+        final_score = info_score * weak_bonus
+        # nlargest 와 같은 결과: 점수 내림차순, 동점은 DB 순서, 점수 없는(NaN) 문항 제외
+        valid = np.flatnonzero(~np.isnan(final_score))
+        top = valid[np.argsort(-final_score[valid], kind="stable")[:num_problems_per_passage]]
+
+        for i in rows[top]:
+            qid = bank.problem_ids[i]
             q_path = os.path.join(base_dir, "문제", f"{qid}.docx")
             if os.path.exists(q_path):
                 tasks.append((f"문제 {qid}", q_path))
-                selected_records.append({"problem_id": qid, "answer": q.get("정답", ""),
-                                         "subject": q.get("과목", ""), "problem_type": q.get("문제유형", "")})
+                selected_records.append(bank.problem_record(i))
             else:
                 log_gen.warning(f"문제 파일 없음: {q_path}")
+    return tasks, selected_records
+
+def _write_exam_meta(output_dir, exam_id, student_id, student_name, title, now, selected_records, extra_meta=None,
+                     output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+    meta_xlsx_path = os.path.abspath(os.path.join(output_dir, exam_id))
+    meta_row = {"exam_id": exam_id, "student_id": student_id,
+                "student_name": student_name, "exam_name": title,
+                "timestamp": now.isoformat(timespec="seconds")}
+    meta_row.update(extra_meta or {})
+    meta_df = pd.DataFrame([meta_row])
+
+    # 같은 학생의 메타 파일은 한 번에 하나씩 씀 (여러 교사가 동시에 만들어도 섞이지 않음)
+    with student_lock(output_dir, student_id):
+        meta_xlsx_path = write_sheets(meta_xlsx_path, {"selected_problems": pd.DataFrame(selected_records), "meta": meta_df},
+                                      output_format)
+    log_gen.info(f"메타 파일 저장 완료: {meta_xlsx_path}")
+    return meta_xlsx_path
+
+# ---------- 1. 첫 사용자용 시험지 생성 (랜덤 7지문) ----------
+def generate_exam_7_passages_from_db(
+    db_path: str, base_dir: str, title: str, subtitle: str | None = None,
+    two_columns: bool = True, output_dir: str = "./output",
+    student_id: str = "S000", student_name: str = "학생", engine: str = DEFAULT_DOCX_ENGINE,
+    rng: np.random.Generator | None = None, output_format: str = DEFAULT_OUTPUT_FORMAT
+):
+    log_gen.info(f"랜덤 시험지 생성 시작 (학생: {student_name}, ID: {student_id})")
+    os.makedirs(output_dir, exist_ok=True)
+    rng = rng if rng is not None else np.random.default_rng()
+
+    try:
+        bank = get_item_bank(db_path)
+    except Exception as e:
+        log_gen.error(f"DB 읽기 실패: {e}")
+        return None, None, None
+    
+    if not all(c in bank.columns for c in RANDOM_NEED_COLS):
+        log_gen.error(f"DB에 필요한 컬럼 부족: {set(RANDOM_NEED_COLS) - set(bank.columns)}")
+        return None, None, None
+
+    selection = _select_random_exam(bank, base_dir, rng)
+    if selection is None:
+        return None, None, None
+    tasks, selected_records = selection
 
     if not tasks:
         log_gen.error("삽입할 유효한 파일(지문/문제)이 없습니다.")
         return None, None, None
 
-    out_path = _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, student_id)
-    
+    # 시험 ID 를 먼저 발급받아 시험지(docx) 이름에 씁니다. (동시 생성에도 시험지와 메타 파일이 짝을 유지)
     now = datetime.now(KST)
-    
-    count = 0
-    try:
-        for fname in os.listdir(output_dir):
-            if (fname.startswith(f"{student_id}_") and 
-                fname.endswith(".xlsx") and
-                "_graded.xlsx" not in fname and
-                "_result.xlsx" not in fname and
-                not fname.startswith("user_weakness_")):
-                count += 1
-    except FileNotFoundError:
-        pass
-    exam_count = count + 1
-    
+    exam_count = next_exam_count(output_dir, student_id)     # 폴더를 훑지 않고 장부에서 발급 (동시 생성에도 겹치지 않음)
     exam_id = make_exam_id(student_id=student_id, now=now, exam_count=exam_count)
-    
-    meta_xlsx_path = os.path.abspath(os.path.join(output_dir, f"{exam_id}.xlsx"))
-    meta_df = pd.DataFrame([{"exam_id": exam_id, "student_id": student_id,
-                             "student_name": student_name, "exam_name": title,
-                             "timestamp": now.isoformat(timespec="seconds")}])
-
-    with pd.ExcelWriter(meta_xlsx_path, engine="openpyxl") as writer:
-        pd.DataFrame(selected_records).to_excel(writer, index=False, sheet_name="selected_problems")
-        meta_df.to_excel(writer, index=False, sheet_name="meta")
-    log_gen.info(f"메타 파일 저장 완료: {meta_xlsx_path}")
+
+    out_path = _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id, engine=engine)
+
+    meta_xlsx_path = _write_exam_meta(output_dir, exam_id, student_id, student_name, title, now, selected_records,
+                                      output_format=output_format)
 
     return out_path, meta_xlsx_path, exam_id
 
 # ---------- 2. 맞춤형 시험지 생성 (IRT + 취약점) ----------
 def generate_exam_irt_weakness(
-    db_path: str, base_dir: str, user_weakness_path: str, user_theta: float,
+    db_path: str, base_dir: str, user_weakness_path: str, user_theta: float | None,
     title: str, subtitle: str | None = None, num_passages: int = 7,
     num_problems_per_passage: int = 4, weak_passage_target_prop: float = 0.6,
     weak_problem_boost: float = 1.5, two_columns: bool = True,
-    output_dir: str = "./output", student_id: str = "S000", student_name: str = "학생"
+    output_dir: str = "./output", student_id: str = "S000", student_name: str = "학생",
+    engine: str = DEFAULT_DOCX_ENGINE, rng: np.random.Generator | None = None, graded_dir: str | None = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
 ):
+    # user_weakness_path: 취약점 저장소(weakness.sqlite, student_id 의 기록 사용) 또는 기존 취약점 엑셀 파일
+    # user_theta 가 None 이면 graded_dir(기본: output_dir)의 가장 최근 채점 결과에서 추정한 값을 씁니다.
+    if user_theta is None:
+        user_theta, theta_se = latest_theta(graded_dir or output_dir, student_id, db_path=db_path)
+        if user_theta is None:
+            log_gen.warning(f"{student_id}: 채점 기록에서 추정 능력치를 찾지 못해 Theta=0.0 으로 진행합니다.")
+            user_theta = 0.0
+        else:
+            log_gen.info(f"최근 채점 결과의 추정 능력치 사용: Theta={user_theta:.2f} (SE={theta_se})")
     log_gen.info(f"맞춤형(IRT) 시험지 생성 시작 (학생: {student_name}, ID: {student_id}, Theta: {user_theta})")
     os.makedirs(output_dir, exist_ok=True)
-    rng = np.random.default_rng()
+    rng = rng if rng is not None else np.random.default_rng()
 
     try:
-        df_db = pd.read_excel(db_path, sheet_name=0)
+        bank = get_item_bank(db_path)
     except Exception as e:
         log_gen.error(f"DB 읽기 실패: {e}")
         return None, None, None
     
-    need = {"지문id","문제id","지문유형","문제유형","정답","과목", "irt_difficulty_b", "irt_discrimination_a"}
-    if not all(c in df_db.columns for c in need):
-        log_gen.error(f"DB에 필요한 IRT 컬럼 부족: {set(need) - set(df_db.columns)}")
+    if not all(c in bank.columns for c in IRT_NEED_COLS):
+        log_gen.error(f"DB에 필요한 IRT 컬럼 부족: {set(IRT_NEED_COLS) - set(bank.columns)}")
         return None, None, None
 
     weak_passage_set, weak_problem_set = set(), set()
-    if not os.path.exists(user_weakness_path):
+    # 저장소는 파일이 없어도 폴더만 있으면 엽니다. (같은 폴더의 기존 user_weakness 엑셀 파일을 옮겨 옴)
+    is_store = not user_weakness_path.lower().endswith((".xlsx", ".xls"))
+    if not (os.path.isdir(os.path.dirname(os.path.abspath(user_weakness_path))) if is_store
+            else os.path.exists(user_weakness_path)):
         log_gen.warning(f"취약점 파일({user_weakness_path})을 찾을 수 없음. 랜덤 선택으로 진행.")
         weak_passage_target_prop = 0.0
     else:
         try:
-            weak_passage_set = set(pd.read_excel(user_weakness_path, sheet_name="weak_passages")['지문유형코드'])
-            weak_problem_set = set(pd.read_excel(user_weakness_path, sheet_name="weak_problems")['문제유형코드'])
+            weak_passage_set, weak_problem_set = _load_weakness_sets(user_weakness_path, student_id)
             log_gen.info(f"취약 지문({len(weak_passage_set)}개), 취약 문제({len(weak_problem_set)}개) 로드")
         except Exception as e:
             log_gen.error(f"사용자 취약점 파일 읽기 실패: {e}")
             return None, None, None
 
-    df_passages = df_db.loc[:, ["지문id","지문유형"]].dropna().drop_duplicates(subset=["지문id"])
-    if df_passages.empty:
-        log_gen.error("DB에 지문 후보가 없습니다.")
+    selection = _select_irt_exam(
+        bank, base_dir, weak_passage_set, weak_problem_set, user_theta,
+        num_passages, num_problems_per_passage, weak_passage_target_prop, weak_problem_boost, rng
+    )
+    if selection is None:
         return None, None, None
-    
-    df_passages['is_weak'] = df_passages['지문유형'].isin(weak_passage_set)
-    n_weak_target = int(num_passages * weak_passage_target_prop)
-    df_weak_available = df_passages[df_passages['is_weak']]
-    df_other_available = df_passages[~df_passages['is_weak']]
-    n_weak = min(n_weak_target, len(df_weak_available))
-    n_other = num_passages - n_weak
-    if n_other > len(df_other_available):
-        log_gen.warning(f"비취약 지문 수 부족 (필요: {n_other}, 가능: {len(df_other_available)})")
-        n_other = len(df_other_available)
-        n_weak = min(num_passages - n_other, len(df_weak_available))
-    
-    df_weak_selected = df_weak_available.sample(n_weak, random_state=rng) if n_weak > 0 else pd.DataFrame()
-    df_other_selected = df_other_available.sample(n_other, random_state=rng) if n_other > 0 else pd.DataFrame()
-    selected_passages = pd.concat([df_weak_selected, df_other_selected]).sample(frac=1, random_state=rng)
-    log_gen.info(f"지문 선택: 총 {len(selected_passages)}개 (취약 {n_weak}개, 일반 {n_other}개)")
-
-    tasks, selected_records = [], []
-    for _, p_row in selected_passages.iterrows():
-        pid = p_row["지문id"]
-        p_path = os.path.join(base_dir, "지문", f"{pid}.docx")
-        if os.path.exists(p_path):
-            tasks.append((f"지문 {pid}", p_path))
-        else:
-            log_gen.warning(f"지문 파일 없음: {p_path} (스킵)")
-            continue
-
-        related_problems = df_db[df_db["지문id"] == pid].copy()
-        if related_problems.empty: continue
-            
-        related_problems['is_weak'] = related_problems['문제유형'].isin(weak_problem_set)
-        info_score = related_problems['irt_discrimination_a'] / (1.0 + np.abs(related_problems['irt_difficulty_b'] - user_theta))
-        weak_bonus = np.where(related_problems['is_weak'], weak_problem_boost, 1.0)
-        related_problems['final_score'] = info_score * weak_bonus
-        selected_problems = related_problems.nlargest(num_problems_per_passage, 'final_score')
-
-        for _, q in selected_problems.iterrows():
-            qid = str(q["문제id"])
-            q_path = os.path.join(base_dir, "문제", f"{qid}.docx")
-            if os.path.exists(q_path):
-                tasks.append((f"문제 {qid}", q_path))
-                selected_records.append({"problem_id": qid, "answer": q.get("정답", ""),
-                                         "subject": q.get("과목", ""), "problem_type": q.get("문제유형", "")})
-            else:
-                log_gen.warning(f"문제 파일 없음: {q_path}")
+    tasks, selected_records = selection
 
     if not tasks:
         log_gen.error("삽입할 유효한 파일(지문/문제)이 없습니다.")
         return None, None, None
 
-    out_path = _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, student_id)
-    
+    # 시험 ID 를 먼저 발급받아 시험지(docx) 이름에 씁니다. (동시 생성에도 시험지와 메타 파일이 짝을 유지)
     now = datetime.now(KST)
-    
-    count = 0
-    try:
-        for fname in os.listdir(output_dir):
-            if (fname.startswith(f"{student_id}_") and 
-                fname.endswith(".xlsx") and
-                "_graded.xlsx" not in fname and
-                "_result.xlsx" not in fname and
-                not fname.startswith("user_weakness_")):
-                count += 1
-    except FileNotFoundError:
-        pass
-    exam_count = count + 1
-    
+    exam_count = next_exam_count(output_dir, student_id)     # 폴더를 훑지 않고 장부에서 발급 (동시 생성에도 겹치지 않음)
     exam_id = make_exam_id(student_id=student_id, now=now, exam_count=exam_count)
-    
-    meta_xlsx_path = os.path.abspath(os.path.join(output_dir, f"{exam_id}.xlsx"))
-    meta_df = pd.DataFrame([{"exam_id": exam_id, "student_id": student_id,
-                             "student_name": student_name, "exam_name": title,
-                             "timestamp": now.isoformat(timespec="seconds"),
-                             "user_theta": user_theta}])
-
-    with pd.ExcelWriter(meta_xlsx_path, engine="openpyxl") as writer:
-        pd.DataFrame(selected_records).to_excel(writer, index=False, sheet_name="selected_problems")
-        meta_df.to_excel(writer, index=False, sheet_name="meta")
-    log_gen.info(f"메타 파일 저장 완료: {meta_xlsx_path}")
+
+    out_path = _create_word_document(tasks, title, subtitle, student_name, two_columns, output_dir, exam_id, engine=engine)
+
+    meta_xlsx_path = _write_exam_meta(output_dir, exam_id, student_id, student_name, title, now,
+                                      selected_records, extra_meta={"user_theta": user_theta},
+                                      output_format=output_format)
 
     return out_path, meta_xlsx_path, exam_id
 
@@ -381,6 +318,7 @@ def normalize_answer_num(x) -> str:
     if x is None: return ""
     s = str(x).strip().upper()
     s = re.sub(r'[\s\(\)]', '', s)
+    s = re.sub(r'^(\d+)\.0+$', r'\1', s)  # 빈 칸이 섞여 실수로 읽힌 번호 (3.0 -> 3)
     alpha_to_num = {"A":"1", "B":"2", "C":"3", "D":"4", "E":"5"}
     return alpha_to_num.get(s, s if s in {"1","2","3","4","5"} else "")
 
@@ -397,20 +335,73 @@ def _read_answers_excel_first_col(path: str, expected_len: int) -> list[str]:
     else: norm = norm[:expected_len]
     return norm
 
+GRADING_NEED_COLS = {"problem_id", "answer", "subject", "problem_type"}
+
+def _subject_summary(g: pd.DataFrame) -> pd.DataFrame:
+    by_subject = (g.groupby("subject")["is_correct"].agg(total="size", correct="sum").reset_index())
+    by_subject["accuracy(%)"] = (by_subject["correct"]/by_subject["total"]*100).round(2)
+    return by_subject
+
+def _grade_sheets(meta, sel, g, summary_sheet, submitted_at, student_id, student_name) -> tuple[dict, dict]:
+    """채점 결과 상세 파일(..._graded)과 간단 결과 파일(..._result)의 시트 구성 {시트: DataFrame}"""
+    by_subject = _subject_summary(g)
+
+    grading_cols = list(GRADING_NEED_COLS | {"answer_num", "student_answer_num", "is_correct"})
+    graded = {
+        "meta": meta,
+        "selected_problems": sel,
+        "answers": g[['problem_id', 'student_answer_num']].assign(submitted_at=submitted_at, student_id=student_id, student_name=student_name),
+        "grading": g[grading_cols],
+        "summary": summary_sheet,
+    }
+    if not by_subject.empty:
+        graded["summary_by_subject"] = by_subject
+
+    result = {
+        "result": summary_sheet,
+        "details": g.rename(columns={"answer_num": "answer", "student_answer_num": "my_answers"})[['problem_id', 'answer', 'my_answers', 'subject', 'problem_type']],
+        "meta": meta,
+    }
+    return graded, result
+
+def _write_grade_files(graded_path, result_path, meta, sel, g, summary_sheet, submitted_at, student_id, student_name,
+                       output_format: str | None = None) -> tuple[tuple[str, str], dict]:
+    """
+    채점 결과 상세 파일(..._graded)과 간단 결과 파일(..._result)을 저장합니다.
+    output_format 이 None 이면 경로의 확장자로 형식을 정합니다.
+    반환: (실제 저장 경로 (상세, 간단), 상세 파일의 시트 {시트: DataFrame})
+    """
+    graded, result = _grade_sheets(meta, sel, g, summary_sheet, submitted_at, student_id, student_name)
+    graded_path = write_sheets(graded_path, graded, output_format)
+    result_path = write_sheets(result_path, result, output_format)
+    return (graded_path, result_path), graded
+
 def grade_exam(
     exam_xlsx_path: str,
     answers: dict[str, str] | None = None,
     interactive: bool = True,
     output_dir: str | None = None,
     answers_xlsx_path: str | None = None,
+    db_path: str | None = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    use_warehouse: bool = True,
 ) -> dict:
+    """
+    시험 메타 파일과 학생 답안으로 채점 결과(..._graded.xlsx / ..._result.xlsx)를 만듭니다.
+    답안은 answers_xlsx_path(첫 열) > answers({문제id: 번호}) > interactive 입력 순으로 사용합니다.
+    db_path 를 주면 DB의 문항 모수로 능력치(theta, EAP)와 표준오차를 추정해 summary / meta 시트에 함께 기록합니다.
+    output_format 으로 결과 파일 형식을 고릅니다. (output_writers.OUTPUT_FORMATS, 기본 xlsx)
+    use_warehouse 이면 채점 행을 출력 폴더의 결과 저장소(results_warehouse)에도 추가합니다.
+    반환 dict 의 "sheets" 는 상세 파일을 다시 읽은 것과 같은 {시트: DataFrame} 이므로
+    analyze_weakness / create_dashboard_from_sheets 에 파일을 다시 읽지 않고 넘길 수 있습니다.
+    """
     if not os.path.exists(exam_xlsx_path):
         log_grade.error(f"파일을 찾을 수 없습니다: {exam_xlsx_path}")
         return {}
 
     try:
-        sel  = pd.read_excel(exam_xlsx_path, sheet_name="selected_problems")
-        meta = pd.read_excel(exam_xlsx_path, sheet_name="meta")
+        sheets = read_sheets(exam_xlsx_path, ["selected_problems", "meta"])
+        sel, meta = sheets["selected_problems"], sheets["meta"]
     except Exception as e:
          log_grade.error(f"파일 시트 읽기 실패. 'selected_problems'/'meta' 시트 필요. ({e})")
          return {}
@@ -428,7 +419,7 @@ def grade_exam(
     
     log_grade.info(f"채점 시작 - 시험 ID: {exam_id}, 학생: {student_name} ({student_id})")
 
-    need_cols = {"problem_id", "answer", "subject", "problem_type"}
+    need_cols = GRADING_NEED_COLS
     if not all(c in sel.columns for c in need_cols):
         log_grade.error(f"selected_problems 시트에 분석용 필수 컬럼이 없습니다: {need_cols - set(sel.columns)}")
         return {}
@@ -440,6 +431,9 @@ def grade_exam(
     if answers_xlsx_path and os.path.exists(answers_xlsx_path):
         seq = _read_answers_excel_first_col(answers_xlsx_path, expected_len=len(sel))
         submitted = [{"problem_id": pid, "student_answer_num": a} for pid, a in zip(sel["problem_id"].tolist(), seq)]
+    elif answers is not None:
+        submitted = [{"problem_id": pid, "student_answer_num": normalize_answer_num(answers.get(pid, ""))}
+                     for pid in sel["problem_id"]]
     elif interactive:
         print("\n정답을 입력하세요. (1~5만 허용)")
         for _, r in sel.iterrows():
@@ -457,67 +451,111 @@ def grade_exam(
     total, correct = len(g), int(g["is_correct"].sum())
     score = round(correct / total * 100, 2) if total else 0.0
 
+    theta_info = {"theta": None, "theta_se": None, "theta_n_items": 0}
+    if db_path:
+        try:
+            keyed = g["answer_num"] != ""
+            theta_info = estimate_theta(db_path, g.loc[keyed, "problem_id"], g.loc[keyed, "is_correct"])
+        except Exception as e:
+            log_grade.warning(f"능력치(theta) 추정 실패 ({e}). 추정값 없이 저장합니다.")
+    meta = meta.assign(theta=theta_info["theta"], theta_se=theta_info["theta_se"])
+
     if output_dir is None: output_dir = os.path.dirname(exam_xlsx_path)
     os.makedirs(output_dir, exist_ok=True)
-    base = os.path.basename(exam_xlsx_path).replace(".xlsx", "")
-    graded_path = os.path.join(output_dir, f"{base}_graded.xlsx")
-    result_path = os.path.join(output_dir, f"{base}_result.xlsx")
+    base = split_output_path(os.path.basename(exam_xlsx_path))[0]
+    graded_path = os.path.join(output_dir, f"{base}_graded")
+    result_path = os.path.join(output_dir, f"{base}_result")
     submitted_at = datetime.now(KST).isoformat(timespec="seconds")
 
     summary_sheet = pd.DataFrame([{"exam_id": exam_id, "exam_name": exam_name, "created_at": created_ts,
         "submitted_at": submitted_at, "student_id": student_id, "student_name": student_name,
-        "total": total, "correct": correct, "score": score}])
-    
-    by_subject = (g.groupby("subject")["is_correct"].agg(total="size", correct="sum").reset_index())
-    by_subject["accuracy(%)"] = (by_subject["correct"]/by_subject["total"]*100).round(2)
+        "total": total, "correct": correct, "score": score, **theta_info}])
 
-    with pd.ExcelWriter(graded_path, engine="openpyxl") as writer:
-        meta.to_excel(writer, index=False, sheet_name="meta")
-        sel.to_excel(writer, index=False, sheet_name="selected_problems")
-        g[['problem_id', 'student_answer_num']].assign(submitted_at=submitted_at, student_id=student_id, student_name=student_name).to_excel(writer, index=False, sheet_name="answers")
-        
-        grading_cols = list(need_cols | {"answer_num", "student_answer_num", "is_correct"})
-        g[grading_cols].to_excel(writer, index=False, sheet_name="grading")
-
-        summary_sheet.to_excel(writer, index=False, sheet_name="summary")
-        if not by_subject.empty:
-            by_subject.to_excel(writer, index=False, sheet_name="summary_by_subject")
+    (graded_path, result_path), graded_sheets = _write_grade_files(graded_path, result_path, meta, sel, g, summary_sheet,
+                                                                   submitted_at, student_id, student_name, output_format)
 
-    with pd.ExcelWriter(result_path, engine="openpyxl") as writer:
-        summary_sheet.to_excel(writer, index=False, sheet_name="result")
-        g.rename(columns={"answer_num": "answer", "student_answer_num": "my_answers"})[['problem_id', 'answer', 'my_answers', 'subject', 'problem_type']].to_excel(writer, index=False, sheet_name="details")
-        meta.to_excel(writer, index=False, sheet_name="meta")
+    if use_warehouse:
+        append_grading_rows(output_dir, rows_from_grading(g, exam_id, student_id, created_ts, submitted_at))
 
     log_grade.info(f"채점 완료 (상세: {graded_path}, 간단: {result_path})")
     log_grade.info(f"총 {total}문항, 정답 {correct}개, 점수 {score}점")
+    if theta_info["theta"] is not None:
+        log_grade.info(f"추정 능력치 Theta={theta_info['theta']:.2f} (SE={theta_info['theta_se']:.2f}, 문항 {theta_info['theta_n_items']}개)")
 
     return {"graded_path": graded_path, "result_path": result_path, "exam_id": exam_id, 
             "student_id": student_id, "student_name": student_name, "total": total, 
-            "correct": correct, "score": score}
+            "correct": correct, "score": score, **theta_info,
+            "sheets": {name: as_read(df) for name, df in graded_sheets.items()}}
+
+# ---------- 4. 적응형(CAT) 시험 저장 및 채점 ----------
+def save_adaptive_exam(
+    session, output_dir: str, student_id: str, student_name: str,
+    title: str = "[적응형] 국어 영역 시험", db_path: str | None = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> dict:
+    """
+    끝난 CatSession 을 일반 시험과 같은 형식으로 저장합니다.
+    출제 순서대로 메타 파일을 만들고 응답으로 grade_exam 을 실행하므로 취약점 분석/대시보드를 그대로 쓸 수 있습니다.
+    반환: grade_exam 결과 dict (+ meta_path). 출제 문항이 없으면 {}
+    """
+    records = session.records()
+    if not records:
+        log_grade.error("적응형 시험에 출제된 문항이 없습니다.")
+        return {}
+    os.makedirs(output_dir, exist_ok=True)
+    now = datetime.now(KST)
+    exam_count = next_exam_count(output_dir, student_id)     # 폴더를 훑지 않고 장부에서 발급 (동시 생성에도 겹치지 않음)
+    exam_id = make_exam_id(student_id=student_id, now=now, exam_count=exam_count)
+    meta_path = _write_exam_meta(output_dir, exam_id, student_id, student_name, title, now, records,
+                                 extra_meta={"user_theta": session.start_theta, "mode": f"CAT-{session.mode}"},
+                                 output_format=output_format)
+    result = grade_exam(meta_path, answers=session.answer_map(), interactive=False,
+                        output_dir=output_dir, db_path=db_path, output_format=output_format)
+    if result:
+        result["meta_path"] = meta_path
+    return result
 
 # 취약점 갱신 함수
+WEAKNESS_SHEETS = ["meta", "summary", "summary_by_subject", "grading"]
+
 def analyze_weakness_from_graded_file(
     graded_xlsx_path: str, output_dir: str,
-    passage_threshold: float = 70.0, problem_threshold: float = 60.0
+    passage_threshold: float = 70.0, problem_threshold: float = 60.0, export_xlsx: bool = False
 ) -> str | None:
     """
-    채점 완료된 ..._graded.xlsx 파일을 분석하여 취약점 파일(user_weakness_...xlsx)을
-    누적 갱신합니다.
+    채점 완료된 ..._graded.xlsx 파일을 읽어 analyze_weakness 를 실행합니다.
+    (grade_exam 직후라면 결과의 "sheets" 를 analyze_weakness 에 바로 넘기는 편이 빠릅니다.)
     """
     if not os.path.exists(graded_xlsx_path):
         log_grade.error(f"취약점 분석 실패: 채점 파일을 찾을 수 없음 ({graded_xlsx_path})")
         return None
-    
+    try:
+        # 필요한 시트를 파일 한 번 열어 모두 읽음
+        sheets = read_sheets(graded_xlsx_path, WEAKNESS_SHEETS)
+    except Exception as e:
+        log_grade.error(f"취약점 분석 실패: 채점 파일 읽기 오류 ({e})")
+        return None
+    return analyze_weakness(sheets, output_dir, passage_threshold, problem_threshold, export_xlsx)
+
+def analyze_weakness(
+    sheets: dict, output_dir: str,
+    passage_threshold: float = 70.0, problem_threshold: float = 60.0, export_xlsx: bool = False
+) -> str | None:
+    """
+    채점 결과 시트({meta, summary, summary_by_subject, grading})를 분석하여 output_dir 의 취약점 저장소(weakness.sqlite)에
+    이번 시험의 취약 지문유형 / 문제유형을 추가합니다. 넘겨받은 DataFrame 은 바꾸지 않습니다.
+    반환: 저장소 경로 (export_xlsx=True 면 새로 만든 user_weakness_...xlsx 경로), 실패 시 None
+    """
     try:
         # --- 1. Get Student ID and define output path ---
-        student_id = str(pd.read_excel(graded_xlsx_path, sheet_name="meta").iloc[0]["student_id"])
+        student_id = str(sheets["meta"].iloc[0]["student_id"])
         log_grade.info(f"{student_id} 학생 취약점 분석 시작...")
-        output_path = os.path.join(output_dir, f"user_weakness_{student_id}.xlsx")
+        output_path = weakness_store_path(output_dir)
 
         # --- 2. Get new analysis data from the graded file ---
         
         # 2a. Get exam metadata (ID, time) from summary sheet
-        df_summary = pd.read_excel(graded_xlsx_path, sheet_name="summary")
+        df_summary = sheets["summary"]
         summary_row = df_summary.iloc[0]
         exam_id = summary_row.get("exam_id", "UNKNOWN_EXAM")
         
@@ -535,49 +573,27 @@ def analyze_weakness_from_graded_file(
         log_grade.info(f"분석 대상 시험: {exam_id} (횟수: {exam_count}, 제출: {submitted_at_date_only})")
 
         # 2b. Find weak passages
-        df_subject = pd.read_excel(graded_xlsx_path, sheet_name="summary_by_subject")
+        df_subject = sheets["summary_by_subject"].copy()
         df_subject['accuracy'] = (df_subject['correct'] / df_subject['total']) * 100
         weak_passages_found = df_subject[df_subject['accuracy'] < passage_threshold]
         
         # 2c. Find weak problems
-        df_grading = pd.read_excel(graded_xlsx_path, sheet_name="grading")
+        df_grading = sheets["grading"]
         df_problem_analysis = df_grading.groupby("problem_type")['is_correct'].agg(
             total='count', correct='sum').reset_index()
         df_problem_analysis['accuracy'] = (df_problem_analysis['correct'] / df_problem_analysis['total']) * 100
         weak_problems_found = df_problem_analysis[df_problem_analysis['accuracy'] < problem_threshold]
         
-        # 2d. Format new weakness dataframes
-        df_new_passages = pd.DataFrame({"지문유형코드": weak_passages_found['subject']})
-        df_new_passages['exam_id'] = exam_id
-        df_new_passages['submitted_at'] = submitted_at_date_only
-        df_new_passages['exam_count'] = exam_count
-        
-        df_new_problems = pd.DataFrame({"문제유형코드": weak_problems_found['problem_type']})
-        df_new_problems['exam_id'] = exam_id
-        df_new_problems['submitted_at'] = submitted_at_date_only 
-
-        # --- 3. Load old weakness data (if exists) ---
-        df_old_passages = pd.DataFrame()
-        df_old_problems = pd.DataFrame()
-        if os.path.exists(output_path):
-            try:
-                df_old_passages = pd.read_excel(output_path, sheet_name="weak_passages")
-                df_old_problems = pd.read_excel(output_path, sheet_name="weak_problems")
-                log_grade.info(f"기존 취약점 파일 로드: {output_path}")
-            except Exception as e:
-                log_grade.warning(f"기존 취약점 파일({output_path}) 읽기 실패. 새 파일로 덮어씁니다. (오류: {e})")
-
-        # --- 4. Combine old and new data ---
-        final_passages_df = pd.concat([df_old_passages, df_new_passages]).drop_duplicates()
-        final_problems_df = pd.concat([df_old_problems, df_new_problems]).drop_duplicates()
-
-        # --- 5. Save combined data ---
-        os.makedirs(output_dir, exist_ok=True)
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            final_passages_df.to_excel(writer, index=False, sheet_name="weak_passages")
-            final_problems_df.to_excel(writer, index=False, sheet_name="weak_problems")
-
-        log_grade.info(f"취약점 분석 완료 (누적 갱신): {output_path}")
+        # --- 3. Append to the weakness store (한 트랜잭션, 기존 기록은 다시 쓰지 않음) ---
+        # 학생 잠금: 기존 엑셀 옮기기 / 엑셀 내보내기가 같은 학생의 다른 채점과 겹치지 않도록
+        with student_lock(output_dir, student_id), WeaknessStore(output_path) as store:
+            n_passages, n_problems = store.record(
+                student_id, exam_id, submitted_at_date_only, exam_count,
+                weak_passages_found['subject'].dropna().unique(), weak_problems_found['problem_type'].dropna().unique())
+            log_grade.info(f"취약점 분석 완료 (누적 갱신): {output_path} (취약 지문 {n_passages}건, 취약 문제 {n_problems}건 추가)")
+            if export_xlsx:
+                output_path = store.export_xlsx(student_id, output_dir)
+                log_grade.info(f"취약점 엑셀 파일 생성: {output_path}")
         return output_path
     
     except Exception as e:
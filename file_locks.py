@@ -0,0 +1,134 @@
+# 여러 교사가 같은 서버(Streamlit)에서 동시에 작업할 때 파일이 섞이거나 깨지지 않게 하는 도구들입니다.
+# - student_lock    : 학생별 권고 잠금(advisory lock). 같은 학생의 메타/취약점 파일 쓰기를 한 번에 하나만 하게 함
+# - atomic_path     : 같은 폴더의 임시 파일에 쓴 뒤 이름 바꾸기(os.replace)로 교체. 읽는 쪽은 완성된 파일만 보게 됨
+# - session_workspace: 세션마다 따로 쓰는 임시 폴더 (같은 이름의 업로드 파일이 서로 덮어쓰지 않음)
+# 잠금은 POSIX 에서는 fcntl.flock, Windows 에서는 msvcrt.locking 을 사용합니다.
+import os
+import re
+import time
+import uuid
+import shutil
+import tempfile
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:             # Windows
+    fcntl = None
+    import msvcrt
+
+# --- 로깅 설정 ---
+log_lock = logging.getLogger("file_locks")
+
+LOCK_DIR_NAME = ".locks"
+LOCK_TIMEOUT = 60.0             # 잠금을 이 시간(초)까지 기다림
+LOCK_POLL_SECONDS = 0.05
+SESSION_PREFIX = "session_"
+SESSION_MAX_AGE_HOURS = 24      # 이보다 오래된 세션 임시 폴더는 새 세션을 만들 때 지움
+
+# 같은 프로세스 안의 스레드끼리도 순서를 지키도록 잠금 파일별 스레드 잠금을 함께 사용
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(lock_path: str) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(lock_path, threading.Lock())
+
+
+def _try_lock(f) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(lock_path: str, timeout: float = LOCK_TIMEOUT):
+    """
+    lock_path 파일로 배타 잠금을 잡습니다. (다른 프로세스/스레드가 같은 파일을 잠그고 있으면 기다림)
+    timeout 초 안에 잡지 못하면 TimeoutError 를 발생시킵니다.
+    """
+    lock_path = os.path.abspath(lock_path)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    deadline = time.monotonic() + timeout
+    tlock = _thread_lock(lock_path)
+    if not tlock.acquire(timeout=max(timeout, 0)):
+        raise TimeoutError(f"잠금 대기 시간 초과: {lock_path}")
+    try:
+        with open(lock_path, "a+b") as f:
+            while not _try_lock(f):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"잠금 대기 시간 초과: {lock_path}")
+                time.sleep(LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                _unlock(f)
+    finally:
+        tlock.release()
+
+
+def student_lock_path(base_dir: str, student_id: str) -> str:
+    """base_dir/.locks/student_{student_id}.lock (파일 이름에 쓸 수 없는 문자는 _ 로 바꿈)"""
+    safe_id = re.sub(r"[^\w.-]", "_", str(student_id))
+    return os.path.join(base_dir, LOCK_DIR_NAME, f"student_{safe_id}.lock")
+
+
+@contextmanager
+def student_lock(base_dir: str, student_id: str, timeout: float = LOCK_TIMEOUT):
+    """base_dir 안에서 학생 한 명의 파일을 쓰는 동안 잡는 잠금"""
+    with file_lock(student_lock_path(base_dir, student_id), timeout):
+        yield
+
+
+@contextmanager
+def atomic_path(path: str):
+    """
+    path 대신 쓸 임시 경로를 넘겨 주고, 블록이 정상 종료되면 임시 파일을 path 로 바꿉니다. (os.replace)
+    임시 파일은 같은 폴더에 숨김 파일(.{무작위}.tmp.{파일 이름})로 만듭니다. 확장자는 그대로라 형식 판단이 같고, glob 검색에는 걸리지 않습니다.
+    오류가 나면 임시 파일을 지우고 기존 path 는 그대로 둡니다.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex[:8]}.tmp.{name}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        raise
+
+
+def session_workspace(root: str, max_age_hours: float = SESSION_MAX_AGE_HOURS) -> str:
+    """root 아래에 이 세션만 쓰는 임시 폴더를 만들어 경로를 반환합니다. (오래된 세션 폴더는 정리)"""
+    os.makedirs(root, exist_ok=True)
+    cutoff = time.time() - max_age_hours * 3600
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if name.startswith(SESSION_PREFIX) and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                log_lock.info(f"오래된 세션 임시 폴더 삭제: {path}")
+        except OSError:
+            pass
+    return tempfile.mkdtemp(prefix=SESSION_PREFIX, dir=root)
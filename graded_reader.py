@@ -0,0 +1,144 @@
+# 채점 파일(..._graded.xlsx) 등 결과 엑셀을 빠르게 읽기 위한 유틸리티입니다.
+# - read_sheets: 파일 하나를 한 번만 열어 필요한 시트만 읽습니다. (openpyxl read_only 스트리밍)
+#   openpyxl 은 엑셀 파일을 처음 읽을 때 불러옵니다. (import 만 하는 프로그램의 시작 시간을 줄이기 위함)
+#   csv / parquet / json 형식(output_writers)으로 저장된 결과도 같은 시트 / 컬럼으로 읽습니다.
+# - read_graded_files: 여러 파일을 프로세스 풀로 나눠 읽고 시트별로 하나의 DataFrame 으로 합칩니다.
+#   파일별 오류는 출력하지 않고 (경로, 메시지) 목록으로 모아 반환합니다.
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from output_writers import split_output_path, read_output_sheets
+
+# --- 로깅 설정 ---
+log_reader = logging.getLogger("graded_reader")
+
+SOURCE_COL = "source_file"
+PARALLEL_MIN_FILES = 16     # 이보다 적으면 프로세스 풀 기동 비용이 더 크므로 순차 처리
+
+
+def _dedupe_columns(names: list) -> list:
+    """중복 머리글에 .1, .2 ... 를 붙입니다. (read_excel 과 동일)"""
+    seen, out = {}, []
+    for name in names:
+        n = seen.get(name, 0)
+        out.append(name if n == 0 else f"{name}.{n}")
+        seen[name] = n + 1
+    return out
+
+
+def _infer_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """숫자 모양의 텍스트 셀로만 된 열을 숫자로 변환합니다. (read_excel 의 텍스트 파서 동작과 동일)"""
+    if df.empty:
+        return df
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def as_read(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    메모리의 DataFrame 을 파일로 저장했다가 read_sheets 로 다시 읽은 것과 같은 모양으로 만듭니다. (복사본)
+    빈 문자열은 빈 셀(None)로, 숫자 모양의 텍스트 열은 숫자로 바뀝니다.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            df[col] = pd.Series(df[col].astype(object).where(df[col] != "", None).tolist(), index=df.index)
+    return _infer_numeric(df)
+
+
+def read_sheets(path: str, sheets, columns: dict | None = None) -> dict[str, pd.DataFrame]:
+    """
+    결과 파일 하나에서 지정한 시트들만 읽습니다. (엑셀: 첫 행 = 헤더)
+    columns 에 {시트: [컬럼, ...]} 을 주면 해당 컬럼만 남깁니다.
+    없는 시트가 있으면 ValueError 를 발생시킵니다.
+    """
+    sheets = [sheets] if isinstance(sheets, str) else list(sheets)
+    if split_output_path(path)[1].lower() != ".xlsx":
+        frames = read_output_sheets(path, sheets)
+        for name, df in frames.items():
+            df.columns = _dedupe_columns(list(df.columns))
+            df = df.dropna(how="all").reset_index(drop=True)
+            if columns and name in columns:
+                df = df[[c for c in columns[name] if c in df.columns]].copy()
+            frames[name] = _infer_numeric(df)
+        return frames
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = {}
+        for name in sheets:
+            if name not in wb.sheetnames:
+                raise ValueError(f"Worksheet named '{name}' not found")
+            rows = wb[name].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                frames[name] = pd.DataFrame()
+                continue
+            # 머리글 오른쪽의 빈 열과 내용이 없는 행은 버립니다. (read_excel 과 동일)
+            width = len(header)
+            while width and header[width - 1] is None:
+                width -= 1
+            names = _dedupe_columns([h if h is not None else f"Unnamed: {i}" for i, h in enumerate(header[:width])])
+            # 크기(<dimension>) 정보가 없는 파일은 끝의 빈 셀이 빠진 짧은 행이 오므로 머리글 너비까지 채웁니다.
+            records = [r[:width] + (None,) * (width - len(r)) for r in rows if any(v is not None for v in r[:width])]
+            df = pd.DataFrame.from_records(records, columns=names)
+            if columns and name in columns:
+                df = df[[c for c in columns[name] if c in df.columns]].copy()
+            frames[name] = _infer_numeric(df)
+        return frames
+    finally:
+        wb.close()
+
+
+def _read_one(job: tuple) -> tuple[str, dict | None, str | None]:
+    path, sheets, columns = job
+    try:
+        return path, read_sheets(path, sheets, columns), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def read_graded_files(
+    paths, sheets=("answers",), columns: dict | None = None, max_workers: int | None = None
+) -> tuple[dict[str, pd.DataFrame], list[tuple[str, str]]]:
+    """
+    여러 결과 파일에서 같은 시트들을 읽어 시트별로 이어 붙입니다.
+
+    반환: ({시트: DataFrame}, [(파일 경로, 오류 메시지), ...])
+    각 DataFrame 에는 원본 파일 경로가 source_file 컬럼으로 붙습니다.
+    파일이 많으면 프로세스 풀(max_workers, 기본 CPU 수)로 나눠 읽습니다.
+    """
+    paths = list(paths)
+    sheets = [sheets] if isinstance(sheets, str) else list(sheets)
+    jobs = [(p, sheets, columns) for p in paths]
+
+    if max_workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+        results = [_read_one(job) for job in jobs]
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_read_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    parts = {name: [] for name in sheets}
+    errors = []
+    for path, frames, err in results:
+        if err is not None:
+            errors.append((path, err))
+            continue
+        for name in sheets:
+            df = frames[name]
+            df[SOURCE_COL] = path
+            parts[name].append(df)
+
+    if errors:
+        log_reader.info(f"{len(errors)}/{len(paths)}개 파일 읽기 실패")
+    merged = {name: pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame(columns=[SOURCE_COL])
+              for name, dfs in parts.items()}
+    return merged, errors
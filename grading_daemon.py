@@ -0,0 +1,351 @@
+# 답안 폴더(answers/)를 감시하다가 새 답안 파일이 들어오면 자동으로 채점하는 상주 프로그램입니다.
+# - 답안 파일 이름에서 시험 ID 를 찾아 메타 파일({exam_id}.xlsx)과 짝지은 뒤
+#   grade_exam -> analyze_weakness (채점 결과를 메모리에서 바로 사용) 를 프로세스 풀에서 실행합니다.
+# - 폴링 방식(표준 라이브러리만 사용)이라 OS 와 네트워크 드라이브에 관계없이 동작합니다.
+# - 크기/수정 시각이 debounce_seconds 동안 바뀌지 않고 엑셀로 열 수 있는 파일만 처리합니다. (복사 중인 파일 제외)
+# - 처리 결과를 SQLite 기록부(journal)에 남기므로 다시 시작해도 같은 파일을 두 번 채점하지 않습니다.
+#   파일 내용이 바뀌면(mtime/크기) 다시 채점합니다.
+# - 실패(failed)나 채점은 됐지만 취약점 갱신이 실패한(partial) 답안은 점점 긴 간격으로 MAX_ATTEMPTS 번까지 다시 시도합니다.
+#   partial 은 채점 파일이 이미 있으므로 취약점 갱신만 다시 합니다. (같은 답안을 두 번 채점하지 않음)
+# - 취약점 파일은 학생별로 누적 갱신되므로 같은 학생의 답안은 한 번에 하나씩만 처리합니다.
+import os
+import time
+import sqlite3
+import zipfile
+import logging
+import threading
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+import pandas as pd
+
+from lazy_imports import lazy_module
+from graded_reader import read_sheets
+from output_writers import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+
+# --- 로깅 설정 ---
+log_watch = logging.getLogger("grading_daemon")
+
+# 채점 모듈은 채점 프로세스가 첫 답안을 처리할 때 불러옵니다. (감시 프로세스는 불러오지 않음)
+ef = lazy_module("exam_functions")
+
+ANSWER_SUFFIX = "_answers"
+POLL_SECONDS = 2.0
+DEBOUNCE_SECONDS = 2.0
+MAX_ATTEMPTS = 3                # failed / partial 답안을 처리하는 최대 횟수 (같은 파일 내용 기준)
+RETRY_DELAY_SECONDS = 30.0      # 재시도 간격 (시도할 때마다 두 배)
+RETRY_STATUSES = ("failed", "partial")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_answers (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER, size INTEGER,
+    exam_id TEXT, student_id TEXT,
+    status TEXT NOT NULL,
+    graded_path TEXT, weakness_path TEXT,
+    score REAL, theta REAL,
+    error TEXT,
+    processed_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    next_retry_at REAL
+);
+"""
+# 이전 버전 기록부에 없던 컬럼
+_MIGRATIONS = {"attempts": "INTEGER NOT NULL DEFAULT 1", "next_retry_at": "REAL"}
+
+
+class GradingJournal:
+    """답안 파일별 처리 기록 (SQLite)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # 감시기는 run() 을 별도 스레드에서 돌릴 수 있으므로 생성 스레드 제한을 풉니다. (동시 사용은 없음)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(processed_answers)")}
+        with self.conn:
+            for col, decl in _MIGRATIONS.items():
+                if col not in existing:
+                    self.conn.execute(f"ALTER TABLE processed_answers ADD COLUMN {col} {decl}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def entry(self, path: str, stamp: tuple) -> dict | None:
+        """같은 내용(mtime/크기)의 파일에 대한 처리 기록 (없거나 파일이 바뀌었으면 None)"""
+        cur = self.conn.execute("SELECT * FROM processed_answers WHERE path = ? AND mtime_ns = ? AND size = ?",
+                                (os.path.abspath(path), stamp[0], stamp[1]))
+        row = cur.fetchone()
+        return dict(zip([d[0] for d in cur.description], row)) if row else None
+
+    def is_done(self, path: str, stamp: tuple, now: float | None = None) -> bool:
+        """
+        같은 내용(mtime/크기)의 파일을 지금 다시 처리할 필요가 없는지.
+        ok 이거나, 재시도 횟수를 다 썼거나, 다음 재시도 시각 전이면 True
+        """
+        row = self.entry(path, stamp)
+        if row is None:
+            return False
+        if row["status"] not in RETRY_STATUSES or row["attempts"] >= MAX_ATTEMPTS:
+            return True
+        return (now if now is not None else time.time()) < (row["next_retry_at"] or 0)
+
+    def record(self, path: str, stamp: tuple, status: str, **info) -> None:
+        cols = ["exam_id", "student_id", "graded_path", "weakness_path", "score", "theta", "error"]
+        values = [info.get(c) for c in cols]
+        prev = self.entry(path, stamp)
+        attempts = prev["attempts"] + 1 if prev and prev["status"] in RETRY_STATUSES else 1
+        next_retry_at = (time.time() + RETRY_DELAY_SECONDS * 2 ** (attempts - 1)
+                         if status in RETRY_STATUSES and attempts < MAX_ATTEMPTS else None)
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO processed_answers (path, mtime_ns, size, status, {', '.join(cols)}, "
+                f"processed_at, attempts, next_retry_at) VALUES (?, ?, ?, ?, {', '.join('?' * len(cols))}, ?, ?, ?)",
+                [os.path.abspath(path), stamp[0], stamp[1], status, *values,
+                 datetime.now().isoformat(timespec="seconds"), attempts, next_retry_at])
+
+    def entries(self) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM processed_answers ORDER BY processed_at", self.conn)
+
+
+def find_exam_meta(answer_path: str, meta_dir: str) -> str | None:
+    """
+    답안 파일 이름에서 메타 파일을 찾습니다.
+    S001_20251023_1_answers.xlsx -> {meta_dir}/S001_20251023_1.xlsx
+    앞에 학생 ID 등이 더 붙은 경우(S001_EX...-EXAM_answers.xlsx)는 앞 토막을 하나씩 떼어 가며 찾습니다.
+    메타 파일은 output_writers 의 어느 형식이든 찾습니다. (xlsx 우선)
+    """
+    stem = os.path.splitext(os.path.basename(answer_path))[0]
+    if stem.endswith(ANSWER_SUFFIX):
+        stem = stem[:-len(ANSWER_SUFFIX)]
+    parts = stem.split("_")
+    for i in range(len(parts)):
+        cand = os.path.join(meta_dir, "_".join(parts[i:]))
+        for ext in dict.fromkeys(OUTPUT_FORMATS.values()):
+            if os.path.isfile(cand + ext):
+                return cand + ext
+    return None
+
+
+def _is_complete_xlsx(path: str) -> bool:
+    """쓰기가 끝난 xlsx 인지 (zip 목차를 읽을 수 있는지) 확인합니다."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return "[Content_Types].xml" in zf.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def _grade_job(job: dict) -> dict:
+    """
+    답안 파일 하나 채점 + 취약점 갱신 (프로세스 풀 작업 단위)
+    job 에 이전 시도의 graded_path 가 있으면(partial 재시도) 채점은 건너뛰고 그 파일로 취약점 갱신만 합니다.
+    """
+    out = {"path": job["path"], "stamp": job["stamp"], "exam_id": job["exam_id"], "student_id": job["student_id"],
+           "status": "failed", "graded_path": None, "weakness_path": None, "score": job.get("score"),
+           "theta": job.get("theta"), "error": None}
+    try:
+        if job.get("graded_path") and os.path.exists(job["graded_path"]):
+            out["graded_path"] = job["graded_path"]
+            out["status"] = "partial"
+            out["weakness_path"] = ef.analyze_weakness_from_graded_file(job["graded_path"], job["weakness_dir"])
+        else:
+            result = ef.grade_exam(job["meta_path"], interactive=False, output_dir=job["output_dir"],
+                                   answers_xlsx_path=job["path"], db_path=job["db_path"],
+                                   output_format=job["output_format"])
+            if not result:
+                out["error"] = "채점 실패 (로그 확인)"
+                return out
+            out.update(graded_path=result["graded_path"], score=result["score"], theta=result.get("theta"))
+            out["status"] = "partial"        # 채점 파일은 저장됨. 취약점 갱신까지 끝나야 ok
+            out["weakness_path"] = ef.analyze_weakness(result["sheets"], job["weakness_dir"])
+        if out["weakness_path"] is None:
+            out["error"] = "취약점 분석 실패"
+        else:
+            out["status"] = "ok"
+    except Exception as e:
+        out["error"] = str(e)
+        log_watch.debug(traceback.format_exc())
+    return out
+
+
+class AnswerWatcher:
+    """
+    답안 폴더 감시기.
+    poll_once() 를 주기적으로 호출하거나 run() 으로 계속 실행합니다.
+    """
+
+    def __init__(
+        self, answers_dir: str, meta_dir: str, output_dir: str, journal_path: str,
+        weakness_dir: str | None = None, db_path: str | None = None, max_workers: int = 2,
+        debounce_seconds: float = DEBOUNCE_SECONDS, pattern_suffix: str = ".xlsx",
+        output_format: str = DEFAULT_OUTPUT_FORMAT
+    ):
+        self.answers_dir, self.meta_dir, self.output_dir = answers_dir, meta_dir, output_dir
+        self.weakness_dir = weakness_dir or output_dir
+        self.db_path = db_path
+        self.max_workers = max(1, int(max_workers))
+        self.debounce_seconds = debounce_seconds
+        self.pattern_suffix = pattern_suffix
+        self.output_format = output_format
+        self.journal = GradingJournal(journal_path)
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._seen: dict[str, tuple[tuple, float]] = {}     # 경로 -> (stamp, 처음 본 시각)
+        self._running: dict = {}                            # future -> job
+        self._busy_students: set[str] = set()
+        self._warned: set[tuple] = set()
+
+    def close(self, wait_running: bool = True) -> None:
+        if wait_running:
+            self._collect(block=True)
+        self._pool.shutdown(wait=wait_running, cancel_futures=not wait_running)
+        self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _warn_once(self, key: tuple, msg: str) -> None:
+        if key not in self._warned:
+            self._warned.add(key)
+            log_watch.warning(msg)
+
+    def _ready_files(self) -> list[tuple[str, tuple]]:
+        """새로 들어와 쓰기가 끝난(크기/시각이 안정된) 답안 파일 목록"""
+        now = time.time()
+        in_flight = {job["path"] for job in self._running.values()}
+        ready, present = [], set()
+        try:
+            entries = list(os.scandir(self.answers_dir))
+        except FileNotFoundError:
+            self._warn_once(("dir",), f"답안 폴더가 없습니다: {self.answers_dir}")
+            return []
+        for entry in sorted(entries, key=lambda e: e.name):
+            name = entry.name
+            if not entry.is_file() or name.startswith("~$") or not name.lower().endswith(self.pattern_suffix):
+                continue
+            path = os.path.abspath(entry.path)
+            present.add(path)
+            if path in in_flight:
+                continue
+            st = entry.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            prev = self._seen.get(path)
+            if prev is None or prev[0] != stamp:
+                self._seen[path] = (stamp, now)
+                if self.debounce_seconds > 0:
+                    continue
+            elif now - prev[1] < self.debounce_seconds:
+                continue
+            if self.journal.is_done(path, stamp):
+                continue
+            if now - st.st_mtime < self.debounce_seconds or not _is_complete_xlsx(path):
+                continue
+            ready.append((path, stamp))
+        for path in list(self._seen):
+            if path not in present:
+                del self._seen[path]
+        return ready
+
+    def _collect(self, block: bool = False) -> list[dict]:
+        if not self._running:
+            return []
+        done, _ = wait(list(self._running), timeout=None if block else 0,
+                       return_when=ALL_COMPLETED if block else FIRST_COMPLETED)
+        results = []
+        for fut in done:
+            job = self._running.pop(fut)
+            self._busy_students.discard(job["student_id"])
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = {**job, "status": "partial" if job.get("graded_path") else "failed",
+                       "error": f"작업 프로세스 오류: {e}"}
+            self.journal.record(res["path"], res["stamp"], res["status"],
+                                **{k: res.get(k) for k in ("exam_id", "student_id", "graded_path", "weakness_path",
+                                                          "score", "theta", "error")})
+            if res["status"] == "ok":
+                log_watch.info(f"채점 완료: {os.path.basename(res['path'])} -> {res['score']}점"
+                               + (f", Theta={res['theta']:.2f}" if res.get("theta") is not None else ""))
+            else:
+                entry = self.journal.entry(res["path"], res["stamp"])
+                retry = "다시 시도 예정" if entry and entry["next_retry_at"] else f"{MAX_ATTEMPTS}회 시도 후 중단"
+                what = "채점은 완료, 취약점 갱신 실패" if res["status"] == "partial" else "채점 실패"
+                log_watch.error(f"{what} ({retry}): {os.path.basename(res['path'])} ({res['error']})")
+            results.append(res)
+        return results
+
+    def poll_once(self) -> list[dict]:
+        """
+        한 번 훑어서 준비된 답안을 작업 풀에 넣고, 끝난 작업을 기록합니다.
+        실행 중 작업은 max_workers 개로 제한되며, 나머지는 다음 폴링에서 다시 확인합니다.
+        반환: 이번에 끝난 작업 결과 목록
+        """
+        results = self._collect()
+        for path, stamp in self._ready_files():
+            if len(self._running) >= self.max_workers:
+                break
+            meta_path = find_exam_meta(path, self.meta_dir)
+            if meta_path is None:
+                self._warn_once(("meta", path, stamp), f"메타 파일을 찾지 못해 대기합니다: {os.path.basename(path)}")
+                continue
+            try:
+                meta = read_sheets(meta_path, ["meta"])["meta"]
+                student_id = str(meta.iloc[0]["student_id"]) if not meta.empty else ""
+                exam_id = str(meta.iloc[0]["exam_id"]) if not meta.empty else ""
+            except Exception as e:
+                self._warn_once(("meta_read", meta_path), f"메타 파일 읽기 실패 ({meta_path}): {e}")
+                continue
+            if student_id in self._busy_students:
+                continue            # 같은 학생의 이전 답안이 끝난 뒤 처리 (취약점 파일 누적 갱신 보호)
+
+            job = {"path": path, "stamp": stamp, "meta_path": meta_path, "exam_id": exam_id,
+                   "student_id": student_id, "output_dir": self.output_dir, "weakness_dir": self.weakness_dir,
+                   "db_path": self.db_path, "output_format": self.output_format}
+            prev = self.journal.entry(path, stamp)
+            if prev is None:
+                log_watch.info(f"새 답안 감지: {os.path.basename(path)} (시험 {exam_id}, 학생 {student_id})")
+            else:
+                log_watch.info(f"다시 시도 ({prev['attempts'] + 1}/{MAX_ATTEMPTS}): {os.path.basename(path)} "
+                               f"(이전 상태 {prev['status']}: {prev['error']})")
+                if prev["status"] == "partial":
+                    job.update(graded_path=prev["graded_path"], score=prev["score"], theta=prev["theta"])
+            self._busy_students.add(student_id)
+            self._running[self._pool.submit(_grade_job, job)] = job
+        return results
+
+    def drain(self) -> list[dict]:
+        """지금 준비된 답안을 모두 채점할 때까지 처리하고 결과를 반환합니다. (한 번만 실행할 때)"""
+        results = []
+        while True:
+            results += self.poll_once()
+            if not self._running:
+                return results
+            wait(list(self._running), return_when=FIRST_COMPLETED)
+
+    def run(self, poll_seconds: float = POLL_SECONDS, stop_event: threading.Event | None = None) -> None:
+        """stop_event 가 설정되거나 Ctrl+C 를 누를 때까지 감시합니다."""
+        stop_event = stop_event or threading.Event()
+        log_watch.info(f"답안 폴더 감시 시작: {os.path.abspath(self.answers_dir)} (작업 {self.max_workers}개, {poll_seconds}초 간격)")
+        try:
+            while not stop_event.is_set():
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    # 네트워크 드라이브 끊김 등 일시적인 오류로 감시가 멈추지 않도록 기록만 하고 계속합니다.
+                    log_watch.error(f"폴더 확인 중 오류 (계속 감시): {e}")
+                    log_watch.debug(traceback.format_exc())
+                stop_event.wait(poll_seconds)
+        except KeyboardInterrupt:
+            log_watch.info("감시 중지 요청 (Ctrl+C). 실행 중인 채점이 끝나면 종료합니다.")
+        self._collect(block=True)
@@ -0,0 +1,64 @@
+# 선지별 정답률로 IRT 모의 값(난이도 b, 변별도 a)을 계산하는 공용 모듈입니다.
+# generate_irt_from_distractors.py(초기 생성)와 update_irt_from_graded_files.py(채점 결과로 갱신)가 함께 사용합니다.
+# 문항 하나씩 반복하지 않고 (문항 수 x 5) 정답률 행렬 전체를 NumPy 배열 연산으로 한 번에 계산합니다.
+import numpy as np
+import pandas as pd
+
+OPTION_RATE_COLS = [f"선지정답률_{i}" for i in range(1, 6)]
+IRT_COLS = ["irt_difficulty_b", "irt_discrimination_a"]
+
+P_CLIP = (0.01, 0.99)       # logit 변환 시 무한대를 막기 위한 정답률 범위
+A_CLIP = (0.3, 2.5)         # 변별도 극단값 제한
+A_LOW_INFO = 0.5            # 오답자가 거의 없을 때의 변별도
+
+
+def _valid_answers(answers) -> tuple[np.ndarray, np.ndarray]:
+    """정답 벡터를 (0-based 선지 번호, 유효 마스크)로 변환합니다. 숫자가 아니거나 1~5 밖이면 무효."""
+    ans = pd.to_numeric(pd.Series(answers), errors="coerce").to_numpy(dtype=float)
+    finite = np.isfinite(ans)
+    ans_int = np.where(finite, np.trunc(np.where(finite, ans, 0)), 0).astype(np.int64)   # int() 와 같은 절삭
+    valid = finite & (ans_int >= 1) & (ans_int <= 5)
+    return np.where(valid, ans_int - 1, 0), valid
+
+
+def calibrate_from_option_rates(option_rates, answers) -> tuple[np.ndarray, np.ndarray]:
+    """
+    선지별 정답률 행렬(문항 수 x 5)과 정답 벡터로 (b, a) 배열을 계산합니다.
+
+    - b = -logit(p_correct), p_correct 는 [0.01, 0.99] 로 제한
+    - a = 0.5 + 2.5 * (최대 오답 선지 선택률 / 오답률 - 0.2), [0.3, 2.5] 로 제한 (오답률 < 0.01 이면 0.5)
+    - 정답이 무효한 문항은 b, a 모두 NaN
+    결과는 소수점 4자리로 반올림합니다.
+    """
+    rates = np.asarray(option_rates, dtype=float).reshape(-1, 5)
+    idx, valid = _valid_answers(answers)
+    n = rates.shape[0]
+    rows = np.arange(n)
+
+    p_correct = np.clip(rates[rows, idx], *P_CLIP)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = -np.log(p_correct / (1 - p_correct))
+
+    # 오답 선지 중 최대 선택률. 선지 순서대로 '더 크면 교체' 하므로 NaN 이 섞여도 기존 max() 와 같은 값이 됩니다.
+    max_distractor = None
+    for k in range(4):
+        cand = rates[rows, k + (k >= idx)]      # 정답 선지를 건너뛴 k 번째 오답 선지
+        max_distractor = cand if max_distractor is None else np.where(cand > max_distractor, cand, max_distractor)
+
+    p_incorrect = 1 - p_correct
+    with np.errstate(divide="ignore", invalid="ignore"):
+        attractiveness = np.where(p_incorrect > 0, max_distractor / p_incorrect, 0.0)
+    a = np.clip(0.5 + 2.5 * (attractiveness - 0.2), *A_CLIP)
+    a = np.where(p_incorrect < 0.01, A_LOW_INFO, a)
+
+    b = np.where(valid, np.round(b, 4), np.nan)
+    a = np.where(valid, np.round(a, 4), np.nan)
+    return b, a
+
+
+def calibrate_frame(df: pd.DataFrame, answer_col: str = "정답", rate_cols: list[str] = OPTION_RATE_COLS) -> pd.DataFrame:
+    """문항 DataFrame 의 정답/선지정답률 컬럼으로 IRT 값을 계산해 같은 인덱스의 DataFrame(IRT_COLS)으로 반환합니다."""
+    b, a = calibrate_from_option_rates(df[rate_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float),
+                                       df[answer_col].to_numpy())
+    return pd.DataFrame({"irt_difficulty_b": b, "irt_discrimination_a": a}, index=df.index)
+
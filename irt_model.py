@@ -0,0 +1,278 @@
+# 학생 응답 패턴으로 2PL IRT 모수를 추정하는 모듈입니다. (주변 최대우도, 구적점 EM)
+# - 응답 행렬: 행 = 채점된 시험 1건, 열 = 문항, 값 = 1(정답) / 0(오답) / -1(미응시). int8 memmap(.npy)으로 디스크에 두고
+#   행 단위 청크로 읽으므로 응답 수가 수백만 건이어도 메모리 사용량이 일정합니다.
+# - E-step: 청크별로 각 행의 능력 사후분포(구적점 가중치)를 구해 문항별 기대 응시/정답 수를 누적합니다.
+# - M-step: 모든 문항을 동시에 뉴턴-랩슨으로 갱신합니다. (P = 1 / (1 + exp(-(a*theta + c))), b = -c / a)
+# - 표준오차: 행별 점수(score)의 외적 합(XPD)으로 문항별 2x2 정보행렬을 만들어 계산합니다.
+import os
+import logging
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+
+from graded_reader import read_graded_files, SOURCE_COL
+
+# --- 로깅 설정 ---
+log_irt = logging.getLogger("irt_model")
+
+MISSING = -1
+
+# 추정 설정 기본값
+N_QUAD = 41                 # 능력 구적점 수 (-4 ~ 4)
+CHUNK_ROWS = 20000          # E-step 한 번에 읽는 행 수
+PRIOR_LOG_A = (0.0, 0.5)    # log(a) ~ N(0, 0.5^2): 응답이 적은 문항의 변별도가 발산하지 않도록
+PRIOR_C = (0.0, 3.0)        # 절편 c ~ N(0, 3^2): 전원 정답/오답 문항의 난이도 발산 방지
+A_RANGE = (0.05, 6.0)
+
+
+@dataclass
+class ResponseMatrix:
+    matrix: np.ndarray              # (시험 수 x 문항 수) int8, np.memmap 일 수 있음
+    item_ids: list[str]
+    rows: pd.DataFrame              # 행 정보 (source_file, exam_id, student_id)
+    path: str | None = None
+
+    @classmethod
+    def open(cls, path: str) -> "ResponseMatrix":
+        """build_response_matrix 로 저장한 행렬을 다시 엽니다. (읽기 전용 memmap)"""
+        matrix = np.load(path, mmap_mode="r")
+        stem = os.path.splitext(path)[0]
+        item_ids = pd.read_csv(f"{stem}_items.csv", dtype=str)["problem_id"].tolist()
+        rows = pd.read_csv(f"{stem}_rows.csv", dtype=str)
+        return cls(matrix, item_ids, rows, path)
+
+
+@dataclass
+class CalibrationResult:
+    item_ids: list[str]
+    a: np.ndarray
+    b: np.ndarray
+    se_a: np.ndarray
+    se_b: np.ndarray
+    n_responses: np.ndarray
+    p_correct: np.ndarray
+    converged: bool
+    n_iter: int
+    loglik: float
+    history: list[dict] = field(default_factory=list)
+
+    def to_frame(self) -> pd.DataFrame:
+        """문항별 결과 (DB 컬럼명 기준)"""
+        return pd.DataFrame({
+            "문제id": self.item_ids,
+            "irt_difficulty_b": np.round(self.b, 4),
+            "irt_discrimination_a": np.round(self.a, 4),
+            "irt_difficulty_b_se": np.round(self.se_b, 4),
+            "irt_discrimination_a_se": np.round(self.se_a, 4),
+            "irt_n_responses": self.n_responses,
+            "irt_p_correct": np.round(self.p_correct, 4),
+        })
+
+    def diagnostics(self) -> dict:
+        return {"converged": self.converged, "n_iter": self.n_iter, "loglik": self.loglik,
+                "n_items": len(self.item_ids), "n_responses": int(self.n_responses.sum()),
+                "max_change": self.history[-1]["max_change"] if self.history else None}
+
+
+# ---------- 응답 행렬 ----------
+def build_response_matrix(graded_paths, out_path: str, item_ids=None, max_workers: int | None = None) -> ResponseMatrix:
+    """
+    채점 파일들의 grading 시트(problem_id, is_correct)로 int8 응답 행렬을 만들어 out_path(.npy)에 저장합니다.
+    item_ids 를 주면 그 순서로 열을 고정합니다. (없으면 응답에 등장한 문항을 정렬해 사용)
+    같은 경로에 문항 목록(_items.csv)과 행 정보(_rows.csv)를 함께 저장합니다.
+    """
+    frames, errors = read_graded_files(
+        graded_paths, ["grading", "meta"],
+        columns={"grading": ["problem_id", "is_correct"], "meta": ["exam_id", "student_id"]},
+        max_workers=max_workers)
+    for path, err in errors:
+        log_irt.warning(f"응답 행렬 제외 ({path}): {err}")
+
+    grading = frames["grading"].dropna(subset=["problem_id"])
+    grading = grading.assign(problem_id=grading["problem_id"].astype(str))
+    files = pd.Index(grading[SOURCE_COL].unique())
+    items = pd.Index([str(x) for x in item_ids]) if item_ids is not None else pd.Index(sorted(grading["problem_id"].unique()))
+
+    rows = pd.DataFrame({SOURCE_COL: files})
+    meta = frames["meta"]
+    if not meta.empty:
+        meta = meta.drop_duplicates(subset=[SOURCE_COL]).set_index(SOURCE_COL)
+        for col in ("exam_id", "student_id"):
+            if col in meta.columns:
+                rows[col] = files.map(meta[col].astype(str)).to_numpy()
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    matrix = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.int8, shape=(len(files), len(items)))
+    matrix[:] = MISSING
+    r = files.get_indexer(grading[SOURCE_COL])
+    c = items.get_indexer(grading["problem_id"])
+    ok = c >= 0
+    if (~ok).any():
+        log_irt.warning(f"문항 목록에 없는 응답 {int((~ok).sum())}건 제외")
+    correct = pd.to_numeric(grading["is_correct"], errors="coerce").to_numpy()
+    ok &= ~np.isnan(correct)
+    matrix[r[ok], c[ok]] = (correct[ok] > 0).astype(np.int8)
+    matrix.flush()
+
+    stem = os.path.splitext(out_path)[0]
+    pd.DataFrame({"problem_id": items}).to_csv(f"{stem}_items.csv", index=False)
+    rows.to_csv(f"{stem}_rows.csv", index=False)
+    log_irt.info(f"응답 행렬 저장: {out_path} ({len(files)}건 x {len(items)}문항, 응답 {int(ok.sum())}개)")
+    return ResponseMatrix(np.load(out_path, mmap_mode="r"), list(items), rows, out_path)
+
+
+# ---------- 2PL EM ----------
+def _quadrature(n_quad: int) -> tuple[np.ndarray, np.ndarray]:
+    nodes = np.linspace(-4.0, 4.0, n_quad)
+    w = np.exp(-0.5 * nodes ** 2)
+    return nodes, w / w.sum()
+
+
+def _chunks(n_rows: int, chunk_rows: int):
+    for start in range(0, n_rows, chunk_rows):
+        yield slice(start, min(start + chunk_rows, n_rows))
+
+
+def _e_step(matrix, a, c, nodes, log_w, chunk_rows, want_scores=False):
+    """
+    기대 응시 수 n(문항 x 구적점), 기대 정답 수 r, 주변 로그우도를 누적합니다.
+    want_scores=True 이면 문항별 XPD 정보행렬 성분(aa, ac, cc)도 함께 누적합니다.
+    """
+    n_items, n_quad = len(a), len(nodes)
+    z = np.outer(nodes, a) + c                      # (Q x J)
+    logp = -np.logaddexp(0.0, -z)
+    log1mp = -np.logaddexp(0.0, z)
+    P = np.exp(logp)
+    n_exp = np.zeros((n_items, n_quad))
+    r_exp = np.zeros((n_items, n_quad))
+    xpd = np.zeros((3, n_items)) if want_scores else None
+    loglik = 0.0
+
+    for sl in _chunks(matrix.shape[0], chunk_rows):
+        X = np.asarray(matrix[sl])
+        Y = (X == 1).astype(np.float64)
+        Mk = (X >= 0).astype(np.float64)
+        L = Y @ logp.T + (Mk - Y) @ log1mp.T + log_w          # (r x Q)
+        Lmax = L.max(axis=1, keepdims=True)
+        post = np.exp(L - Lmax)
+        s = post.sum(axis=1, keepdims=True)
+        post /= s
+        loglik += float((np.log(s) + Lmax).sum())
+        n_exp += Mk.T @ post
+        r_exp += Y.T @ post
+
+        if want_scores:
+            e_theta = post @ nodes                               # (r,)
+            s0 = post @ P                                        # E[P_j]
+            s1 = post @ (P * nodes[:, None])                     # E[theta * P_j]
+            g_a = Mk * (Y * e_theta[:, None] - s1)
+            g_c = Mk * (Y - s0)
+            xpd[0] += (g_a * g_a).sum(axis=0)
+            xpd[1] += (g_a * g_c).sum(axis=0)
+            xpd[2] += (g_c * g_c).sum(axis=0)
+    return n_exp, r_exp, loglik, xpd
+
+
+def _m_step(a, c, n_exp, r_exp, nodes, n_newton=5):
+    """모든 문항의 (a, c)를 동시에 뉴턴-랩슨으로 갱신합니다. (사전분포 포함 최대 사후 추정)"""
+    mu_la, sd_la = PRIOR_LOG_A
+    mu_c, sd_c = PRIOR_C
+    for _ in range(n_newton):
+        P = 1.0 / (1.0 + np.exp(-(np.outer(a, nodes) + c[:, None])))   # (J x Q)
+        resid = r_exp - n_exp * P
+        W = n_exp * P * (1.0 - P)
+        g_a = (resid * nodes).sum(axis=1)
+        g_c = resid.sum(axis=1)
+        h_aa = -(W * nodes ** 2).sum(axis=1)
+        h_ac = -(W * nodes).sum(axis=1)
+        h_cc = -W.sum(axis=1)
+
+        # log(a) ~ N(mu, sd^2) 의 a 에 대한 1, 2차 미분
+        la = np.log(a)
+        g_a += -(la - mu_la) / (sd_la ** 2 * a) - 1.0 / a
+        h_aa += (la - mu_la - 1.0 + sd_la ** 2) / (sd_la ** 2 * a ** 2)
+        g_c += -(c - mu_c) / sd_c ** 2
+        h_cc += -1.0 / sd_c ** 2
+
+        det = h_aa * h_cc - h_ac ** 2
+        safe = (det > 1e-12) & (h_aa < 0)
+        da = np.where(safe, (h_cc * g_a - h_ac * g_c) / np.where(safe, det, 1.0), 0.0)
+        dc = np.where(safe, (h_aa * g_c - h_ac * g_a) / np.where(safe, det, 1.0), 0.0)
+        # 한 번에 너무 크게 움직이지 않도록 제한
+        a = np.clip(a - np.clip(da, -0.5, 0.5), *A_RANGE)
+        c = c - np.clip(dc, -1.0, 1.0)
+    return a, c
+
+
+def calibrate_2pl(
+    data: ResponseMatrix, n_quad: int = N_QUAD, max_iter: int = 500, tol: float = 1e-4,
+    chunk_rows: int = CHUNK_ROWS, init: pd.DataFrame | None = None
+) -> CalibrationResult:
+    """
+    응답 행렬로 2PL 모수를 주변 최대우도(EM)로 추정합니다. 능력 분포는 N(0, 1) 로 고정합니다.
+    init 에 DB(문제id, irt_difficulty_b, irt_discrimination_a)를 주면 초기값으로 사용합니다.
+    수렴 기준: 모든 문항의 a, b 변화량 최대값 < tol
+    """
+    matrix = data.matrix
+    n_items = matrix.shape[1]
+    nodes, w = _quadrature(n_quad)
+    log_w = np.log(w)
+
+    # 문항별 응시 수 / 정답률 (청크 단위로 계산)
+    n_resp = np.zeros(n_items, dtype=np.int64)
+    n_correct = np.zeros(n_items, dtype=np.int64)
+    for sl in _chunks(matrix.shape[0], chunk_rows):
+        X = np.asarray(matrix[sl])
+        n_resp += (X >= 0).sum(axis=0)
+        n_correct += (X == 1).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_correct = np.where(n_resp > 0, n_correct / n_resp, np.nan)
+
+    a = np.ones(n_items)
+    p0 = np.clip(np.nan_to_num(p_correct, nan=0.5), 0.02, 0.98)
+    c = np.log(p0 / (1 - p0))
+    if init is not None:
+        ref = init.assign(문제id=init["문제id"].astype(str)).drop_duplicates(subset=["문제id"])
+        ref = ref.set_index("문제id").reindex(data.item_ids)
+        b0 = pd.to_numeric(ref["irt_difficulty_b"], errors="coerce").to_numpy()
+        a0 = pd.to_numeric(ref["irt_discrimination_a"], errors="coerce").to_numpy()
+        has = np.isfinite(a0) & np.isfinite(b0)
+        a = np.where(has, np.clip(np.nan_to_num(a0, nan=1.0), *A_RANGE), a)
+        c = np.where(has, -a * np.nan_to_num(b0), c)
+
+    history, converged, loglik = [], False, -np.inf
+    for it in range(1, max_iter + 1):
+        n_exp, r_exp, loglik, _ = _e_step(matrix, a, c, nodes, log_w, chunk_rows)
+        a_new, c_new = _m_step(a, c, n_exp, r_exp, nodes)
+        max_change = float(max(np.abs(a_new - a).max(initial=0.0),
+                               np.abs(-c_new / a_new + c / a).max(initial=0.0)))
+        a, c = a_new, c_new
+        history.append({"iter": it, "loglik": loglik, "max_change": max_change})
+        if max_change < tol:
+            converged = True
+            break
+    if not converged:
+        log_irt.warning(f"2PL 추정이 {max_iter}회 안에 수렴하지 않았습니다. (최대 변화량 {history[-1]['max_change']:.2e})")
+
+    # 표준오차: XPD 정보행렬 (문항별 2x2, 사전분포 곡률 포함)
+    _, _, loglik, xpd = _e_step(matrix, a, c, nodes, log_w, chunk_rows, want_scores=True)
+    i_aa = xpd[0] + (1.0 / (PRIOR_LOG_A[1] ** 2 * a ** 2))
+    i_ac = xpd[1]
+    i_cc = xpd[2] + 1.0 / PRIOR_C[1] ** 2
+    det = i_aa * i_cc - i_ac ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_a = np.where(det > 0, i_cc / det, np.nan)
+        var_c = np.where(det > 0, i_aa / det, np.nan)
+        cov_ac = np.where(det > 0, -i_ac / det, np.nan)
+        b = -c / a
+        # b = -c/a 의 델타 방법: db/da = c/a^2, db/dc = -1/a
+        ga, gc = c / a ** 2, -1.0 / a
+        var_b = ga ** 2 * var_a + gc ** 2 * var_c + 2 * ga * gc * cov_ac
+    se_a, se_b = np.sqrt(var_a), np.sqrt(np.maximum(var_b, 0.0))
+    no_data = n_resp == 0
+    for arr in (se_a, se_b):
+        arr[no_data] = np.nan
+
+    log_irt.info(f"2PL 추정 완료: {len(history)}회 반복, 수렴={converged}, 로그우도={loglik:.2f}")
+    return CalibrationResult(list(data.item_ids), a, b, se_a, se_b, n_resp, p_correct,
+                             converged, len(history), loglik, history)
@@ -0,0 +1,137 @@
+# 채점된 응답 전체로 고전 검사 이론(CTT) 문항 분석을 하는 모듈입니다.
+# - 문항 정답률(p), 교정 점이연 상관(문항 점수 vs 그 문항을 뺀 나머지 정답률), 상하위 변별도(D)
+# - 능력 분위(시험 정답률 기준 5분위)별 선지 선택률 (오답 선지 곡선)
+# - 같은 문항 구성으로 치른 시험 묶음(시험지 형태)별 KR-20 신뢰도
+# 응답 한 줄 = (시험, 문항, 제출 답, 정답 여부) 인 긴 표를 받아 np.bincount 로 한 번에 집계하므로
+# 문항이나 시험을 하나씩 반복하지 않고 응답 수십만 줄도 몇 초 안에 계산합니다.
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+IA_COLS = ["ia_n_responses", "ia_p_value", "ia_point_biserial", "ia_upper_lower_d"]
+N_GROUPS = 5                    # 능력 분위 수
+OPTION_LABELS = [str(i) for i in range(1, 6)]
+MIN_FORM_EXAMS = 2              # KR-20 을 계산하는 최소 응시 수
+
+
+@dataclass
+class ItemAnalysisResult:
+    items: pd.DataFrame         # 문제id, IA_COLS, 선지1..5 선택률
+    curves: pd.DataFrame        # 문제id, 능력 분위, 응시 수, 정답률, 선지1..5 선택률
+    forms: pd.DataFrame         # 시험지 형태별 문항 수, 응시 수, 평균/표준편차, KR-20
+
+    def db_frame(self) -> pd.DataFrame:
+        """DB 에 기록할 문항별 값 (문제id, IA_COLS)"""
+        return self.items[["문제id", *IA_COLS]]
+
+
+def _ratio(num, den) -> np.ndarray:
+    num, den = np.asarray(num, dtype=float), np.asarray(den, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def analyze_items(responses: pd.DataFrame, exam_col: str = "file_id", item_col: str = "problem_id",
+                  answer_col: str = "student_answer_num", correct_col: str = "is_correct",
+                  label_col: str | None = "exam_id", n_groups: int = N_GROUPS) -> ItemAnalysisResult:
+    """
+    응답 표(시험 x 문항 한 줄씩)로 문항 분석을 합니다. (CohortStore.items() 형식)
+    - 점이연 상관은 시험마다 문항 수가 달라도 비교되도록 '나머지 문항 정답률'과의 상관으로 계산합니다.
+    - 능력 분위는 시험 정답률 순위로 나눕니다. (1 = 하위, n_groups = 상위)
+    - 시험지 형태는 시험에 나온 문항 집합이 같은 시험끼리 묶습니다.
+    같은 시험의 같은 문항이 여러 줄이면 마지막 줄만 씁니다.
+    """
+    df = responses.dropna(subset=[exam_col, item_col]).drop_duplicates([exam_col, item_col], keep="last")
+    exam_codes, exams = pd.factorize(df[exam_col])
+    items = pd.Index(sorted(df[item_col].astype(str).unique()))
+    item_codes = items.get_indexer(df[item_col].astype(str))
+    n_exams, n_items = len(exams), len(items)
+    x = (pd.to_numeric(df[correct_col], errors="coerce").fillna(0).to_numpy() > 0).astype(np.float64)
+
+    # --- 1. 시험별 합계 / 문항 정답률 ---
+    exam_n = np.bincount(exam_codes, minlength=n_exams)
+    exam_total = np.bincount(exam_codes, weights=x, minlength=n_exams)
+    item_n = np.bincount(item_codes, minlength=n_items)
+    item_correct = np.bincount(item_codes, weights=x, minlength=n_items)
+    p_value = _ratio(item_correct, item_n)
+
+    # --- 2. 교정 점이연 상관: 문항 점수 x 와 나머지 정답률 y 의 피어슨 상관 (문항별 합계로 계산) ---
+    rest_n = exam_n[exam_codes] - 1
+    has_rest = rest_n > 0
+    y = np.where(has_rest, (exam_total[exam_codes] - x) / np.maximum(rest_n, 1), 0.0)
+    w = has_rest.astype(np.float64)
+    n = np.bincount(item_codes, weights=w, minlength=n_items)
+    sx = np.bincount(item_codes, weights=x * w, minlength=n_items)
+    sy = np.bincount(item_codes, weights=y * w, minlength=n_items)
+    syy = np.bincount(item_codes, weights=y * y * w, minlength=n_items)
+    sxy = np.bincount(item_codes, weights=x * y * w, minlength=n_items)
+    var_x = n * sx - sx * sx                # x 는 0/1 이므로 sum(x^2) = sum(x)
+    var_y = n * syy - sy * sy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pbis = np.where((var_x > 0) & (var_y > 1e-12), (n * sxy - sx * sy) / np.sqrt(var_x * var_y), np.nan)
+
+    # --- 3. 능력 분위별 정답률 / 선지 선택률 ---
+    exam_group = np.empty(n_exams, dtype=np.int64)
+    exam_group[np.argsort(_ratio(exam_total, exam_n), kind="stable")] = np.arange(n_exams) * n_groups // max(n_exams, 1)
+    cell = item_codes * n_groups + exam_group[exam_codes]
+    cell_n = np.bincount(cell, minlength=n_items * n_groups).reshape(n_items, n_groups)
+    cell_correct = np.bincount(cell, weights=x, minlength=n_items * n_groups).reshape(n_items, n_groups)
+    answers = pd.to_numeric(df[answer_col], errors="coerce").to_numpy(dtype=float)
+    chosen = np.isin(answers, np.arange(1, 6))
+    opt = np.where(chosen, answers, 1).astype(np.int64) - 1
+    option_counts = np.bincount(cell[chosen] * 5 + opt[chosen], minlength=n_items * n_groups * 5).reshape(n_items, n_groups, 5)
+    group_p = _ratio(cell_correct, cell_n)
+    upper_lower = group_p[:, -1] - group_p[:, 0]
+
+    item_frame = pd.DataFrame({"문제id": items, "ia_n_responses": item_n, "ia_p_value": np.round(p_value, 4),
+                               "ia_point_biserial": np.round(pbis, 4), "ia_upper_lower_d": np.round(upper_lower, 4)})
+    overall = _ratio(option_counts.sum(axis=1), item_n[:, None])
+    for k, label in enumerate(OPTION_LABELS):
+        item_frame[f"선지{label} 선택률"] = np.round(overall[:, k], 4)
+
+    curves = pd.DataFrame({"문제id": np.repeat(items.to_numpy(), n_groups),
+                           "능력 분위": np.tile(np.arange(1, n_groups + 1), n_items),
+                           "응시 수": cell_n.ravel(), "정답률": np.round(group_p.ravel(), 4)})
+    rates = _ratio(option_counts, cell_n[:, :, None]).reshape(-1, 5)
+    for k, label in enumerate(OPTION_LABELS):
+        curves[f"선지{label} 선택률"] = np.round(rates[:, k], 4)
+    curves = curves[curves["응시 수"] > 0].reset_index(drop=True)
+
+    return ItemAnalysisResult(item_frame, curves, _form_reliability(df, exams, exam_codes, item_codes, items, x,
+                                                                     exam_n, exam_total, label_col))
+
+
+def _form_reliability(df, exams, exam_codes, item_codes, items, x, exam_n, exam_total, label_col) -> pd.DataFrame:
+    """시험지 형태(문항 집합)별 KR-20 = k/(k-1) * (1 - sum(p*q) / 총점 분산)"""
+    n_exams = len(exams)
+    # 문항 집합의 순서 무관 해시(문항 해시의 합, 2^64 에서 순환) + 문항 수로 형태를 구분
+    item_hash = pd.util.hash_array(items.to_numpy(dtype=object))
+    exam_hash = np.zeros(n_exams, dtype=np.uint64)
+    np.add.at(exam_hash, exam_codes, item_hash[item_codes])
+    exam_form = pd.DataFrame({"h": exam_hash, "k": exam_n}).groupby(["h", "k"], sort=False).ngroup().to_numpy()
+    n_forms = int(exam_form.max()) + 1 if n_exams else 0
+
+    form_n = np.bincount(exam_form, minlength=n_forms)
+    form_k = np.zeros(n_forms, dtype=np.int64)
+    form_k[exam_form] = exam_n
+    mean = _ratio(np.bincount(exam_form, weights=exam_total, minlength=n_forms), form_n)
+    var = _ratio(np.bincount(exam_form, weights=exam_total ** 2, minlength=n_forms), form_n) - mean ** 2
+
+    # (형태, 문항) 칸별 정답률 -> 형태별 sum(p*q)
+    pair = exam_form[exam_codes].astype(np.int64) * len(items) + item_codes
+    pairs, pair_codes = np.unique(pair, return_inverse=True)
+    p = _ratio(np.bincount(pair_codes, weights=x), np.bincount(pair_codes))
+    sum_pq = np.bincount(pairs // len(items), weights=p * (1 - p), minlength=n_forms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kr20 = np.where((form_n >= MIN_FORM_EXAMS) & (form_k >= 2) & (var > 1e-12),
+                        form_k / (form_k - 1) * (1 - sum_pq / var), np.nan)
+
+    first_exam = np.unique(exam_form, return_index=True)[1]      # 형태별 첫 시험
+    if label_col and label_col in df.columns:
+        exam_labels = df.groupby(exam_codes)[label_col].first().reindex(range(n_exams)).astype(object).to_numpy()
+    else:
+        exam_labels = np.asarray(exams, dtype=object)
+    forms = pd.DataFrame({"시험지 형태": [f"F{i + 1:04d}" for i in range(n_forms)], "문항 수": form_k, "응시 수": form_n,
+                          "평균 정답 수": np.round(mean, 2), "표준편차": np.round(np.sqrt(np.maximum(var, 0)), 2),
+                          "KR-20": np.round(kr20, 4), "예시 시험": exam_labels[first_exam] if n_forms else []})
+    return forms.sort_values(["응시 수", "시험지 형태"], ascending=[False, True]).reset_index(drop=True)
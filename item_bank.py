@@ -0,0 +1,261 @@
+import os
+import json
+import hashlib
+import logging
+import pandas as pd
+import numpy as np
+
+# --- 로깅 설정 ---
+log_bank = logging.getLogger("item_bank")
+
+# --- 스냅샷 설정 ---
+# 원본 DB 폴더 아래 .cache 폴더에 스냅샷(pkl)과 메타(json)를 저장합니다.
+SNAPSHOT_DIR_NAME = ".cache"
+SNAPSHOT_VERSION = 1
+
+CATEGORICAL_COLS = ["지문유형", "문제유형", "과목", "문제유형코드", "과목코드"]
+FLOAT32_COLS = ["irt_difficulty_b", "irt_discrimination_a", "irt_difficulty_b_se", "irt_discrimination_a_se", "정답률"] + [f"선지정답률_{i}" for i in range(1, 6)]
+SMALL_INT_COLS = ["년", "월", "번호"]
+
+
+def _file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def snapshot_paths(db_path: str, sheet_name=0) -> tuple[str, str]:
+    """DB 파일에 대응하는 (스냅샷 경로, 메타 경로)를 반환합니다."""
+    db_path = os.path.abspath(db_path)
+    cache_dir = os.path.join(os.path.dirname(db_path), SNAPSHOT_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    suffix = f"_{sheet_name}" if sheet_name not in (0, None) else ""
+    return (os.path.join(cache_dir, f"{stem}{suffix}.pkl"),
+            os.path.join(cache_dir, f"{stem}{suffix}.json"))
+
+
+def compact_item_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    문항 DB를 메모리 효율적인 dtype으로 변환합니다.
+    (유형 컬럼 -> category, 정답 -> int8, IRT/정답률 -> float32)
+    """
+    df = df.copy()
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    if "정답" in df.columns:
+        ans = pd.to_numeric(df["정답"], errors="coerce")
+        df["정답"] = ans.astype("int8") if ans.notna().all() else ans.astype("Int8")
+
+    for col in SMALL_INT_COLS:
+        if col in df.columns:
+            vals = pd.to_numeric(df[col], errors="coerce")
+            if vals.notna().all():
+                df[col] = pd.to_numeric(vals, downcast="integer")
+
+    for col in FLOAT32_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+def _read_snapshot_meta(meta_path: str) -> dict | None:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot_meta(meta_path: str, meta: dict) -> None:
+    tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+
+
+def _write_snapshot(df: pd.DataFrame, data_path: str, meta_path: str, meta: dict) -> None:
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    tmp_data = f"{data_path}.{os.getpid()}.tmp"
+    df.to_pickle(tmp_data)
+    # 데이터 -> 메타 순서로 교체해야 메타가 항상 유효한 스냅샷을 가리킵니다.
+    os.replace(tmp_data, data_path)
+    _write_snapshot_meta(meta_path, meta)
+
+
+def load_item_bank(db_path: str, sheet_name=0) -> pd.DataFrame:
+    """
+    문항 DB를 읽어 압축된 DataFrame으로 반환합니다.
+    원본이 바뀌지 않았다면 엑셀 대신 스냅샷을 읽습니다.
+    (mtime/크기가 같으면 즉시 사용, 다르면 해시를 비교해 내용이 바뀐 경우에만 재생성)
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"DB 파일을 찾을 수 없습니다: {db_path}")
+
+    st = os.stat(db_path)
+    data_path, meta_path = snapshot_paths(db_path, sheet_name)
+    meta = _read_snapshot_meta(meta_path)
+    digest = None
+
+    if meta and meta.get("version") == SNAPSHOT_VERSION and os.path.exists(data_path):
+        try:
+            if meta.get("mtime_ns") == st.st_mtime_ns and meta.get("size") == st.st_size:
+                return pd.read_pickle(data_path)
+            digest = _file_sha256(db_path)
+            if meta.get("sha256") == digest:
+                # 내용은 같고 mtime만 바뀐 경우 (복사/체크아웃 등): 메타만 갱신
+                df = pd.read_pickle(data_path)
+                meta.update({"mtime_ns": st.st_mtime_ns, "size": st.st_size})
+                try:
+                    _write_snapshot_meta(meta_path, meta)
+                except OSError:
+                    pass
+                return df
+        except Exception as e:
+            log_bank.warning(f"스냅샷 읽기 실패. 원본 DB를 다시 읽습니다. ({e})")
+
+    log_bank.info(f"문항 DB 스냅샷 생성: {db_path}")
+    df = compact_item_frame(pd.read_excel(db_path, sheet_name=sheet_name))
+    meta = {"version": SNAPSHOT_VERSION, "source": os.path.abspath(db_path), "sheet": sheet_name,
+            "mtime_ns": st.st_mtime_ns, "size": st.st_size,
+            "sha256": digest or _file_sha256(db_path), "rows": int(len(df))}
+    try:
+        _write_snapshot(df, data_path, meta_path, meta)
+    except OSError as e:
+        log_bank.warning(f"스냅샷 저장 실패 (원본 DB로 계속 진행): {e}")
+    return df
+
+
+# ---------- 색인된 문항 은행 ----------
+# 지문유형 -> 과목코드 번호 (data/과목 및 문제코드 설명.txt 기준, 독서 a / 문학 b)
+PASSAGE_TYPE_CODES = {
+    "독서론": "a01", "주제통합": "a02", "기술": "a03", "사회": "a04", "인문": "a05",
+    "과학·기술": "a06", "과학": "a07", "예술": "a08", "역사": "a09",
+    "고전시가": "b01", "고전소설": "b02", "현대시": "b03", "현대소설": "b04", "현대희곡": "b05", "시나리오": "b06",
+}
+
+# 랜덤(진단) 시험지의 지문 카테고리 구성: 그룹마다 지문 1개씩 선택
+EXAM_CATEGORIES = {
+    "독서": [["인문","주제통합","예술"], ["과학","기술","과학기술","과학·기술"], ["사회"]],
+    "문학": [["현대시","현대시*"], ["현대소설"], ["고전시가","고전시가*"], ["고전소설"]],
+}
+
+
+def category_codes(group: list[str]) -> set[str]:
+    """카테고리 그룹(지문유형 목록)에 해당하는 과목코드 집합. ('현대시*' 처럼 * 가 붙은 유형은 원 유형의 코드)"""
+    return {PASSAGE_TYPE_CODES[name.rstrip("*")] for name in group if name.rstrip("*") in PASSAGE_TYPE_CODES}
+
+
+class ItemBank:
+    """
+    문항 DB를 한 번 읽어 선택에 필요한 색인을 미리 만들어 둔 객체입니다.
+
+    - 지문id -> 문제 행 번호 배열
+    - 카테고리 그룹 -> 지문id 배열 (지문유형 정확 일치 + 과목코드 일치)
+    - 정답 / irt_difficulty_b / irt_discrimination_a 의 연속 NumPy 배열
+    - 문제id -> 행 번호 (능력 추정용 문항 모수 조회)
+    """
+
+    def __init__(self, df: pd.DataFrame, source: str | None = None):
+        self.df = df.reset_index(drop=True)
+        self.source = source
+        n = len(self.df)
+
+        def _str_array(col):
+            if col not in self.df.columns:
+                return np.full(n, "", dtype=object)
+            return self.df[col].astype(object).where(self.df[col].notna(), "").astype(str).to_numpy(dtype=object)
+
+        self.problem_ids = _str_array("문제id")
+        self.passage_of_row = _str_array("지문id")
+        self.subjects = _str_array("과목")
+        self.problem_types = _str_array("문제유형")
+
+        answers = pd.to_numeric(self.df["정답"], errors="coerce") if "정답" in self.df.columns else pd.Series(np.nan, index=self.df.index)
+        answers = answers.where(answers.between(1, 5))
+        self.answers = np.ascontiguousarray(answers.fillna(0).to_numpy(dtype=np.int8))
+        self.irt_b = self._float_array("irt_difficulty_b")
+        self.irt_a = self._float_array("irt_discrimination_a")
+
+        # 지문 목록 (지문id, 지문유형 이 모두 있는 첫 행 기준)
+        if {"지문id", "지문유형"} <= set(self.df.columns):
+            passages = self.df.loc[:, ["지문id", "지문유형"]].dropna().drop_duplicates(subset=["지문id"])
+        else:
+            passages = pd.DataFrame(columns=["지문id", "지문유형"])
+        self.passage_ids = passages["지문id"].astype(str).to_numpy(dtype=object)
+        self.passage_types = passages["지문유형"].astype(str).to_numpy(dtype=object)
+        codes = self.df.loc[passages.index, "과목코드"] if "과목코드" in self.df.columns else pd.Series("", index=passages.index)
+        self.passage_codes = codes.astype(object).where(codes.notna(), "").astype(str).to_numpy(dtype=object)
+
+        self._rows_by_passage = {str(pid): np.asarray(rows, dtype=np.int64)
+                                 for pid, rows in self.df.groupby(self.passage_of_row, sort=False).indices.items()}
+        self._empty_rows = np.empty(0, dtype=np.int64)
+        # 문제id -> 첫 행 번호 (같은 문제가 여러 행에 있으면 첫 행의 IRT 값을 씁니다)
+        self._row_by_problem = {}
+        for i, pid in enumerate(self.problem_ids):
+            self._row_by_problem.setdefault(pid, i)
+        self._category_index: dict[tuple, np.ndarray] = {}
+        for groups in EXAM_CATEGORIES.values():
+            for group in groups:
+                self.category_passages(group)
+
+    def _float_array(self, col: str) -> np.ndarray:
+        if col not in self.df.columns:
+            return np.full(len(self.df), np.nan, dtype=np.float32)
+        return np.ascontiguousarray(pd.to_numeric(self.df[col], errors="coerce").to_numpy(dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    def rows_for_passage(self, passage_id) -> np.ndarray:
+        """지문에 딸린 문제들의 행 번호 (DB 순서 유지)"""
+        return self._rows_by_passage.get(str(passage_id), self._empty_rows)
+
+    def category_passages(self, group: list[str]) -> np.ndarray:
+        """카테고리 그룹에 속하는 지문id 배열 (지문유형 정확 일치 또는 과목코드 일치)"""
+        key = tuple(group)
+        if key not in self._category_index:
+            mask = np.isin(self.passage_types, list(group)) | np.isin(self.passage_codes, list(category_codes(group)))
+            self._category_index[key] = self.passage_ids[mask]
+        return self._category_index[key]
+
+    def item_params(self, problem_ids) -> tuple[np.ndarray, np.ndarray]:
+        """문제id 목록에 대한 (irt_discrimination_a, irt_difficulty_b) 배열. DB에 없는 문제는 NaN"""
+        rows = np.fromiter((self._row_by_problem.get(str(pid), -1) for pid in problem_ids), dtype=np.int64)
+        found = rows >= 0
+        a = np.full(len(rows), np.nan, dtype=np.float64)
+        b = np.full(len(rows), np.nan, dtype=np.float64)
+        a[found] = self.irt_a[rows[found]]
+        b[found] = self.irt_b[rows[found]]
+        return a, b
+
+    def problem_record(self, row: int) -> dict:
+        """메타 파일(selected_problems 시트)용 문항 레코드"""
+        answer = int(self.answers[row])
+        return {"problem_id": self.problem_ids[row], "answer": answer if answer else "",
+                "subject": self.subjects[row], "problem_type": self.problem_types[row]}
+
+
+_BANK_CACHE: dict[tuple, tuple[tuple, ItemBank]] = {}
+
+
+def get_item_bank(db_path: str, sheet_name=0) -> ItemBank:
+    """
+    ItemBank 를 반환합니다. 같은 프로세스에서는 원본 파일이 바뀌지 않는 한 이미 만든 객체를 재사용합니다.
+    """
+    key = (os.path.abspath(db_path), sheet_name)
+    st = os.stat(db_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _BANK_CACHE.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    bank = ItemBank(load_item_bank(db_path, sheet_name=sheet_name), source=key[0])
+    _BANK_CACHE[key] = (stamp, bank)
+    return bank
@@ -0,0 +1,444 @@
+# 시험지 생성 / 채점 / 대시보드 생성을 백그라운드에서 처리하는 작업 큐입니다. (SQLite)
+# - 화면(app.py)은 submit() 으로 작업을 넣고 get() 으로 상태/진행률/결과 파일을 확인만 합니다.
+# - 작업은 별도 프로세스의 JobWorker 가 꺼내(claim) 실행합니다. (run_WORKER.py)
+#   워커 수를 늘리면 처리량이 늘고, 같은 폴더를 공유하는 다른 PC 에서도 워커를 띄울 수 있습니다.
+# - 실패한 작업은 max_attempts 번까지 점점 긴 간격으로 다시 시도합니다. (입력 오류처럼 다시 해도 안 되는 실패는 바로 종료)
+#   작업 중간 결과(checkpoint)는 result 에 저장해 두므로 다시 시도할 때 끝난 단계(예: 채점)는 반복하지 않습니다.
+# - 워커가 죽어 heartbeat 가 STALE_SECONDS 이상 끊긴 작업은 다른 워커가 다시 가져갑니다.
+# - 취소: 대기 중 작업은 바로 취소, 실행 중 작업은 다음 진행 단계에서 멈춥니다.
+# 네트워크 드라이브에서도 쓰도록 WAL 대신 기본 저널 모드를 씁니다. (WAL 은 같은 PC 의 공유 메모리가 필요)
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+import traceback
+
+from lazy_imports import lazy_module
+
+# 채점 / 대시보드 모듈(pandas, openpyxl 포함)은 그 작업을 처음 실행할 때 불러옵니다.
+# (작업을 넣기만 하는 화면과 막 뜬 워커는 큐만 다루므로 빨리 시작됨)
+pd = lazy_module("pandas")
+ef = lazy_module("exam_functions")
+dashboard = lazy_module("run_CREATE_DASHBOARD")
+
+# --- 로깅 설정 ---
+log_job = logging.getLogger("job_queue")
+
+SQLITE_TIMEOUT = 30.0
+POLL_SECONDS = 1.0              # 대기 작업이 없을 때 다시 확인하는 간격(초)
+HEARTBEAT_SECONDS = 10.0        # 실행 중 작업의 생존 신호 간격(초)
+STALE_SECONDS = 120.0           # 이 시간 동안 생존 신호가 없으면 워커가 죽은 것으로 보고 다시 대기열에 넣음
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 5.0       # 재시도 간격 (시도할 때마다 두 배)
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    artifacts TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL, available_at REAL, started_at REAL, heartbeat_at REAL, finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs (status, priority, available_at, job_id);
+CREATE INDEX IF NOT EXISTS ix_jobs_owner ON jobs (owner, job_id);
+"""
+
+_JSON_COLS = ("params", "result", "artifacts")
+
+
+class JobCancelled(Exception):
+    """실행 중 취소 요청을 받음"""
+
+
+class JobFailed(Exception):
+    """다시 시도해도 결과가 같은 실패 (입력 파일 오류 등)"""
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class JobQueue:
+    """작업 큐 (SQLite 파일 하나). 프로세스/스레드마다 따로 만들어 씁니다."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # 트랜잭션을 직접 관리 (isolation_level=None)
+        self.conn = sqlite3.connect(db_path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _row(row) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        for col in _JSON_COLS:
+            job[col] = json.loads(job[col]) if job[col] else None
+        return job
+
+    # --- 화면(제출하는 쪽) ---
+    def submit(self, kind: str, params: dict, owner: str | None = None, priority: int = 0,
+               max_attempts: int = MAX_ATTEMPTS) -> int:
+        """작업을 넣고 job_id 를 반환합니다. (priority 가 클수록 먼저 실행)"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind} (가능: {', '.join(JOB_HANDLERS)})")
+        now = time.time()
+        cur = self.conn.execute(
+            "INSERT INTO jobs (kind, params, status, owner, priority, max_attempts, created_at, available_at) "
+            "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+            (kind, _dumps(params), owner, int(priority), max(1, int(max_attempts)), now, now))
+        log_job.info(f"작업 등록: #{cur.lastrowid} {kind}")
+        return cur.lastrowid
+
+    def get(self, job_id: int) -> dict | None:
+        return self._row(self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def jobs(self, owner: str | None = None, status: str | None = None, limit: int = 100) -> "pd.DataFrame":
+        """최근 작업 목록 (최신순)"""
+        where, args = [], []
+        if owner is not None:
+            where.append("owner = ?")
+            args.append(owner)
+        if status is not None:
+            where.append("status = ?")
+            args.append(status)
+        sql = ("SELECT job_id, kind, status, progress, message, attempts, max_attempts, worker, owner, error, "
+               "created_at, started_at, finished_at FROM jobs"
+               + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY job_id DESC LIMIT ?")
+        df = pd.read_sql_query(sql, self.conn, params=[*args, int(limit)])
+        for col in ("created_at", "started_at", "finished_at"):
+            df[col] = pd.to_datetime(df[col], unit="s").dt.tz_localize("UTC").dt.tz_convert(ef.KST)
+        return df
+
+    def cancel(self, job_id: int) -> bool:
+        """대기 중이면 바로 취소, 실행 중이면 취소를 요청합니다. 이미 끝난 작업이면 False"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            ok = row is not None and row["status"] not in FINISHED_STATUSES
+            if ok and row["status"] == "queued":
+                self.conn.execute("UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?, "
+                                  "message = '취소됨' WHERE job_id = ?", (now, job_id))
+            elif ok:
+                self.conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return ok
+
+    # --- 워커(실행하는 쪽) ---
+    def _requeue_stale(self, now: float) -> None:
+        """(쓰기 잠금 안에서 호출) 생존 신호가 끊긴 실행 중 작업을 다시 대기열로 돌리거나 실패 처리합니다."""
+        stale = self.conn.execute(
+            "SELECT job_id, attempts, max_attempts, cancel_requested, worker FROM jobs "
+            "WHERE status = 'running' AND heartbeat_at < ?", (now - STALE_SECONDS,)).fetchall()
+        for row in stale:
+            if row["cancel_requested"]:
+                status, msg = "cancelled", "취소됨 (워커 중단)"
+            elif row["attempts"] < row["max_attempts"]:
+                status, msg = "queued", f"워커({row['worker']}) 응답 없음 - 다시 대기"
+            else:
+                status, msg = "failed", f"워커({row['worker']}) 응답 없음 - 재시도 횟수 초과"
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, worker = NULL, available_at = ?, "
+                "finished_at = CASE WHEN ? = 'queued' THEN NULL ELSE ? END, "
+                "error = CASE WHEN ? = 'failed' THEN ? ELSE error END WHERE job_id = ?",
+                (status, msg, now, status, now, status, msg, row["job_id"]))
+            log_job.warning(f"작업 #{row['job_id']}: {msg}")
+
+    def claim(self, worker: str, kinds=None) -> dict | None:
+        """실행할 작업 하나를 가져옵니다. (가져온 작업은 running, 다른 워커는 가져가지 않음) 없으면 None"""
+        now = time.time()
+        kinds = list(kinds) if kinds else list(JOB_HANDLERS)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._requeue_stale(now)
+            row = self.conn.execute(
+                f"SELECT job_id FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                f"AND kind IN ({', '.join('?' * len(kinds))}) ORDER BY priority DESC, job_id LIMIT 1",
+                (now, *kinds)).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, progress = 0, "
+                    "message = '시작', started_at = ?, heartbeat_at = ? WHERE job_id = ?",
+                    (worker, now, now, row["job_id"]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.get(row["job_id"]) if row is not None else None
+
+    def heartbeat(self, job_id: int, worker: str, progress: float | None = None, message: str | None = None) -> bool:
+        """생존 신호와 진행률을 기록합니다. 반환: 취소 요청 여부"""
+        self.conn.execute(
+            "UPDATE jobs SET heartbeat_at = ?, progress = COALESCE(?, progress), message = COALESCE(?, message) "
+            "WHERE job_id = ? AND worker = ? AND status = 'running'",
+            (time.time(), progress, message, job_id, worker))
+        row = self.conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def checkpoint(self, job_id: int, worker: str, result: dict) -> None:
+        """실행 중 작업의 중간 결과를 저장합니다. (다시 시도할 때 claim() 이 돌려주는 작업의 result)"""
+        with self.conn:
+            self.conn.execute("UPDATE jobs SET result = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+                              (_dumps(result), job_id, worker))
+
+    def finish(self, job_id: int, worker: str, status: str, result: dict | None = None,
+               artifacts: list | None = None, error: str | None = None, retry: bool = False) -> str:
+        """
+        실행 결과를 기록합니다. retry=True 이고 시도 횟수가 남았으면 잠시 뒤 다시 대기열에 넣습니다.
+        반환: 기록된 상태
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT attempts, max_attempts, worker FROM jobs WHERE job_id = ?",
+                                    (job_id,)).fetchone()
+            if row is None or row["worker"] != worker:
+                # 응답 없음으로 다른 워커에게 넘어간 작업: 이 워커의 결과는 버림
+                self.conn.execute("COMMIT")
+                log_job.warning(f"작업 #{job_id}: 이미 다른 워커로 넘어가 결과를 기록하지 않습니다.")
+                return "lost"
+            if status == "failed" and retry and row["attempts"] < row["max_attempts"]:
+                delay = RETRY_DELAY_SECONDS * 2 ** (row["attempts"] - 1)
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, available_at = ?, error = ?, "
+                    "message = ? WHERE job_id = ?",
+                    (now + delay, error, f"실패 - {delay:.0f}초 후 다시 시도 ({row['attempts']}/{row['max_attempts']})",
+                     job_id))
+                status = "queued"
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END, "
+                    "message = ?, result = ?, artifacts = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                    (status, status, {"done": "완료", "failed": "실패", "cancelled": "취소됨"}[status],
+                     _dumps(result) if result is not None else None,
+                     _dumps(artifacts) if artifacts is not None else None, error, now, job_id))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return status
+
+
+class JobContext:
+    """작업 함수에 넘기는 진행률 보고 도구. 취소 요청을 받으면 progress() 에서 JobCancelled 를 발생시킵니다."""
+
+    def __init__(self, queue: JobQueue, job: dict, worker: str):
+        self.queue, self.job, self.worker = queue, job, worker
+
+    def progress(self, fraction: float, message: str) -> None:
+        if self.queue.heartbeat(self.job["job_id"], self.worker, float(fraction), message):
+            raise JobCancelled()
+
+    @property
+    def saved(self) -> dict:
+        """이전 시도에서 checkpoint() 로 저장한 중간 결과 (없으면 빈 dict)"""
+        return self.job.get("result") or {}
+
+    def checkpoint(self, result: dict) -> None:
+        self.queue.checkpoint(self.job["job_id"], self.worker, result)
+        self.job["result"] = result
+
+
+# ---------- 작업 종류별 실행 함수 ----------
+# 각 함수는 (params, ctx) 를 받아 결과 dict 를 반환합니다. "artifacts" 키에는 만들어진 파일 경로 목록을 담습니다.
+def _job_generate(generate, params: dict, ctx: JobContext) -> dict:
+    ctx.progress(0.1, "시험지 생성 중")
+    docx_path, meta_path, exam_id = generate(**params)
+    if not docx_path:
+        raise JobFailed("시험지 생성 실패 (로그 확인)")
+    return {"exam_id": exam_id, "docx_path": docx_path, "meta_path": meta_path,
+            "artifacts": [p for p in (docx_path, meta_path) if p]}
+
+
+def _job_generate_random(params: dict, ctx: JobContext) -> dict:
+    return _job_generate(ef.generate_exam_7_passages_from_db, params, ctx)
+
+
+def _job_generate_irt(params: dict, ctx: JobContext) -> dict:
+    return _job_generate(ef.generate_exam_irt_weakness, params, ctx)
+
+
+def _job_grade(params: dict, ctx: JobContext) -> dict:
+    """
+    params: exam_xlsx_path, answers_xlsx_path, output_dir, db_path, output_format (grade_exam 인자)
+            weakness_dir (선택, 취약점 저장소 갱신), export_weakness_xlsx (선택, 학생 취약점 엑셀도 만듦),
+            dashboard_path (선택, 대시보드 생성)
+    """
+    params = dict(params)
+    weakness_dir = params.pop("weakness_dir", None)
+    export_xlsx = params.pop("export_weakness_xlsx", False)
+    dashboard_path = params.pop("dashboard_path", None)
+    saved = ctx.saved
+    if saved.get("graded_path") and os.path.exists(saved["graded_path"]):
+        # 이전 시도에서 채점까지 끝남: 다시 채점하면 결과 저장소에 같은 채점이 두 번 들어가므로 저장된 채점 파일을 씀
+        ctx.progress(0.1, "이전 시도의 채점 결과 사용")
+        out, sheets = dict(saved), None
+    else:
+        ctx.progress(0.1, "채점 중")
+        result = ef.grade_exam(interactive=False, **params)
+        if not result:
+            raise JobFailed("채점 실패 (메타/답안 파일 확인)")
+        out, sheets = {k: v for k, v in result.items() if k != "sheets"}, result["sheets"]
+        ctx.checkpoint(out)
+    artifacts = [out["graded_path"], out["result_path"]]
+    if weakness_dir:
+        ctx.progress(0.6, "취약점 분석 중")
+        if sheets is not None:
+            out["weakness_path"] = ef.analyze_weakness(sheets, weakness_dir, export_xlsx=export_xlsx)
+        else:
+            out["weakness_path"] = ef.analyze_weakness_from_graded_file(out["graded_path"], weakness_dir,
+                                                                        export_xlsx=export_xlsx)
+        if export_xlsx and out["weakness_path"]:
+            artifacts.append(out["weakness_path"])
+    if dashboard_path and params.get("db_path"):
+        ctx.progress(0.8, "대시보드 생성 중")
+        if sheets is not None:
+            dashboard.create_dashboard_from_sheets(sheets, params["db_path"], dashboard_path)
+        else:
+            dashboard.create_dashboard(out["graded_path"], params["db_path"], dashboard_path)
+        if os.path.exists(dashboard_path):
+            out["dashboard_path"] = dashboard_path
+            artifacts.append(dashboard_path)
+    out["artifacts"] = artifacts
+    return out
+
+
+def _job_dashboard(params: dict, ctx: JobContext) -> dict:
+    """params: graded_path, db_path, output_path (create_dashboard 인자)"""
+    ctx.progress(0.1, "대시보드 생성 중")
+    output_path = params["output_path"]
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    dashboard.create_dashboard(params["graded_path"], params["db_path"], output_path)
+    if not os.path.exists(output_path):
+        raise JobFailed("대시보드 생성 실패 (로그 확인)")
+    return {"dashboard_path": output_path, "artifacts": [output_path]}
+
+
+JOB_HANDLERS = {
+    "generate_random": _job_generate_random,
+    "generate_irt": _job_generate_irt,
+    "grade": _job_grade,
+    "dashboard": _job_dashboard,
+}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobWorker:
+    """
+    작업 큐에서 작업을 하나씩 꺼내 실행하는 워커. (프로세스 하나에 하나)
+    실행 중에는 별도 스레드가 HEARTBEAT_SECONDS 마다 생존 신호를 보냅니다.
+    """
+
+    def __init__(self, queue_path: str, worker_id: str | None = None, kinds=None):
+        self.queue_path = queue_path
+        self.worker_id = worker_id or default_worker_id()
+        self.kinds = list(kinds) if kinds else None
+        self.queue = JobQueue(queue_path)
+
+    def close(self) -> None:
+        self.queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _beat(self, job_id: int, stop: threading.Event) -> None:
+        with JobQueue(self.queue_path) as queue:
+            while not stop.wait(HEARTBEAT_SECONDS):
+                try:
+                    queue.heartbeat(job_id, self.worker_id)
+                except sqlite3.Error as e:
+                    log_job.warning(f"작업 #{job_id} 생존 신호 기록 실패: {e}")
+
+    def run_one(self) -> dict | None:
+        """대기 작업 하나를 실행하고 최종 상태를 반환합니다. 대기 작업이 없으면 None"""
+        job = self.queue.claim(self.worker_id, self.kinds)
+        if job is None:
+            return None
+        job_id, kind = job["job_id"], job["kind"]
+        log_job.info(f"작업 시작: #{job_id} {kind} (시도 {job['attempts']}/{job['max_attempts']}, 워커 {self.worker_id})")
+        stop = threading.Event()
+        beat = threading.Thread(target=self._beat, args=(job_id, stop), daemon=True)
+        beat.start()
+        try:
+            result = JOB_HANDLERS[kind](job["params"], JobContext(self.queue, job, self.worker_id))
+            artifacts = result.pop("artifacts", [])
+            status = self.queue.finish(job_id, self.worker_id, "done", result=result, artifacts=artifacts)
+        except JobCancelled:
+            status = self.queue.finish(job_id, self.worker_id, "cancelled")
+        except JobFailed as e:
+            status = self.queue.finish(job_id, self.worker_id, "failed", error=str(e))
+        except Exception as e:
+            log_job.debug(traceback.format_exc())
+            status = self.queue.finish(job_id, self.worker_id, "failed", error=f"{type(e).__name__}: {e}", retry=True)
+        finally:
+            stop.set()
+            beat.join()
+        log_job.info(f"작업 종료: #{job_id} {kind} -> {status}")
+        return self.queue.get(job_id)
+
+    def run(self, poll_seconds: float = POLL_SECONDS, stop_event: threading.Event | None = None,
+            once: bool = False) -> int:
+        """
+        stop_event 가 설정되거나 Ctrl+C 를 누를 때까지 작업을 처리합니다.
+        once=True 면 대기 작업이 없어질 때 종료합니다. 반환: 처리한 작업 수
+        """
+        stop_event = stop_event or threading.Event()
+        n_done = 0
+        log_job.info(f"워커 시작: {self.worker_id} (큐: {os.path.abspath(self.queue_path)})")
+        try:
+            while not stop_event.is_set():
+                try:
+                    job = self.run_one()
+                except sqlite3.Error as e:
+                    # 공유 폴더 일시 끊김 등: 기록만 하고 계속
+                    log_job.error(f"작업 큐 접근 오류 (계속): {e}")
+                    job = None
+                if job is not None:
+                    n_done += 1
+                    continue
+                if once:
+                    break
+                stop_event.wait(poll_seconds)
+        except KeyboardInterrupt:
+            log_job.info("워커 중지 요청 (Ctrl+C)")
+        return n_done
@@ -0,0 +1,34 @@
+# 무거운 모듈을 처음 쓸 때 불러오기 위한 대리 객체입니다.
+# 작업 큐 / 감시 데몬처럼 시작은 빨라야 하고 채점 모듈(pandas, exam_functions 등)은 실제 작업이 올 때만
+# 필요한 곳에서 씁니다.  ef = lazy_module("exam_functions") 로 두면 ef.grade_exam 에 처음 접근할 때 import 합니다.
+import importlib
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """속성에 처음 접근할 때 모듈을 import 하는 대리 객체 (이후에는 불러온 모듈의 속성을 그대로 돌려줌)"""
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
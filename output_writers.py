@@ -0,0 +1,261 @@
+# 채점 결과 / 시험 메타 파일을 여러 형식으로 저장하고 다시 읽는 모듈입니다.
+# 어떤 형식이든 "시트 이름 -> DataFrame" 구조와 컬럼이 같으므로 graded_reader.read_sheets 로 똑같이 읽힙니다.
+# 모든 형식이 파일 하나로 저장되므로 경로/수정 시각/해시를 쓰는 기존 코드(누적 저장소, 감시기 기록부)도 그대로 동작합니다.
+#
+#   형식          확장자          용도
+#   xlsx          .xlsx          사람이 여는 기본 형식 (pandas + openpyxl, 서식 포함)
+#   xlsx-stream   .xlsx          같은 엑셀 파일을 XML 로 바로 스트리밍 (추가 패키지 없음, 메모리 일정, 빠름)
+#   csv           .csv.zip       시트별 CSV 를 zip 하나에
+#   parquet       .parquet.zip   시트별 Parquet 를 zip 하나에 (pyarrow 필요, 자료형 보존)
+#   json          .json          {"시트": {"columns": [...], "data": [[...], ...]}}
+import io
+import os
+import re
+import glob
+import json
+import math
+import zipfile
+import logging
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+
+from file_locks import atomic_path
+
+# --- 로깅 설정 ---
+log_out = logging.getLogger("output_writers")
+
+OUTPUT_FORMATS = {"xlsx": ".xlsx", "xlsx-stream": ".xlsx", "csv": ".csv.zip", "parquet": ".parquet.zip", "json": ".json"}
+DEFAULT_OUTPUT_FORMAT = "xlsx"
+OUTPUT_EXTENSIONS = (".csv.zip", ".parquet.zip", ".json", ".xlsx")     # 긴 확장자 먼저 검사
+
+
+def split_output_path(path: str) -> tuple[str, str]:
+    """경로를 (확장자 뺀 부분, 확장자) 로 나눕니다. 'a_graded.csv.zip' -> ('a_graded', '.csv.zip')"""
+    lower = path.lower()
+    for ext in OUTPUT_EXTENSIONS:
+        if lower.endswith(ext):
+            return path[:-len(ext)], path[-len(ext):]
+    return os.path.splitext(path)
+
+
+def output_path(stem: str, output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+    """확장자 없는 경로에 형식별 확장자를 붙입니다."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"알 수 없는 출력 형식: {output_format} (가능: {', '.join(OUTPUT_FORMATS)})")
+    return stem + OUTPUT_FORMATS[output_format]
+
+
+def find_outputs(directory: str, pattern: str = "*_graded") -> list[str]:
+    """폴더에서 패턴(확장자 제외)에 맞는 결과 파일을 모든 형식에 걸쳐 찾습니다. (정렬된 경로 목록)"""
+    paths = set()
+    for ext in set(OUTPUT_FORMATS.values()):
+        paths.update(glob.glob(os.path.join(directory, pattern + ext)))
+    # '*_graded.xlsx' 같은 패턴이 '.csv.zip' 의 '.zip' 앞부분과 겹치지 않도록 확장자를 다시 확인
+    return sorted(p for p in paths if split_output_path(p)[1].lower() in OUTPUT_EXTENSIONS)
+
+
+# ---------- 스트리밍 xlsx ----------
+_RE_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CT = ('<Override PartName="/xl/worksheets/sheet{n}.xml" '
+             'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _col_letter(i: int) -> str:
+    s = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+def _cell_xml(ref: str, v, style: str = "") -> str:
+    """값 하나를 <c> 요소로 (None/NaN/빈 문자열은 빈 문자열 = 셀 생략, xlsx 형식과 동일)"""
+    if v is None or v is pd.NA or v is pd.NaT or (isinstance(v, str) and v == ""):
+        return ""
+    if isinstance(v, (bool, np.bool_)):
+        return f'<c r="{ref}"{style} t="b"><v>{int(v)}</v></c>'
+    if isinstance(v, (int, np.integer)):
+        return f'<c r="{ref}"{style}><v>{int(v)}</v></c>'
+    if isinstance(v, (float, np.floating)):
+        if not math.isfinite(v):
+            return ""
+        return f'<c r="{ref}"{style}><v>{float(v)!r}</v></c>'
+    if isinstance(v, (datetime, date, pd.Timestamp)):
+        v = v.isoformat()
+    text = _RE_ILLEGAL_XML.sub("", str(v))
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _write_xlsx_stream(path: str, sheets: dict[str, pd.DataFrame]) -> None:
+    names = list(sheets)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml",
+                    _CONTENT_TYPES.format(sheets="".join(_SHEET_CT.format(n=i + 1) for i in range(len(names)))))
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+                    + "".join(f'<sheet name="{escape(n[:31], {chr(34): "&quot;"})}" sheetId="{i + 1}" r:id="rId{i + 1}"/>'
+                              for i, n in enumerate(names))
+                    + '</sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    + "".join(f'<Relationship Id="rId{i + 1}" '
+                              f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                              f'Target="worksheets/sheet{i + 1}.xml"/>' for i in range(len(names)))
+                    + f'<Relationship Id="rId{len(names) + 1}" '
+                      f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+                    '</Relationships>')
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        for i, name in enumerate(names):
+            df = sheets[name]
+            letters = [_col_letter(j) for j in range(len(df.columns))]
+            with zf.open(f"xl/worksheets/sheet{i + 1}.xml", "w") as f:
+                # <dimension> 이 없으면 openpyxl read_only 가 행마다 마지막 값이 있는 셀까지만 돌려주므로
+                # (빈 셀은 생략해서 씀) 시트 크기를 적어 두어 끝이 빈 행도 모든 열을 읽게 합니다.
+                last_ref = f"{letters[-1] if letters else 'A'}{len(df) + 1}"
+                f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                        + f'<dimension ref="A1:{last_ref}"/>'.encode("ascii") + b'<sheetData>')
+                header = "".join(_cell_xml(f"{c}1", h, ' s="1"') for c, h in zip(letters, df.columns))
+                f.write(f'<row r="1">{header}</row>'.encode("utf-8"))
+                # 행 단위로 바로 압축 스트림에 기록 (시트 전체 XML 을 메모리에 만들지 않음)
+                for r, values in enumerate(df.itertuples(index=False, name=None), start=2):
+                    cells = "".join(_cell_xml(f"{c}{r}", v) for c, v in zip(letters, values))
+                    f.write(f'<row r="{r}">{cells}</row>'.encode("utf-8"))
+                f.write(b"</sheetData></worksheet>")
+
+
+# ---------- 쓰기 / 읽기 ----------
+def _write_zip(path: str, sheets: dict[str, pd.DataFrame], ext: str, dump) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("sheets.json", json.dumps(list(sheets), ensure_ascii=False))     # 시트 순서
+        for name, df in sheets.items():
+            zf.writestr(f"{name}{ext}", dump(df))
+
+
+def _parquet_bytes(df: pd.DataFrame) -> bytes:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("parquet 형식에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+    buf = io.BytesIO()
+    # 혼합 자료형 열(object)은 parquet 로 저장할 수 없으므로 문자열로 맞춥니다. (빈 값은 유지)
+    # 중복 컬럼 이름은 엑셀을 읽을 때와 같이 .1, .2 ... 를 붙입니다.
+    df = df.copy()
+    seen = {}
+    names = []
+    for c in df.columns:
+        n = seen.get(c, 0)
+        names.append(c if n == 0 else f"{c}.{n}")
+        seen[c] = n + 1
+    df.columns = names
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str) or
+                                  (isinstance(v, float) and math.isnan(v)) else str(v))
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+def write_sheets(path: str, sheets: dict[str, pd.DataFrame], output_format: str | None = None) -> str:
+    """
+    시트들을 저장하고 실제 저장 경로를 반환합니다.
+    path 의 확장자는 형식에 맞게 바뀝니다. (output_format 이 None 이면 path 의 확장자로 형식을 정함, 기본 xlsx)
+    """
+    stem, ext = split_output_path(path)
+    if output_format is None:
+        output_format = next((f for f, e in OUTPUT_FORMATS.items() if e == ext.lower()), DEFAULT_OUTPUT_FORMAT)
+    path = output_path(stem, output_format)
+
+    # 임시 파일에 다 쓴 뒤 바꿔 넣으므로, 쓰는 도중의 파일을 다른 프로세스가 읽지 않습니다.
+    with atomic_path(path) as tmp_path:
+        if output_format == "xlsx":
+            with pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+                for name, df in sheets.items():
+                    df.to_excel(writer, index=False, sheet_name=name)
+        elif output_format == "xlsx-stream":
+            _write_xlsx_stream(tmp_path, sheets)
+        elif output_format == "csv":
+            _write_zip(tmp_path, sheets, ".csv", lambda df: df.to_csv(index=False))
+        elif output_format == "parquet":
+            _write_zip(tmp_path, sheets, ".parquet", _parquet_bytes)
+        elif output_format == "json":
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("{")
+                for i, (name, df) in enumerate(sheets.items()):
+                    f.write(("," if i else "") + json.dumps(name, ensure_ascii=False) + ":")
+                    # orient="split" 은 중복 컬럼을 버리므로 컬럼 목록과 값을 따로 씁니다.
+                    f.write('{"columns":' + json.dumps([str(c) for c in df.columns], ensure_ascii=False) + ',"data":')
+                    f.write(df.to_json(orient="values", force_ascii=False, date_format="iso") + "}")
+                f.write("}")
+    return path
+
+
+def read_output_sheets(path: str, sheets) -> dict[str, pd.DataFrame]:
+    """
+    csv / parquet / json 결과 파일에서 지정한 시트들을 읽습니다. (xlsx 는 graded_reader.read_sheets 가 직접 읽음)
+    없는 시트가 있으면 ValueError 를 발생시킵니다.
+    """
+    sheets = [sheets] if isinstance(sheets, str) else list(sheets)
+    ext = split_output_path(path)[1].lower()
+    frames = {}
+    if ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for name in sheets:
+            if name not in data:
+                raise ValueError(f"Worksheet named '{name}' not found")
+            # 빈 문자열은 다른 형식처럼 빈 셀(None)로 읽습니다.
+            rows = [[None if v == "" else v for v in row] for row in data[name]["data"]]
+            frames[name] = pd.DataFrame(rows, columns=data[name]["columns"])
+    elif ext in (".csv.zip", ".parquet.zip"):
+        member_ext = ".csv" if ext == ".csv.zip" else ".parquet"
+        with zipfile.ZipFile(path) as zf:
+            members = set(zf.namelist())
+            for name in sheets:
+                member = f"{name}{member_ext}"
+                if member not in members:
+                    raise ValueError(f"Worksheet named '{name}' not found")
+                with zf.open(member) as f:
+                    if member_ext == ".csv":
+                        frames[name] = pd.read_csv(f, dtype=str)
+                    else:
+                        frames[name] = pd.read_parquet(io.BytesIO(f.read()))
+    else:
+        raise ValueError(f"지원하지 않는 결과 파일 형식입니다: {path}")
+    return frames
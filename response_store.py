@@ -0,0 +1,263 @@
+# 채점 결과(..._graded.xlsx)의 응답을 문항별 선지 선택 수로 누적 보관하는 저장소입니다. (SQLite)
+# - option_counts : 문제id 별 선지 1~5 선택 수와 합계
+# - ingested_files: 이미 반영한 채점 파일 목록 (경로, 내용 해시, mtime/크기)
+# - file_counts   : 파일별 기여분. 같은 경로의 파일 내용이 바뀌면 이전 기여분을 빼고 새로 더합니다.
+# - pending_items : 선택 수가 바뀌었지만 아직 IRT 값을 다시 계산해 DB 에 쓰지 않은 문제id.
+#                   반영과 같은 트랜잭션에서 기록하고, DB 저장에 성공한 뒤에만 지우므로 계산/저장이 실패해도 다음 실행에서 다시 계산합니다.
+# 매 실행마다 새로 생긴(또는 바뀐) 파일만 읽고, 변경된 문항만 IRT 값을 다시 계산할 수 있습니다.
+import os
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime
+import pandas as pd
+
+from irt_calibration import OPTION_RATE_COLS
+from graded_reader import read_sheets, read_graded_files, SOURCE_COL
+from output_writers import find_outputs
+
+# --- 로깅 설정 ---
+log_store = logging.getLogger("response_store")
+
+COUNT_COLS = [f"n{i}" for i in range(1, 6)]
+ANSWER_COLUMNS = {"answers": ["problem_id", "student_answer_num"]}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS option_counts (
+    problem_id TEXT PRIMARY KEY,
+    n1 INTEGER NOT NULL DEFAULT 0, n2 INTEGER NOT NULL DEFAULT 0, n3 INTEGER NOT NULL DEFAULT 0,
+    n4 INTEGER NOT NULL DEFAULT 0, n5 INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    mtime_ns INTEGER, size INTEGER,
+    n_responses INTEGER NOT NULL DEFAULT 0,
+    ingested_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_ingested_sha ON ingested_files (sha256);
+CREATE TABLE IF NOT EXISTS file_counts (
+    sha256 TEXT NOT NULL,
+    problem_id TEXT NOT NULL,
+    n1 INTEGER NOT NULL, n2 INTEGER NOT NULL, n3 INTEGER NOT NULL, n4 INTEGER NOT NULL, n5 INTEGER NOT NULL,
+    PRIMARY KEY (sha256, problem_id)
+);
+CREATE TABLE IF NOT EXISTS pending_items (
+    problem_id TEXT PRIMARY KEY,
+    marked_at TEXT
+);
+"""
+
+
+def _file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def count_options(problem_ids, answer_nums) -> pd.DataFrame:
+    """(문제id, 답 번호) 목록을 문제id 별 선지 선택 수(n1..n5)로 집계합니다. 1~5 밖의 답은 제외합니다."""
+    df = pd.DataFrame({"problem_id": pd.Series(problem_ids).astype(object),
+                       "ans": pd.to_numeric(pd.Series(answer_nums), errors="coerce").to_numpy()})
+    df = df.dropna(subset=["problem_id", "ans"])
+    df = df[df["ans"].between(1, 5)]
+    df["problem_id"] = df["problem_id"].astype(str)
+    counts = pd.crosstab(df["problem_id"], df["ans"].astype(int)).reindex(columns=range(1, 6), fill_value=0)
+    counts.columns = COUNT_COLS
+    counts.index.name = "problem_id"
+    return counts
+
+
+class ResponseStore:
+    """문항별 선지 선택 수 누적 저장소"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 반영 ---
+    def _apply(self, counts: pd.DataFrame, sign: int, now: str) -> None:
+        rows = [(pid, *(sign * int(v) for v in r), sign * int(sum(r)), now)
+                for pid, r in zip(counts.index, counts[COUNT_COLS].itertuples(index=False, name=None))]
+        self.conn.executemany(
+            """INSERT INTO option_counts (problem_id, n1, n2, n3, n4, n5, total, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(problem_id) DO UPDATE SET
+                 n1 = n1 + excluded.n1, n2 = n2 + excluded.n2, n3 = n3 + excluded.n3,
+                 n4 = n4 + excluded.n4, n5 = n5 + excluded.n5, total = total + excluded.total,
+                 updated_at = excluded.updated_at""", rows)
+
+    def _file_counts(self, sha: str) -> pd.DataFrame:
+        df = pd.read_sql_query("SELECT problem_id, n1, n2, n3, n4, n5 FROM file_counts WHERE sha256 = ?",
+                               self.conn, params=(sha,))
+        return df.set_index("problem_id")
+
+    def ingest_counts(self, path: str, sha: str, counts: pd.DataFrame, mtime_ns=None, size=None) -> set[str]:
+        """
+        한 파일의 선지 선택 수를 반영합니다. 반환: 값이 바뀐 문제id 집합
+        같은 경로가 다른 내용으로 이미 반영돼 있으면 이전 기여분을 먼저 뺍니다.
+        """
+        path = os.path.abspath(path)
+        now = datetime.now().isoformat(timespec="seconds")
+        changed: set[str] = set()
+        with self.conn:
+            prev = self.conn.execute("SELECT sha256 FROM ingested_files WHERE path = ?", (path,)).fetchone()
+            if prev and prev[0] != sha:
+                old = self._file_counts(prev[0])
+                self._apply(old, -1, now)
+                changed.update(old.index)
+                still_used = self.conn.execute("SELECT 1 FROM ingested_files WHERE sha256 = ? AND path <> ?",
+                                               (prev[0], path)).fetchone()
+                if not still_used:
+                    self.conn.execute("DELETE FROM file_counts WHERE sha256 = ?", (prev[0],))
+
+            self._apply(counts, +1, now)
+            changed.update(counts.index)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO file_counts (sha256, problem_id, n1, n2, n3, n4, n5) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(sha, pid, *(int(v) for v in r)) for pid, r in zip(counts.index, counts[COUNT_COLS].itertuples(index=False, name=None))])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ingested_files (path, sha256, mtime_ns, size, n_responses, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, sha, mtime_ns, size, int(counts[COUNT_COLS].to_numpy().sum()), now))
+            self.conn.executemany("INSERT OR REPLACE INTO pending_items (problem_id, marked_at) VALUES (?, ?)",
+                                  [(str(pid), now) for pid in changed])
+        return changed
+
+    def _pending(self, path: str) -> tuple | None:
+        """
+        반영이 필요한 파일이면 (절대 경로, sha256, stat) 을, 이미 반영된 내용이면 None 을 반환합니다.
+        (mtime/크기가 같으면 해시 계산 없이 건너뜀, 내용만 같으면 mtime/크기만 갱신)
+        """
+        apath = os.path.abspath(path)
+        st = os.stat(apath)
+        prev = self.conn.execute("SELECT sha256, mtime_ns, size FROM ingested_files WHERE path = ?", (apath,)).fetchone()
+        if prev and prev[1] == st.st_mtime_ns and prev[2] == st.st_size:
+            return None
+        sha = _file_sha256(apath)
+        if prev and prev[0] == sha:
+            with self.conn:
+                self.conn.execute("UPDATE ingested_files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                  (st.st_mtime_ns, st.st_size, apath))
+            return None
+        if self._skip_copy(apath, sha, st):
+            return None
+        return apath, sha, st
+
+    def _skip_copy(self, apath: str, sha: str, st) -> bool:
+        """같은 내용의 파일이 다른 경로로 이미 반영됐으면(복사본) 중복 집계하지 않고 장부에만 기록합니다."""
+        known = self.conn.execute("SELECT 1 FROM ingested_files WHERE sha256 = ? AND path <> ?", (sha, apath)).fetchone()
+        if not known or self.conn.execute("SELECT 1 FROM ingested_files WHERE path = ?", (apath,)).fetchone():
+            return False
+        log_store.info(f"이미 반영된 파일의 복사본입니다 (건너뜀): {apath}")
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO ingested_files (path, sha256, mtime_ns, size, n_responses, ingested_at) VALUES (?, ?, ?, ?, 0, ?)",
+                (apath, sha, st.st_mtime_ns, st.st_size, datetime.now().isoformat(timespec="seconds")))
+        return True
+
+    def ingest_graded_file(self, path: str) -> set[str] | None:
+        """
+        채점 파일 한 개를 반영합니다.
+        반환: 바뀐 문제id 집합 (이미 반영된 파일이면 None)
+        """
+        pending = self._pending(path)
+        if pending is None:
+            return None
+        apath, sha, st = pending
+        df_ans = read_sheets(apath, "answers", columns=ANSWER_COLUMNS)["answers"]
+        counts = count_options(df_ans["problem_id"], df_ans["student_answer_num"])
+        return self.ingest_counts(apath, sha, counts, mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+    def ingest_dir(
+        self, graded_dir: str, pattern: str = "*_graded", max_workers: int | None = None
+    ) -> tuple[set[str], int, list[tuple[str, str]]]:
+        """
+        폴더의 채점 파일 중 새로 생기거나 바뀐 파일만 반영합니다. (pattern: 확장자 제외, 모든 출력 형식)
+        새 파일들의 answers 시트는 graded_reader 로 한꺼번에(병렬로) 읽습니다.
+        반환: (바뀐 문제id 집합, 새로 반영한 파일 수, [(파일, 오류 메시지)])
+        """
+        pending, errors = [], []
+        for path in find_outputs(graded_dir, pattern):
+            try:
+                p = self._pending(path)
+            except Exception as e:
+                errors.append((path, str(e)))
+                continue
+            if p is not None:
+                pending.append(p)
+        if not pending:
+            return set(), 0, errors
+
+        frames, read_errors = read_graded_files([p[0] for p in pending], "answers", columns=ANSWER_COLUMNS,
+                                                max_workers=max_workers)
+        errors.extend(read_errors)
+        failed = {path for path, _ in read_errors}
+        by_file = {path: df for path, df in frames["answers"].groupby(SOURCE_COL, sort=False)}
+
+        changed: set[str] = set()
+        n_new = 0
+        for apath, sha, st in pending:
+            if apath in failed:
+                continue
+            # 이번 실행에서 먼저 반영된 파일과 내용이 같으면 복사본으로 처리
+            if self._skip_copy(apath, sha, st):
+                continue
+            df_ans = by_file.get(apath, pd.DataFrame(columns=ANSWER_COLUMNS["answers"]))
+            counts = count_options(df_ans["problem_id"], df_ans["student_answer_num"])
+            changed |= self.ingest_counts(apath, sha, counts, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            n_new += 1
+        return changed, n_new, errors
+
+    # --- 다시 계산할 문항 ---
+    def pending_items(self) -> set[str]:
+        """선택 수가 바뀐 뒤 아직 DB 에 IRT 값을 쓰지 않은 문제id 집합 (이전 실행에서 실패한 것 포함)"""
+        return {row[0] for row in self.conn.execute("SELECT problem_id FROM pending_items")}
+
+    def clear_pending(self, problem_ids) -> None:
+        """DB 저장에 성공한 문항을 다시 계산할 목록에서 지웁니다."""
+        with self.conn:
+            self.conn.executemany("DELETE FROM pending_items WHERE problem_id = ?", [(str(pid),) for pid in problem_ids])
+
+    # --- 조회 ---
+    def counts(self, problem_ids=None) -> pd.DataFrame:
+        """문제id 별 선지 선택 수 (index=problem_id, 컬럼 n1..n5, total)"""
+        sql = "SELECT problem_id, n1, n2, n3, n4, n5, total FROM option_counts"
+        if problem_ids is None:
+            df = pd.read_sql_query(sql, self.conn)
+        else:
+            ids = [str(x) for x in problem_ids]
+            parts = [pd.read_sql_query(f"{sql} WHERE problem_id IN ({','.join('?' * len(chunk))})", self.conn, params=chunk)
+                     for chunk in (ids[i:i + 500] for i in range(0, len(ids), 500))]
+            df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["problem_id", *COUNT_COLS, "total"])
+        return df.set_index("problem_id")
+
+    def option_rates(self, problem_ids=None) -> pd.DataFrame:
+        """
+        문제id 별 선지 선택률. 반환 컬럼: 문제id, 선지정답률_1..5
+        (update_irt_from_graded_files 의 기존 집계와 같은 형식, 응답이 없는 문항은 제외)
+        """
+        counts = self.counts(problem_ids)
+        counts = counts[counts["total"] > 0]
+        rates = counts[COUNT_COLS].div(counts["total"], axis=0)
+        rates.columns = OPTION_RATE_COLS
+        rates.index.name = "문제id"
+        return rates.reset_index()
+
+    def ingested_files(self) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM ingested_files ORDER BY ingested_at", self.conn)
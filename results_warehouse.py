@@ -0,0 +1,288 @@
+# 채점 결과를 문항 한 줄씩 모아 두는 추가 전용(append-only) 열 기반 저장소입니다.
+# grade_exam / grade_class 가 채점할 때마다 한 시험(또는 한 반)의 채점 행을 조각 파일 하나로 추가하고,
+# 분석은 수천 개의 ..._graded.xlsx 를 여는 대신 이 저장소를 훑습니다.
+#
+#   {root}/date=YYYY-MM-DD/seg-{시각}-{무작위}.npz   채점 한 번에 하나 (제출 날짜별 폴더 = 파티션)
+#   {root}/date=YYYY-MM-DD/part-{무작위}.npz         compact 로 합친 파일 (학생, 문항 순 정렬)
+#
+# - 파일 형식: NumPy .npz (열마다 배열 하나). 글자 열은 사전 부호화(값 목록 + int32 코드)로 저장하므로
+#   pickle 없이 읽히고 같은 값이 반복되는 열이 작습니다. (parquet 는 pyarrow 가 필요해 쓰지 않음)
+# - 색인: 파일마다 학생 / 문항 / 시험 값 목록이 있으므로 조회 대상이 없는 파일은 나머지 열을 읽지 않고 건너뜁니다.
+#   날짜 조건은 파티션 폴더 이름으로 거릅니다.
+# - 합치기(compact): 파티션의 파일들을 하나로 합치고 같은 채점 행의 중복을 없앱니다. 새 파일에 대체한 파일 이름을
+#   기록(_replaces)한 뒤 옛 파일을 지우므로, 도중에 읽는 쪽도 같은 행을 두 번 보지 않습니다.
+import os
+import re
+import uuid
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from file_locks import atomic_path, file_lock
+from graded_reader import read_graded_files, SOURCE_COL
+
+# --- 로깅 설정 ---
+log_wh = logging.getLogger("results_warehouse")
+
+WAREHOUSE_DIR_NAME = "results_warehouse"
+TEXT_COLUMNS = ["exam_id", "student_id", "problem_id", "subject", "problem_type",
+                "answer_num", "student_answer_num", "created_at", "submitted_at"]
+INT_COLUMNS = {"seq": np.int32, "is_correct": np.int8}
+WAREHOUSE_COLUMNS = ["exam_id", "student_id", "seq", "problem_id", "subject", "problem_type",
+                     "answer_num", "student_answer_num", "is_correct", "created_at", "submitted_at"]
+ROW_KEY = ["exam_id", "student_id", "submitted_at", "seq"]     # 같은 채점 행 (compact 때 중복 제거 기준)
+
+_PARTITION_PREFIX = "date="
+_RE_DATA_FILE = re.compile(r"^(seg|part)-[\w-]+\.npz$")
+_REPLACES = "_replaces"
+_READ_RETRIES = 3
+
+
+def _partition_date(submitted_at: pd.Series) -> pd.Series:
+    """제출 시각(ISO 문자열, 기록된 시간대 기준) -> 'YYYY-MM-DD'. 날짜가 없으면 오늘"""
+    dates = submitted_at.astype(str).str[:10]
+    today = datetime.now().strftime("%Y-%m-%d")
+    return dates.where(dates.str.fullmatch(r"\d{4}-\d{2}-\d{2}"), today)
+
+
+def _text_column(s: pd.Series) -> np.ndarray:
+    """글자 열로 정규화 (빈 값 -> '', 3.0 -> '3')"""
+    s = s.astype(object).where(s.notna(), "")
+    return np.array([str(int(v)) if isinstance(v, float) and v.is_integer() else str(v) for v in s], dtype=object)
+
+
+def _encode(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """DataFrame -> .npz 에 넣을 배열들 (글자 열은 사전 부호화)"""
+    arrays = {}
+    for col in TEXT_COLUMNS:
+        codes, values = pd.factorize(_text_column(df[col]), sort=True)
+        arrays[f"{col}.values"] = np.asarray(values, dtype=str)
+        arrays[f"{col}.codes"] = codes.astype(np.int32)
+    for col, dtype in INT_COLUMNS.items():
+        arrays[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy().astype(dtype)
+    return arrays
+
+
+def _decode(npz, columns, mask=None) -> dict[str, np.ndarray]:
+    out = {}
+    for col in columns:
+        if col in INT_COLUMNS:
+            out[col] = npz[col] if mask is None else npz[col][mask]
+        else:
+            codes = npz[f"{col}.codes"]
+            out[col] = npz[f"{col}.values"].astype(object)[codes if mask is None else codes[mask]]
+    return out
+
+
+def rows_from_grading(g: pd.DataFrame, exam_id: str, student_id: str, created_at: str, submitted_at: str) -> pd.DataFrame:
+    """채점 표(grading 시트 형식: problem_id, subject, problem_type, answer_num, student_answer_num, is_correct) -> 저장 행"""
+    rows = g.reindex(columns=["problem_id", "subject", "problem_type", "answer_num", "student_answer_num", "is_correct"]).copy()
+    rows.insert(0, "seq", np.arange(1, len(rows) + 1))
+    rows.insert(0, "student_id", str(student_id))
+    rows.insert(0, "exam_id", str(exam_id))
+    rows["created_at"], rows["submitted_at"] = str(created_at or ""), str(submitted_at or "")
+    return rows[WAREHOUSE_COLUMNS]
+
+
+class ResultsWarehouse:
+    """채점 결과 열 기반 저장소 (폴더 하나)"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    # --- 파일 목록 ---
+    def partitions(self) -> list[str]:
+        """저장된 날짜 파티션 ('YYYY-MM-DD') 목록"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(n[len(_PARTITION_PREFIX):] for n in names
+                      if n.startswith(_PARTITION_PREFIX) and os.path.isdir(os.path.join(self.root, n)))
+
+    def _partition_dir(self, date: str) -> str:
+        return os.path.join(self.root, f"{_PARTITION_PREFIX}{date}")
+
+    def _live_files(self, date: str) -> list[str]:
+        """파티션에서 읽을 파일 (합친 파일이 대체한 파일은 제외)"""
+        pdir = self._partition_dir(date)
+        try:
+            names = sorted(n for n in os.listdir(pdir) if _RE_DATA_FILE.match(n))
+        except FileNotFoundError:
+            return []
+        replaced = set()
+        for name in names:
+            if name.startswith("part-"):
+                with np.load(os.path.join(pdir, name)) as npz:
+                    replaced.update(npz[_REPLACES].tolist())
+        return [os.path.join(pdir, n) for n in names if n not in replaced]
+
+    # --- 추가 ---
+    def append(self, rows: pd.DataFrame) -> list[str]:
+        """채점 행을 제출 날짜별 조각 파일로 추가합니다. 반환: 새로 만든 파일 경로 목록"""
+        if rows.empty:
+            return []
+        rows = rows.reindex(columns=WAREHOUSE_COLUMNS)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        paths = []
+        for date, part in rows.groupby(_partition_date(rows["submitted_at"]), sort=True):
+            pdir = self._partition_dir(date)
+            os.makedirs(pdir, exist_ok=True)
+            path = os.path.join(pdir, f"seg-{stamp}-{uuid.uuid4().hex[:8]}.npz")
+            self._write(path, part)
+            paths.append(path)
+        return paths
+
+    def _write(self, path: str, rows: pd.DataFrame, replaces=()) -> None:
+        arrays = _encode(rows)
+        if os.path.basename(path).startswith("part-"):
+            arrays[_REPLACES] = np.asarray(sorted(replaces), dtype=str)
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+
+    # --- 조회 ---
+    def query(self, student_ids=None, problem_ids=None, exam_ids=None, date_from=None, date_to=None,
+              columns=None) -> pd.DataFrame:
+        """
+        조건에 맞는 채점 행을 읽습니다. (조건은 모두 AND, 날짜는 'YYYY-MM-DD' 양 끝 포함)
+        학생 / 문항 / 시험 조건은 파일의 값 목록으로 먼저 걸러 해당 값이 없는 파일은 건너뜁니다.
+        columns 를 주면 그 열만 읽습니다. (기본: WAREHOUSE_COLUMNS)
+        """
+        columns = list(columns or WAREHOUSE_COLUMNS)
+        conditions = {"student_id": student_ids, "problem_id": problem_ids, "exam_id": exam_ids}
+        wanted = {col: [str(v) for v in vals] for col, vals in conditions.items() if vals is not None}
+        dates = [d for d in self.partitions()
+                 if (not date_from or d >= str(date_from)[:10]) and (not date_to or d <= str(date_to)[:10])]
+        parts = []
+        for date in dates:
+            for attempt in range(_READ_RETRIES):
+                try:
+                    parts.extend(self._scan(self._live_files(date), wanted, columns))
+                    break
+                except FileNotFoundError:
+                    # 읽는 도중 compact 가 옛 파일을 지웠으면 파일 목록을 다시 구함
+                    if attempt == _READ_RETRIES - 1:
+                        raise
+        if not parts:
+            return pd.DataFrame({c: pd.Series(dtype=np.int64 if c in INT_COLUMNS else object) for c in columns})
+        return pd.DataFrame({c: np.concatenate([p[c] for p in parts]) for c in columns})
+
+    @staticmethod
+    def _scan(paths, wanted: dict, columns) -> list[dict]:
+        out = []
+        for path in paths:
+            with np.load(path) as npz:
+                mask = None
+                for col, vals in wanted.items():
+                    hit = np.flatnonzero(np.isin(npz[f"{col}.values"], vals))     # 값 목록만 보고 파일 건너뛰기
+                    if not len(hit):
+                        mask = np.zeros(0, dtype=bool)
+                        break
+                    m = np.isin(npz[f"{col}.codes"], hit)
+                    mask = m if mask is None else mask & m
+                if mask is not None and not mask.any():
+                    continue
+                out.append(_decode(npz, columns, mask))
+        return out
+
+    def exam_keys(self, date_from=None, date_to=None) -> set[tuple[str, str, str]]:
+        """저장된 (exam_id, student_id, submitted_at) 집합"""
+        df = self.query(date_from=date_from, date_to=date_to, columns=["exam_id", "student_id", "submitted_at"])
+        return set(df.drop_duplicates().itertuples(index=False, name=None))
+
+    # --- 합치기 ---
+    def compact(self, dates=None, min_files: int = 2) -> dict[str, tuple[int, int]]:
+        """
+        파티션마다 파일이 min_files 개 이상이면 하나로 합칩니다. (같은 채점 행은 마지막 것만 남김)
+        같은 파티션을 동시에 합치지 않도록 파티션별 잠금을 잡습니다.
+        반환: {날짜: (합친 파일 수, 남은 행 수)}
+        """
+        done = {}
+        for date in (self.partitions() if dates is None else [str(d)[:10] for d in dates]):
+            pdir = self._partition_dir(date)
+            with file_lock(os.path.join(pdir, ".compact.lock")):
+                files = self._live_files(date)
+                if len(files) < min_files:
+                    continue
+                replaces = set()
+                frames = []
+                for path in files:
+                    with np.load(path) as npz:
+                        frames.append(pd.DataFrame(_decode(npz, WAREHOUSE_COLUMNS)))
+                        if _REPLACES in npz.files:
+                            replaces.update(npz[_REPLACES].tolist())
+                    replaces.add(os.path.basename(path))
+                rows = (pd.concat(frames, ignore_index=True)
+                        .drop_duplicates(ROW_KEY, keep="last")
+                        .sort_values(["student_id", "problem_id", "submitted_at", "seq"], kind="stable"))
+                self._write(os.path.join(pdir, f"part-{uuid.uuid4().hex[:8]}.npz"), rows, replaces)
+                for path in files:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        log_wh.warning(f"합친 파일 삭제 실패 (다음 합치기에서 무시됨): {path} ({e})")
+                done[date] = (len(files), len(rows))
+                log_wh.info(f"파티션 합치기: {date} 파일 {len(files)}개 -> 1개 ({len(rows)}행)")
+        return done
+
+    # --- 상태 ---
+    def stats(self) -> pd.DataFrame:
+        """파티션별 파일 수 / 행 수 / 크기"""
+        records = []
+        for date in self.partitions():
+            files = self._live_files(date)
+            n_rows = 0
+            for path in files:
+                with np.load(path) as npz:
+                    n_rows += len(npz["seq"])
+            records.append({"date": date, "files": len(files), "rows": n_rows,
+                            "bytes": sum(os.path.getsize(p) for p in files)})
+        return pd.DataFrame(records, columns=["date", "files", "rows", "bytes"])
+
+    # --- 기존 채점 파일 가져오기 ---
+    def ingest_graded_files(self, paths, max_workers: int | None = None) -> tuple[int, list[tuple[str, str]]]:
+        """
+        기존 채점 파일들(..._graded)을 저장소에 추가합니다. 이미 들어 있는 채점(시험, 학생, 제출 시각)은 건너뜁니다.
+        반환: (추가한 채점 수, [(파일, 오류 메시지)])
+        """
+        frames, errors = read_graded_files(
+            paths, ["summary", "grading"],
+            columns={"summary": ["exam_id", "student_id", "created_at", "submitted_at"],
+                     "grading": ["problem_id", "subject", "problem_type", "answer_num", "student_answer_num", "is_correct"]},
+            max_workers=max_workers)
+        summary = frames["summary"].drop_duplicates(SOURCE_COL).set_index(SOURCE_COL)
+        if summary.empty:
+            return 0, errors
+        existing = self.exam_keys()
+        rows = []
+        for path, g in frames["grading"].groupby(SOURCE_COL, sort=False):
+            if path not in summary.index:
+                continue
+            s = summary.loc[path]
+            exam_id, student_id, submitted_at = _text_column(s.reindex(["exam_id", "student_id", "submitted_at"]))
+            if (exam_id, student_id, submitted_at) in existing:
+                continue
+            existing.add((exam_id, student_id, submitted_at))
+            rows.append(rows_from_grading(g, exam_id, student_id, s.get("created_at"), submitted_at))
+        if rows:
+            self.append(pd.concat(rows, ignore_index=True))
+        log_wh.info(f"채점 파일 가져오기: {len(rows)}건 추가, 오류 {len(errors)}건")
+        return len(rows), errors
+
+
+def warehouse_dir(output_dir: str) -> str:
+    """출력 폴더의 저장소 경로 ({output_dir}/results_warehouse)"""
+    return os.path.join(output_dir, WAREHOUSE_DIR_NAME)
+
+
+def append_grading_rows(output_dir: str, rows: pd.DataFrame) -> list[str]:
+    """
+    출력 폴더의 저장소에 채점 행을 추가합니다. 실패해도 채점 결과 파일은 이미 저장됐으므로 경고만 남기고 [] 를 반환합니다.
+    """
+    try:
+        return ResultsWarehouse(warehouse_dir(output_dir)).append(rows)
+    except Exception as e:
+        log_wh.warning(f"결과 저장소 추가 실패 ({e}). 채점 파일은 정상 저장되었습니다.")
+        return []
@@ -0,0 +1,62 @@
+import os
+import argparse
+from datetime import datetime
+from batch_exams import load_roster, generate_exams_for_roster
+from output_writers import OUTPUT_FORMATS
+from file_locks import atomic_path
+
+# --- 설정 (필수) ---
+# (중요) "RANDOM": 첫 사용자용, "IRT": 맞춤형
+MODE = "IRT"
+
+ROSTER_PATH = r".\data\roster.xlsx"     # 학생 명단 (student_id, student_name, theta, weakness_path)
+                                        # theta 가 비어 있으면 OUTPUT_DIR 의 최근 채점 결과에서 추정한 값을 사용
+BASE_DIR = r".\data"                    # 지문/문제 docx 루트
+DB_PATH  = r".\data\db_with_irt_from_distractors.xlsx"
+WEAKNESS_DB_DIR = r".\output"           # 취약점 저장소(weakness.sqlite) 폴더
+OUTPUT_DIR = r".\output"                # 시험지(docx), 메타(xlsx), 일괄 생성 결과 목록 저장 폴더
+
+# 시험지 조립 엔진: "ooxml" (병렬 처리, 모든 OS) / "word" (MS Word, 순차 처리)
+ENGINE = "ooxml"
+MAX_WORKERS = None                      # None: CPU 코어 수만큼
+SEED = None                             # 정수로 지정하면 문항 선택이 재현됩니다.
+OUTPUT_FORMAT = "xlsx"                  # 메타 파일 형식: xlsx / xlsx-stream / csv / parquet / json
+# --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="학생 명단 전체의 시험지를 한 번에 생성합니다.")
+    parser.add_argument("--roster", default=ROSTER_PATH)
+    parser.add_argument("--mode", default=MODE, choices=["IRT", "RANDOM"])
+    parser.add_argument("--base-dir", default=BASE_DIR)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--weakness-dir", default=WEAKNESS_DB_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--engine", default=ENGINE, choices=["ooxml", "word"])
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default=OUTPUT_FORMAT, help="메타 파일 형식")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.roster):
+        print(f"오류: 학생 명단 파일을 찾을 수 없습니다. ({args.roster})")
+    else:
+        roster = load_roster(args.roster)
+        print(f"--- {len(roster)}명 시험지 일괄 생성 ({args.mode}, 엔진={args.engine}) ---")
+
+        manifest = generate_exams_for_roster(
+            roster, db_path=args.db, base_dir=args.base_dir, mode=args.mode,
+            output_dir=args.output_dir, weakness_dir=args.weakness_dir,
+            engine=args.engine, max_workers=args.workers, seed=args.seed, output_format=args.format
+        )
+
+        manifest_path = os.path.join(args.output_dir, f"batch_manifest_{datetime.now():%Y%m%d_%H%M%S}.xlsx")
+        with atomic_path(manifest_path) as tmp_path:
+            manifest.to_excel(tmp_path, index=False)
+
+        n_ok = int((manifest["status"] == "ok").sum())
+        print(f"\n--- 일괄 생성 완료: 성공 {n_ok} / 전체 {len(manifest)} ---")
+        print(f"결과 목록: {manifest_path}")
+        failed = manifest[manifest["status"] != "ok"]
+        if not failed.empty:
+            print("\n실패 학생:")
+            print(failed[["student_id", "student_name", "error"]].to_string(index=False))
@@ -0,0 +1,47 @@
+import os
+from batch_grading import grade_class
+
+# --- 설정 (필수) ---
+
+# (필수) 반 전체가 함께 본 시험지의 메타 파일 (시험지 생성 시 output 폴더에 생성된 ...exam_id.xlsx 파일)
+EXAM_FILE_TO_GRADE = r".\output\S001_20251023_1.xlsx"
+
+# (필수) 반 전체 답안표 (1행 = 학생 1명, 열 = student_id, student_name, 문항1, 문항2, ...)
+#        student_id 가 겹치는 행이 있으면 채점하지 않고 해당 학생과 행 번호를 알려 줍니다.
+# 문항 열 이름을 problem_id 로 쓰면 이름으로, 아니면 왼쪽부터 순서대로 맞춥니다.
+CLASS_ANSWERS_PATH = r".\answers\class_answers.xlsx"
+
+# (필수) 학생별 채점 결과(..._graded.xlsx)와 반 요약 파일(..._class_summary.xlsx)을 저장할 폴더
+GRADE_OUTPUT_DIR = r".\output"
+
+# (선택) 문항 DB. 지정하면 학생별 능력치(theta)와 표준오차를 함께 기록합니다. (None: 추정 안 함)
+DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
+MAX_WORKERS = None      # 학생별 파일 저장 프로세스 수 (None: CPU 코어 수)
+OUTPUT_FORMAT = "xlsx"  # 학생별 채점 파일 형식: xlsx / xlsx-stream / csv / parquet / json (반 요약은 항상 xlsx)
+# --------------------
+
+if __name__ == "__main__":
+    if not os.path.exists(EXAM_FILE_TO_GRADE):
+        print(f"오류: 채점할 메타 파일을 찾을 수 없습니다. ({EXAM_FILE_TO_GRADE})")
+    elif not os.path.exists(CLASS_ANSWERS_PATH):
+        print(f"오류: 답안표 파일을 찾을 수 없습니다. ({CLASS_ANSWERS_PATH})")
+    else:
+        print(f"--- 일괄 채점 시작 ---")
+        print(f"대상 메타 파일: {EXAM_FILE_TO_GRADE}")
+        print(f"답안표: {CLASS_ANSWERS_PATH}")
+
+        result = grade_class(EXAM_FILE_TO_GRADE, CLASS_ANSWERS_PATH, output_dir=GRADE_OUTPUT_DIR,
+                             db_path=DB_PATH, max_workers=MAX_WORKERS, output_format=OUTPUT_FORMAT)
+        if not result:
+            print("\n--- 일괄 채점 실패 ---")
+        else:
+            students = result["students"]
+            print(f"\n--- 일괄 채점 완료: 학생 {len(students)}명, 평균 {students['score'].mean():.2f}점 ---")
+            print(f"반 요약 파일: {result['summary_path']}")
+            cols = [c for c in ["student_id", "student_name", "correct", "score", "theta"] if c in students.columns]
+            print(students[cols].head(10).to_string(index=False))
+            if result["errors"]:
+                print(f"\n파일 저장 실패 {len(result['errors'])}명:")
+                for sid, err in result["errors"]:
+                    print(f"  {sid}: {err}")
@@ -0,0 +1,78 @@
+import os
+import shutil
+import pandas as pd
+from irt_model import build_response_matrix, calibrate_2pl
+from output_writers import find_outputs, write_sheets
+from file_locks import atomic_path
+
+# --- 설정 (필수) ---
+
+# (필수) 채점 완료된 파일(..._graded.xlsx)들이 모여있는 폴더
+GRADED_RESULTS_DIR = r".\output_irt"
+
+# (필수) 추정한 IRT 값을 기록할 마스터 DB 파일. 이 파일에 덮어씁니다.
+MASTER_DB_PATH = r".\db_with_irt_from_distractors.xlsx"
+
+# (필수) 백업 파일 저장 경로
+BACKUP_DB_PATH = r".\db_backup.xlsx"
+
+# (필수) 응답 행렬(int8 memmap) 저장 경로. 같은 위치에 _items.csv / _rows.csv 가 함께 저장됩니다.
+RESPONSE_MATRIX_PATH = r".\output_irt\responses.npy"
+
+# (필수) 추정 결과 보고서 (문항별 값/표준오차, 반복별 로그우도)
+REPORT_PATH = r".\output_irt\irt_calibration_report.xlsx"
+
+# 응답 수가 이보다 적은 문항은 DB 값을 바꾸지 않습니다. (기존 선지 정답률 기반 값 유지)
+MIN_RESPONSES = 30
+# --------------------
+
+if __name__ == "__main__":
+    graded_files = find_outputs(GRADED_RESULTS_DIR, "*_graded")
+
+    if not os.path.exists(MASTER_DB_PATH):
+        print(f"오류: 마스터 DB 파일 '{MASTER_DB_PATH}'을(를) 찾을 수 없습니다.")
+    elif not graded_files:
+        print(f"오류: '{GRADED_RESULTS_DIR}' 폴더에서 채점된 파일을 찾을 수 없습니다.")
+    else:
+        print("--- 2PL IRT 추정 시작 ---")
+        master_df = pd.read_excel(MASTER_DB_PATH)
+        item_ids = master_df['문제id'].astype(str).drop_duplicates().tolist()
+
+        # 1. 응답 행렬 생성 (열 순서 = 마스터 DB 문항 순서)
+        data = build_response_matrix(graded_files, RESPONSE_MATRIX_PATH, item_ids=item_ids)
+        print(f"응답 행렬: 시험 {data.matrix.shape[0]}건 x 문항 {data.matrix.shape[1]}개")
+
+        # 2. EM 추정 (현재 DB 값을 초기값으로 사용)
+        result = calibrate_2pl(data, init=master_df)
+        diag = result.diagnostics()
+        print(f"반복 {diag['n_iter']}회, 수렴: {diag['converged']}, 로그우도: {diag['loglik']:.2f}, "
+              f"최대 변화량: {diag['max_change']:.2e}")
+
+        params = result.to_frame()
+        os.makedirs(os.path.dirname(os.path.abspath(REPORT_PATH)), exist_ok=True)
+        write_sheets(REPORT_PATH, {"items": params, "iterations": pd.DataFrame(result.history),
+                                   "diagnostics": pd.DataFrame([diag])}, "xlsx")
+        print(f"추정 보고서 저장: {REPORT_PATH}")
+
+        # 3. 응답이 충분한 문항만 마스터 DB 갱신
+        fitted = params[params['irt_n_responses'] >= MIN_RESPONSES].set_index('문제id')
+        print(f"응답 {MIN_RESPONSES}개 이상인 문항 {len(fitted)}개 / 전체 {len(params)}개를 갱신합니다.")
+        if fitted.empty:
+            print("갱신할 문항이 없습니다.")
+        else:
+            shutil.copy2(MASTER_DB_PATH, BACKUP_DB_PATH)
+            print(f"원본 마스터 DB 파일을 '{BACKUP_DB_PATH}'(으)로 백업했습니다.")
+            ids = master_df['문제id'].astype(str)
+            rows = ids.isin(fitted.index)
+            for col in ['irt_difficulty_b', 'irt_discrimination_a', 'irt_difficulty_b_se',
+                        'irt_discrimination_a_se', 'irt_n_responses']:
+                if col not in master_df.columns:
+                    master_df[col] = float('nan')
+                master_df.loc[rows, col] = ids[rows].map(fitted[col]).to_numpy()
+            with atomic_path(MASTER_DB_PATH) as tmp_path:
+                master_df.to_excel(tmp_path, index=False)
+
+            print("\n--- 2PL IRT 추정 완료 ---")
+            print(f"마스터 DB 파일 '{MASTER_DB_PATH}'이(가) 새로운 값으로 갱신되었습니다.")
+            print(master_df.loc[rows, ['문제id', 'irt_difficulty_b', 'irt_difficulty_b_se',
+                                       'irt_discrimination_a', 'irt_discrimination_a_se']].head())
@@ -0,0 +1,292 @@
+import pandas as pd
+import numpy as np
+import openpyxl
+from openpyxl.chart import BarChart, Reference
+from openpyxl.styles import Font
+import os
+import time
+import logging
+from item_bank import get_item_bank
+from cohort_store import CohortStore, COHORT_STORE_NAME
+from file_locks import atomic_path
+from dashboard_writer import (BOLD_FONT, HEADER_FILL, CENTER_ALIGN, prepare_frame_sheet,
+                              add_heatmap, save_workbook)
+from run_CREATE_DASHBOARD import LIT_SUBJECTS, READ_SUBJECTS
+
+# --- 로깅 설정 ---
+log_cohort_dash = logging.getLogger("cohort_dashboard")
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+# --- (필수) 설정 ---
+
+# 1. 채점 완료 파일(..._graded.xlsx)이 모여 있는 폴더
+GRADED_DIR = r".\output"
+
+# 2. 원본 DB 파일
+DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
+# 3. 생성될 대시보드 파일 경로
+COHORT_DASHBOARD_OUTPUT_PATH = r".\output\DASHBOARD_COHORT.xlsx"
+
+# 4. (선택) 대상 학생 / 제출 날짜 범위 (None: 전체)
+CLASS_STUDENT_IDS = None        # 예: ["S001", "S002", "S003"]
+DATE_FROM = None                # 예: "2025-10-01" (포함)
+DATE_TO = None                  # 예: "2025-10-31" (포함)
+
+# 5. (선택) 채점 결과 모음 저장소. None 이면 GRADED_DIR 안의 cohort_results.sqlite
+#    두 번째 실행부터는 새로 생기거나 바뀐 채점 파일만 읽습니다.
+COHORT_STORE_PATH = None
+
+SCORE_BINS = list(range(0, 101, 10))    # 점수 분포 구간 (0-9, 10-19, ..., 90-100)
+OPTION_LABELS = [str(i) for i in range(1, 6)]
+
+
+def categorize_passages(passage_types: pd.Series, subjects: pd.Series | None = None) -> pd.Series:
+    """
+    지문유형 -> 대분류 (문학 / 독서 / 기타)
+    LIT_SUBJECTS / READ_SUBJECTS 에 없는 지문유형(독서론, 시나리오 등)은 과목(subjects) 이 문학 / 독서이면 그 값을 씁니다.
+    """
+    fallback = subjects.where(subjects.isin(["문학", "독서"]), "기타") if subjects is not None else "기타"
+    return pd.Series(np.select([passage_types.isin(LIT_SUBJECTS), passage_types.isin(READ_SUBJECTS)],
+                               ["문학", "독서"], default=fallback), index=passage_types.index)
+
+
+def _accuracy(df: pd.DataFrame) -> pd.Series:
+    return (df["correct"] / df["n"] * 100).round(1)
+
+
+def _accuracy_table(base: pd.DataFrame, key: str, label: str) -> pd.DataFrame:
+    """key 별 (총 문항, 맞은 문항, 정답률) 표"""
+    t = base.groupby(key, sort=True)[["n", "correct"]].sum()
+    t["정답률(%)"] = _accuracy(t)
+    return t.reset_index().rename(columns={key: label, "n": "총 문항", "correct": "맞은 문항"})
+
+
+def _heatmap_table(base: pd.DataFrame, key: str, names: pd.Series) -> pd.DataFrame:
+    """학생 x key 정답률(%) 표. 첫 행은 전체 학생 기준"""
+    cell = base.groupby(["student_id", key], sort=True)[["n", "correct"]].sum()
+    pivot = _accuracy(cell).unstack(key)
+    total = base.groupby(key, sort=True)[["n", "correct"]].sum()
+    overall = _accuracy(total).to_frame("(전체)").T
+    out = pd.concat([overall, pivot])
+    out.insert(0, "이름", ["" if i == "(전체)" else names.get(i, "") for i in out.index])
+    out.columns = [str(c) for c in out.columns]
+    return out.rename_axis("학생ID").reset_index()
+
+
+def build_cohort_tables(exams: pd.DataFrame, items: pd.DataFrame, db_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    시험 요약(CohortStore.exams)과 문항 결과(CohortStore.items)로 반 전체 대시보드의 표들을 만듭니다.
+    문항 결과는 (학생, 문제id, 제출 답) 기준으로 한 번만 groupby 하고, 모든 표는 이 요약본에서 다시 묶습니다.
+    """
+    # --- 1. 문항 결과를 한 번에 집계 (행 수 = 학생 x 문항 x 고른 답) ---
+    base = (items.groupby(["student_id", "problem_id", "student_answer_num"], sort=False, dropna=False)["is_correct"]
+            .agg(n="size", correct="sum").reset_index())
+
+    # --- 2. 문항 속성(지문유형 / 문제유형 / DB 정답률) 붙이기 ---
+    attrs = pd.DataFrame({"problem_id": db_df["문제id"].astype(str)})
+    for col in ["지문유형", "과목", "문제유형", "정답률"]:
+        attrs[col] = db_df[col].to_numpy() if col in db_df.columns else np.nan
+    attrs = attrs.drop_duplicates("problem_id")
+    graded_types = items.drop_duplicates("problem_id")[["problem_id", "problem_type", "subject"]]
+    attrs = attrs.merge(graded_types, on="problem_id", how="outer")
+    attrs["과목"] = attrs["과목"].astype(object).where(attrs["과목"].notna(), attrs["subject"])
+    attrs["지문유형"] = attrs["지문유형"].astype(object).where(attrs["지문유형"].notna(), "(DB 없음)")
+    attrs["문제유형"] = attrs["문제유형"].astype(object).where(attrs["문제유형"].notna(), attrs["problem_type"])
+    attrs["문제유형"] = attrs["문제유형"].where(attrs["문제유형"].notna(), "(미분류)")
+    attrs["대분류"] = categorize_passages(attrs["지문유형"], attrs["과목"])
+    base = base.merge(attrs[["problem_id", "지문유형", "문제유형", "대분류"]], on="problem_id", how="left")
+
+    names = exams.sort_values("submitted_at").groupby("student_id")["student_name"].last()
+
+    # --- 3. 학생별 성적 ---
+    scores = exams.sort_values(["student_id", "submitted_at"]).groupby("student_id")["score"]
+    students = pd.DataFrame({
+        "이름": names, "응시 횟수": scores.size(), "평균 점수": scores.mean().round(1),
+        "최고 점수": scores.max(), "최저 점수": scores.min(), "최근 점수": scores.last(),
+    })
+    per_student = base.groupby("student_id")[["n", "correct"]].sum()
+    students["정답률(%)"] = _accuracy(per_student)
+    area = base.groupby(["student_id", "대분류"])[["n", "correct"]].sum()
+    area = _accuracy(area).unstack("대분류")
+    for name in ["독서", "문학"]:
+        students[f"{name} 정답률(%)"] = area[name] if name in area.columns else np.nan
+    students = students.rename_axis("학생ID").reset_index()
+
+    # --- 4. 문항 난이도 ---
+    per_item = base.groupby("problem_id")[["n", "correct"]].sum()
+    options = (base[base["student_answer_num"].isin(OPTION_LABELS)]
+               .pivot_table(index="problem_id", columns="student_answer_num", values="n", aggfunc="sum", fill_value=0)
+               .reindex(index=per_item.index, columns=OPTION_LABELS, fill_value=0))
+    item_table = attrs.set_index("problem_id").reindex(per_item.index)[["지문유형", "문제유형"]]
+    item_table["응시 수"] = per_item["n"]
+    item_table["정답 수"] = per_item["correct"]
+    item_table["정답률(%)"] = _accuracy(per_item)
+    db_rate = pd.to_numeric(attrs.set_index("problem_id")["정답률"], errors="coerce").reindex(per_item.index)
+    item_table["DB 정답률(%)"] = (db_rate.astype("float64") * 100).round(1)
+    item_table["차이(%p)"] = (item_table["정답률(%)"] - item_table["DB 정답률(%)"]).round(1)
+    for label in OPTION_LABELS:
+        item_table[f"선지{label} 선택률(%)"] = (options[label] / per_item["n"] * 100).round(1)
+    item_table = item_table.rename_axis("문제id").reset_index().sort_values(["정답률(%)", "문제id"])
+
+    # --- 5. 점수 분포 / 영역 / 유형 ---
+    labels = [f"{lo}-{hi - 1}" for lo, hi in zip(SCORE_BINS[:-2], SCORE_BINS[1:-1])] + [f"{SCORE_BINS[-2]}-{SCORE_BINS[-1]}"]
+    bins = pd.cut(pd.to_numeric(exams["score"], errors="coerce"), SCORE_BINS, labels=labels, right=False, include_lowest=True)
+    bins = bins.where(pd.to_numeric(exams["score"], errors="coerce") != SCORE_BINS[-1], labels[-1])
+    distribution = bins.value_counts().reindex(labels, fill_value=0).rename_axis("점수 구간").reset_index(name="시험 수")
+
+    exam_list = exams[["student_id", "student_name", "exam_id", "submitted_at", "total", "correct", "score"]].rename(columns={
+        "student_id": "학생ID", "student_name": "이름", "exam_id": "시험 ID", "submitted_at": "제출 시각",
+        "total": "문항 수", "correct": "맞은 문항", "score": "점수"})
+
+    return {
+        "area": _accuracy_table(base, "대분류", "영역"),
+        "passage": _accuracy_table(base, "지문유형", "지문 유형"),
+        "problem": _accuracy_table(base, "문제유형", "문제 유형"),
+        "distribution": distribution,
+        "students": students,
+        "passage_heatmap": _heatmap_table(base, "지문유형", names),
+        "problem_heatmap": _heatmap_table(base, "문제유형", names),
+        "items": item_table.reset_index(drop=True),
+        "exams": exam_list,
+    }
+
+
+def _write_table(ws, df: pd.DataFrame, row: int, col: int, title: str) -> None:
+    """Dashboard 시트의 작은 표 (제목, 머리글, 값)"""
+    ws.cell(row=row, column=col, value=title).font = Font(size=14, bold=True)
+    for c, header in enumerate(df.columns, col):
+        cell = ws.cell(row=row + 1, column=c, value=header)
+        cell.font = BOLD_FONT; cell.fill = HEADER_FILL; cell.alignment = CENTER_ALIGN
+    for r, values in enumerate(df.itertuples(index=False, name=None), row + 2):
+        for c, v in enumerate(values, col):
+            ws.cell(row=r, column=c, value=None if pd.isna(v) else v)
+
+
+def _add_bar_chart(ws, title: str, y_title: str, cat_col: int, val_col: int, first_row: int, n: int, anchor: str,
+                   percent: bool = True) -> None:
+    chart = BarChart()
+    chart.title = title
+    chart.add_data(Reference(ws, min_col=val_col, min_row=first_row, max_row=first_row + n - 1), titles_from_data=False)
+    chart.set_categories(Reference(ws, min_col=cat_col, min_row=first_row, max_row=first_row + n - 1))
+    chart.legend = None
+    chart.y_axis.title = y_title
+    chart.y_axis.scaling.min = 0
+    if percent:
+        chart.y_axis.scaling.max = 100
+    ws.add_chart(chart, anchor)
+
+
+def create_cohort_dashboard(graded_dir, db_path, output_path, student_ids=None, date_from=None, date_to=None,
+                            store_path=None, max_workers=None):
+    """
+    폴더의 채점 파일들(선택: 학생 목록 / 제출 날짜 범위)로 반 전체 대시보드를 만듭니다.
+    채점 결과는 CohortStore(SQLite)에 모아 두고 새로 생기거나 바뀐 파일만 읽습니다.
+    반환: build_cohort_tables 의 표 {이름: DataFrame} (실패 시 None)
+    """
+    t0 = time.perf_counter()
+    log_cohort_dash.info(f"반 전체 대시보드 생성 시작: {graded_dir}")
+    if not os.path.isdir(graded_dir):
+        log_cohort_dash.error(f"채점 폴더를 찾을 수 없음: {graded_dir}")
+        print(f"오류: 채점 폴더를 찾을 수 없음: {graded_dir}")
+        return None
+    if not os.path.exists(db_path):
+        log_cohort_dash.error(f"DB 파일을 찾을 수 없음: {db_path}")
+        print(f"오류: DB 파일을 찾을 수 없음: {db_path}")
+        return None
+
+    # --- 1. 채점 결과 모으기 (새 파일만 읽음) ---
+    try:
+        with CohortStore(store_path or os.path.join(graded_dir, COHORT_STORE_NAME)) as store:
+            n_new, n_removed, errors = store.sync_dir(graded_dir, max_workers=max_workers)
+            for path, err in errors[:10]:
+                log_cohort_dash.warning(f"채점 파일 읽기 실패: {path} ({err})")
+            exams = store.exams(student_ids, date_from, date_to, graded_dir=graded_dir)
+            items = store.items(student_ids, date_from, date_to, graded_dir=graded_dir)
+        db_df = get_item_bank(db_path).df
+    except Exception as e:
+        log_cohort_dash.error(f"채점 결과 로드 실패: {e}")
+        print(f"오류: 채점 결과 로드 실패: {e}")
+        return None
+    print(f"채점 파일 반영: 새 파일 {n_new}개, 삭제 {n_removed}개, 읽기 실패 {len(errors)}개")
+    if exams.empty:
+        log_cohort_dash.error("조건에 맞는 채점 결과가 없습니다.")
+        print("오류: 조건에 맞는 채점 결과가 없습니다.")
+        return None
+
+    # --- 2. 집계 ---
+    log_cohort_dash.info(f"집계 중... (시험 {len(exams)}개, 문항 응답 {len(items)}개)")
+    tables = build_cohort_tables(exams, items, db_df)
+
+    # --- 3. 'Dashboard' 시트 ---
+    wb = openpyxl.Workbook()
+    ws_dash = wb.active
+    ws_dash.title = "Dashboard"
+    ws_dash['B2'] = "반 전체 분석 대시보드"
+    ws_dash['B2'].font = Font(size=24, bold=True)
+    submitted = exams["submitted_at"].dropna().astype(str).str[:10]
+    period = f"{submitted.min()} ~ {submitted.max()}" if not submitted.empty else "N/A"
+    area = tables["area"]
+    info = [("학생 수", f"{exams['student_id'].nunique()} 명"), ("시험 수", f"{len(exams)} 개"), ("기간", period),
+            ("평균 점수", f"{round(float(exams['score'].mean()), 1)} 점"),
+            ("평균 정답률", f"{round(float(area['맞은 문항'].sum() / max(area['총 문항'].sum(), 1) * 100), 1)} %")]
+    for r, (label, value) in enumerate(info, 4):
+        ws_dash[f'B{r}'] = label; ws_dash[f'C{r}'] = value
+        ws_dash[f'B{r}'].font = BOLD_FONT
+
+    start_row = 11
+    _write_table(ws_dash, area, start_row, 2, "영역별 성취도 요약")
+    dist = tables["distribution"]
+    _write_table(ws_dash, dist, start_row, 7, "점수 분포")
+    _add_bar_chart(ws_dash, "점수 분포 (시험 수)", "시험 수", 7, 8, start_row + 2, len(dist), f"L{start_row}", percent=False)
+
+    start_row += max(len(area), len(dist)) + 4
+    passage, problem = tables["passage"], tables["problem"]
+    _write_table(ws_dash, passage, start_row, 2, "지문 유형별 정답률")
+    _write_table(ws_dash, problem, start_row, 7, "문제 유형별 정답률")
+    _add_bar_chart(ws_dash, "지문 유형별 정답률 (%)", "정답률(%)", 2, 5, start_row + 2, len(passage), f"L{start_row}")
+    for col in ['B', 'C', 'D', 'E', 'G', 'H', 'I', 'J']:
+        ws_dash.column_dimensions[col].width = 15
+
+    # --- 4. 표 시트 (머리글만 준비, 데이터 행은 저장할 때 한꺼번에 기록) ---
+    frames = {"학생별 성적": tables["students"], "지문유형 히트맵": tables["passage_heatmap"],
+              "문제유형 히트맵": tables["problem_heatmap"], "문항 난이도": tables["items"], "시험 목록": tables["exams"]}
+    for name, df in frames.items():
+        ws = wb.create_sheet(title=name)
+        prepare_frame_sheet(ws, df)
+        if name.endswith("히트맵"):
+            ws.freeze_panes = "C2"
+            add_heatmap(ws, 3, df.shape[1], len(df))
+    add_heatmap(wb["학생별 성적"], 8, 10, len(tables["students"]))
+    item_rate_col = list(tables["items"].columns).index("정답률(%)") + 1
+    add_heatmap(wb["문항 난이도"], item_rate_col, item_rate_col, len(tables["items"]))
+
+    # --- 5. 저장 ---
+    try:
+        with atomic_path(output_path) as tmp_path:
+            save_workbook(wb, tmp_path, frames)
+        log_cohort_dash.info(f"반 전체 대시보드 생성 완료: {os.path.abspath(output_path)} ({time.perf_counter() - t0:.1f}초)")
+        print(f"반 전체 대시보드 생성 완료: {os.path.abspath(output_path)}")
+    except PermissionError:
+        log_cohort_dash.error(f"권한 오류: 파일을 저장할 수 없습니다. 파일이 열려있는지 확인하세요. ({output_path})")
+        print(f"권한 오류: 파일을 저장할 수 없습니다. 파일이 열려있는지 확인하세요. ({output_path})")
+        return None
+    except Exception as e:
+        log_cohort_dash.error(f"파일 저장 실패: {e}")
+        print(f"파일 저장 실패: {e}")
+        return None
+    return tables
+
+
+if __name__ == "__main__":
+    # (주의) 실행 전 상단의 '설정'을 꼭 확인하세요!
+    create_cohort_dashboard(
+        graded_dir=GRADED_DIR,
+        db_path=DB_PATH,
+        output_path=COHORT_DASHBOARD_OUTPUT_PATH,
+        student_ids=CLASS_STUDENT_IDS,
+        date_from=DATE_FROM,
+        date_to=DATE_TO,
+        store_path=COHORT_STORE_PATH,
+    )
@@ -1,10 +1,14 @@
 import pandas as pd
 import openpyxl
 from openpyxl.chart import BarChart, Reference
-from openpyxl.styles import PatternFill, Font, Alignment
-from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font
 import os
 import logging
+from item_bank import get_item_bank
+from graded_reader import read_sheets
+from file_locks import atomic_path
+from dashboard_writer import (BOLD_FONT, HEADER_FILL, CENTER_ALIGN, prepare_frame_sheet,
+                              add_answer_highlight, save_workbook)
 
 # --- 로깅 설정 ---
 log_dash = logging.getLogger("dashboard_creator")
@@ -30,22 +34,29 @@ READ_SUBJECTS = ["인문", "주제통합", "예술", "과학", "기술", "과학
 WEAK_PASSAGE_THRESHOLD = 70.0 # 이 정답률 미만일 시 '취약 지문'
 WEAK_PROBLEM_THRESHOLD = 60.0 # 이 정답률 미만일 시 '취약 문제'
 
-# --- 스타일 정의 ---
-GREEN_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-RED_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-RED_FONT = Font(color="9C0006", bold=True)
-GREEN_FONT = Font(color="006100", bold=True)
-BOLD_FONT = Font(bold=True)
-HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-CENTER_ALIGN = Alignment(horizontal='center', vertical='center')
+DASHBOARD_SHEETS = ["summary", "meta", "grading", "summary_by_subject"]
 
 def create_dashboard(graded_path, db_path, output_path):
+    """채점 파일을 읽어 create_dashboard_from_sheets 를 실행합니다."""
     log_dash.info(f"대시보드 생성 시작: {graded_path}")
 
     if not os.path.exists(graded_path):
         log_dash.error(f"채점 파일을 찾을 수 없음: {graded_path}")
         print(f"오류: 채점 파일을 찾을 수 없음: {graded_path}")
         return
+    try:
+        sheets = read_sheets(graded_path, DASHBOARD_SHEETS)
+    except Exception as e:
+        log_dash.error(f"파일 로드 실패: {e}")
+        print(f"오류: 파일 로드 실패: {e}")
+        return
+    create_dashboard_from_sheets(sheets, db_path, output_path)
+
+def create_dashboard_from_sheets(sheets, db_path, output_path):
+    """
+    채점 결과 시트({summary, meta, grading, summary_by_subject}, grade_exam 결과의 "sheets")로 대시보드를 만듭니다.
+    문항 DB 는 프로세스 안에서 캐시된 ItemBank 를 씁니다. 넘겨받은 DataFrame 은 바꾸지 않습니다.
+    """
     if not os.path.exists(db_path):
         log_dash.error(f"DB 파일을 찾을 수 없음: {db_path}")
         print(f"오류: DB 파일을 찾을 수 없음: {db_path}")
@@ -53,16 +64,16 @@ def create_dashboard(graded_path, db_path, output_path):
 
     # --- 1. 데이터 로드 ---
     try:
-        summary_df = pd.read_excel(graded_path, sheet_name="summary")
-        meta_df = pd.read_excel(graded_path, sheet_name="meta")
-        grading_df = pd.read_excel(graded_path, sheet_name="grading")
-        summary_subject_df = pd.read_excel(graded_path, sheet_name="summary_by_subject")
+        summary_df = sheets["summary"]
+        meta_df = sheets["meta"]
+        grading_df = sheets["grading"].copy()
+        summary_subject_df = sheets["summary_by_subject"]
         
         # grading_df 이름 변경
         if '문제id' in grading_df.columns:
             grading_df = grading_df.rename(columns={'문제id': 'problem_id'})
             
-        db_df = pd.read_excel(db_path)
+        db_df = get_item_bank(db_path).df
         
         # db_df 이름 변경 (시트 0을 읽는다고 가정)
         if '문제id' in db_df.columns:
@@ -92,6 +103,8 @@ def create_dashboard(graded_path, db_path, output_path):
 
     optional_db_cols = ['년', '월'] 
     distractor_cols = [f'선지정답률_{i}' for i in range(1, 6)]
+    # 문항 분석(run_ITEM_ANALYSIS) 결과가 DB 에 있으면 함께 표시: DB 컬럼 -> (표시 이름, 배율, 반올림 자리)
+    item_analysis_cols = {'ia_p_value': ('실측 정답률(%)', 100, 1), 'ia_point_biserial': ('변별도(점이연)', 1, 3)}
     
     if db_id_column in db_df.columns:
         db_cols_to_merge.append(db_id_column)
@@ -106,6 +119,7 @@ def create_dashboard(graded_path, db_path, output_path):
         else:
             log_dash.warning(f"DB에 '{col}' 컬럼이 없어 제외됩니다.")
             
+    db_cols_to_merge += [col for col in item_analysis_cols if col in db_df.columns]
     db_subset_df = db_df[db_cols_to_merge].copy()
 
     # 3b. ID 형식 통일 (merge 대비)
@@ -120,12 +134,20 @@ def create_dashboard(graded_path, db_path, output_path):
     for col in distractor_cols:
          if col in detail_df.columns:
             new_col_name = f"{col} (%)"
-            # 소수점 * 100 -> 퍼센트 (1자리 반올림)
-            detail_df[new_col_name] = (detail_df[col] * 100).round(1)
+            # 소수점 * 100 -> 퍼센트 (1자리 반올림, 스냅샷의 float32 오차 제거를 위해 float64로 변환)
+            detail_df[new_col_name] = (detail_df[col].astype("float64") * 100).round(1)
             detail_df.drop(columns=[col], inplace=True)
             distractor_percent_cols.append(new_col_name)
     # ---------------------------------
 
+    # --- 문항 분석 값 변환 ---
+    item_analysis_display = []
+    for col, (new_col_name, scale, digits) in item_analysis_cols.items():
+        if col in detail_df.columns:
+            detail_df[new_col_name] = (pd.to_numeric(detail_df[col], errors="coerce").astype("float64") * scale).round(digits)
+            item_analysis_display.append(new_col_name)
+    # ---------------------------------
+
     # 3d. 시험 문제 번호 추가 및 컬럼 정리
     detail_df.insert(0, '시험 문제 번호', range(1, len(detail_df) + 1))
     
@@ -136,6 +158,7 @@ def create_dashboard(graded_path, db_path, output_path):
     for col in optional_db_cols:
         if col in detail_df.columns:
             final_cols_order.append(col)
+    final_cols_order += item_analysis_display
 
     for col in distractor_percent_cols:
          if col in detail_df.columns:
@@ -265,74 +288,22 @@ def create_dashboard(graded_path, db_path, output_path):
     
     ws_detail = wb.create_sheet(title="상세 성적")
     
-    # 6a. DataFrame to Excel
-    from openpyxl.utils.dataframe import dataframe_to_rows
-    for r_idx, row in enumerate(dataframe_to_rows(detail_df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = ws_detail.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1: # Header
-                cell.font = BOLD_FONT; cell.fill = HEADER_FILL; cell.alignment = CENTER_ALIGN
-            if isinstance(value, (int, float)):
-                cell.alignment = CENTER_ALIGN
-
-    # 6b. 컬럼 인덱스 매핑 (스타일링 편의용)
-    col_map = {cell.value: cell.column for cell in ws_detail[1]}
-    
-    # 6c. 하이라이팅 적용
-    distractor_col_indices = {} # (예: 1 -> 'K')
-    
-    # '% (%)'가 붙은 새 컬럼명으로 매핑
-    for i in range(1, 6):
-        col_name = f'선지정답률_{i} (%)'
-        if col_name in col_map:
-            distractor_col_indices[str(i)] = col_map[col_name]
-            
-    if not distractor_col_indices:
+    # 6a. 머리글/열 너비/틀 고정만 준비 (데이터 행은 저장할 때 셀 객체 없이 한꺼번에 기록)
+    prepare_frame_sheet(ws_detail, detail_df)
+
+    # 6b. 하이라이팅: 행마다 서식을 입히지 않고 조건부 서식 규칙으로 적용
+    #     (틀린 문제 행 빨간 배경 > 정답 선지 초록 배경, 학생 선택 선지 초록/빨간 굵은 글씨)
+    distractor_col_names = {str(i): f'선지정답률_{i} (%)' for i in range(1, 6)
+                            if f'선지정답률_{i} (%)' in detail_df.columns}
+    if not distractor_col_names:
         log_dash.warning("선지정답률 컬럼이 없어 하이라이팅을 스킵합니다.")
-    
     else:
-        for row in ws_detail.iter_rows(min_row=2, max_row=ws_detail.max_row):
-            row_cells = {col: row[idx - 1] for col, idx in col_map.items()}
-            
-            try:
-                is_correct = row_cells['정답 여부'].value
-                correct_ans = str(row_cells['정답'].value)
-                student_ans = str(row_cells['제출 답안'].value)
-
-                # 1. 정답 선지 (초록색 배경)
-                if correct_ans in distractor_col_indices:
-                    col_idx = distractor_col_indices[correct_ans]
-                    row[col_idx - 1].fill = GREEN_FILL
-                
-                # 2. 학생 선택
-                if student_ans in distractor_col_indices:
-                    col_idx = distractor_col_indices[student_ans]
-                    
-                    if is_correct == 1:
-                        row[col_idx - 1].font = GREEN_FONT
-                    else:
-                        row[col_idx - 1].font = RED_FONT
-
-                # 3. 틀린 문제 행 (빨간색 배경)
-                if is_correct == 0:
-                    for cell in row:
-                        cell.fill = RED_FILL
-                        
-            except Exception as e:
-                log_dash.warning(f"{row[0].row}행 스타일링 중 오류: {e}")
-
-    # 6d. '상세 성적' 시트 너비/고정 조정
-    for i, col in enumerate(detail_df.columns, 1):
-        try:
-            width = max(len(str(col)), detail_df[col].astype(str).map(len).max()) * 1.1
-            ws_detail.column_dimensions[get_column_letter(i)].width = min(max(width, 12), 30)
-        except Exception:
-            ws_detail.column_dimensions[get_column_letter(i)].width = 15
-    ws_detail.freeze_panes = 'A2' # 헤더 고정
+        add_answer_highlight(ws_detail, list(detail_df.columns), len(detail_df), distractor_col_names)
 
     # --- 7. 저장 ---
     try:
-        wb.save(output_path)
+        with atomic_path(output_path) as tmp_path:
+            save_workbook(wb, tmp_path, {"상세 성적": detail_df})
         log_dash.info(f"대시보드 생성 완료: {os.path.abspath(output_path)}")
         print(f"대시보드 생성 완료: {os.path.abspath(output_path)}")
     except PermissionError:
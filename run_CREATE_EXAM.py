@@ -1,5 +1,7 @@
 import os
 from exam_functions import generate_exam_7_passages_from_db, generate_exam_irt_weakness
+from theta_estimation import latest_theta
+from weakness_store import weakness_store_path
 
 # --- 설정 (필수) ---
 # (중요) "RANDOM": 첫 사용자용, "IRT": 맞춤형
@@ -7,14 +9,17 @@ MODE = "IRT"
 
 BASE_DIR = r".\data"           # 지문/문제 docx 루트
 DB_PATH  = r".\data\db_with_irt_from_distractors.xlsx"   # DB (IRT 모드 시 irt_... 컬럼 필수)
-WEAKNESS_DB_DIR = r".\output"    # 취약점 파일(user_weakness...) 저장/로드 폴더
+WEAKNESS_DB_DIR = r".\output"    # 취약점 저장소(weakness.sqlite) 폴더
 OUTPUT_DIR = r".\output"       # 시험지(docx), 메타(xlsx) 저장 폴더
 
+# 시험지 조립 엔진: "word" (MS Word 필요, Windows 전용) / "ooxml" (Word 없이 모든 OS에서 동작, 빠름)
+ENGINE = "word"
+
 STUDENT_ID = "S001"            # (필수) 응시할 학생 ID
 STUDENT_NAME = "김철수"        # (필수) 응시할 학생 이름
 
 # --- IRT 모드일 때만 필요한 설정 ---
-USER_THETA = 0.3               # (IRT 필수) 학생의 현재 능력치
+USER_THETA = None              # 학생의 현재 능력치. None 이면 OUTPUT_DIR 의 최근 채점 결과에서 추정한 값을 사용
 # ------------------------------
 
 if __name__ == "__main__":
@@ -30,15 +35,25 @@ if __name__ == "__main__":
             two_columns=True,
             output_dir=OUTPUT_DIR,
             student_id=STUDENT_ID,
-            student_name=STUDENT_NAME
+            student_name=STUDENT_NAME,
+            engine=ENGINE
         )
     
     elif MODE == "IRT":
+        if USER_THETA is None:
+            USER_THETA, theta_se = latest_theta(OUTPUT_DIR, STUDENT_ID, db_path=DB_PATH)
+            if USER_THETA is None:
+                print("채점 기록에서 추정 능력치를 찾지 못했습니다. Theta=0.0 으로 진행합니다.")
+                USER_THETA = 0.0
+            else:
+                print(f"최근 채점 결과의 추정 능력치를 사용합니다. (Theta={USER_THETA:.2f}, SE={theta_se})")
+            USER_THETA = round(USER_THETA, 2)
+
         print(f"--- {STUDENT_NAME}({STUDENT_ID})님 맞춤형 시험 생성 (Theta={USER_THETA}) ---")
         
-        # 학생 ID를 기반으로 취약점 파일 경로 자동 설정
-        WEAKNESS_FILE_PATH = os.path.join(WEAKNESS_DB_DIR, f"user_weakness_{STUDENT_ID}.xlsx")
-        print(f"사용할 취약점 파일: {WEAKNESS_FILE_PATH}")
+        # 취약점 저장소에서 학생 ID 의 기록을 사용 (기존 user_weakness_{ID}.xlsx 는 처음 한 번 저장소로 옮겨짐)
+        WEAKNESS_FILE_PATH = weakness_store_path(WEAKNESS_DB_DIR)
+        print(f"사용할 취약점 저장소: {WEAKNESS_FILE_PATH} ({STUDENT_ID})")
 
         gen_result = generate_exam_irt_weakness(
             db_path=DB_PATH,
@@ -55,7 +70,8 @@ if __name__ == "__main__":
             output_dir=OUTPUT_DIR,
             
             student_id=STUDENT_ID,
-            student_name=STUDENT_NAME
+            student_name=STUDENT_NAME,
+            engine=ENGINE
         )
         
     else:
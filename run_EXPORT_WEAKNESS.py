@@ -0,0 +1,26 @@
+import os
+from weakness_store import WeaknessStore, weakness_store_path
+
+# --- 설정 (필수) ---
+
+# (필수) 취약점 저장소(weakness.sqlite)가 있는 폴더 (채점 시 WEAKNESS_DB_DIR)
+WEAKNESS_DB_DIR = r".\output"
+
+# 내보낼 학생 ID 목록 (None: 저장소의 모든 학생)
+STUDENT_IDS = ["S001"]
+
+# 엑셀 파일(user_weakness_{학생ID}.xlsx)을 저장할 폴더 (None: WEAKNESS_DB_DIR)
+EXPORT_DIR = None
+# --------------------
+
+if __name__ == "__main__":
+    store_path = weakness_store_path(WEAKNESS_DB_DIR)
+    if not os.path.exists(store_path):
+        print(f"오류: 취약점 저장소를 찾을 수 없습니다. ({store_path})")
+    else:
+        with WeaknessStore(store_path) as store:
+            student_ids = STUDENT_IDS if STUDENT_IDS is not None else store.students()
+            print(f"--- 취약점 엑셀 내보내기: {len(student_ids)}명 ---")
+            for sid in student_ids:
+                path = store.export_xlsx(sid, EXPORT_DIR)
+                print(f"{sid}: {path}")
@@ -1,5 +1,6 @@
 import os
-from exam_functions import grade_exam, analyze_weakness_from_graded_file
+from exam_functions import grade_exam, analyze_weakness
+from run_CREATE_DASHBOARD import create_dashboard_from_sheets
 
 # --- 설정 (필수) ---
 
@@ -10,11 +11,23 @@ EXAM_FILE_TO_GRADE = r".\output\EX20251021T072918-S001-EXAM.xlsx"
 # None으로 설정 시, interactive=True (직접 입력) 모드로 실행됩니다.
 ANSWERS_FILE_PATH = r".\answers\S001_EX20251021T072918-S001-EXAM_answers.xlsx" 
 
+# (선택) 문항 DB. 지정하면 채점 결과에 추정 능력치(theta)와 표준오차를 함께 기록합니다. (None: 추정 안 함)
+DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
 # (필수) 채점 결과(..._graded.xlsx)를 저장할 폴더
 GRADE_OUTPUT_DIR = r".\output"
 
-# (필수) 분석된 취약점 파일(user_weakness_...xlsx)을 저장할 폴더
+# (필수) 취약점 저장소(weakness.sqlite)를 둘 폴더
 WEAKNESS_DB_DIR = r".\output"
+
+# True 이면 갱신된 기록을 엑셀 파일(user_weakness_{학생ID}.xlsx)로도 내보냅니다. (직접 열어 볼 때)
+EXPORT_WEAKNESS_XLSX = False
+
+# True 이면 채점 직후 대시보드(DASHBOARD_{시험ID}.xlsx)를 GRADE_OUTPUT_DIR 에 함께 만듭니다. (DB_PATH 필요)
+CREATE_DASHBOARD = True
+
+# 채점 결과 파일 형식: "xlsx" (사람이 열어 볼 때) / "xlsx-stream" / "csv" / "parquet" / "json" (프로그램이 읽을 때)
+OUTPUT_FORMAT = "xlsx"
 # --------------------
 
 if __name__ == "__main__":
@@ -31,7 +44,9 @@ if __name__ == "__main__":
             exam_xlsx_path=EXAM_FILE_TO_GRADE,
             interactive=(ANSWERS_FILE_PATH is None),
             answers_xlsx_path=ANSWERS_FILE_PATH,
-            output_dir=GRADE_OUTPUT_DIR
+            output_dir=GRADE_OUTPUT_DIR,
+            db_path=DB_PATH,
+            output_format=OUTPUT_FORMAT
         )
         
         # 2. 분석 (채점 성공 시)
@@ -39,11 +54,13 @@ if __name__ == "__main__":
             
             print(f"\n--- 취약점 분석 및 갱신 시작 ---")
             
-            updated_weakness_file = analyze_weakness_from_graded_file(
-                graded_xlsx_path=grade_result["graded_path"], # 채점 결과 파일
+            # 채점 결과 파일을 다시 읽지 않고 grade_exam 이 돌려준 시트를 그대로 사용
+            updated_weakness_file = analyze_weakness(
+                grade_result["sheets"], # 채점 결과 시트
                 output_dir=WEAKNESS_DB_DIR, # 취약점 파일 저장 위치
                 passage_threshold=70.0,
-                problem_threshold=60.0
+                problem_threshold=60.0,
+                export_xlsx=EXPORT_WEAKNESS_XLSX
             )
             
             if updated_weakness_file:
@@ -51,5 +68,13 @@ if __name__ == "__main__":
                 print(f"{updated_weakness_file}")
             else:
                 print("\n--- 취약점 파일 갱신 실패 ---")
+
+            # 3. 대시보드 (채점 결과 시트 재사용)
+            if CREATE_DASHBOARD and DB_PATH:
+                print(f"\n--- 대시보드 생성 ---")
+                create_dashboard_from_sheets(
+                    grade_result["sheets"], DB_PATH,
+                    os.path.join(GRADE_OUTPUT_DIR, f"DASHBOARD_{grade_result['exam_id']}.xlsx")
+                )
         else:
             print("\n--- 채점 실패 (분석 건너뜀) ---")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# --- 설정 (필수) ---
+
+# 모듈별 import 시간 예산(ms). 새 프로세스에서 import 만 했을 때의 중앙값이 이보다 크면 실패로 표시합니다.
+# (PC 성능에 따라 다르므로 처음 한 번 돌려 보고 여유 있게 조정하세요.)
+IMPORT_BUDGETS_MS = {
+    "exam_functions": 1500,
+    "batch_grading": 1500,
+    "job_queue": 200,            # 작업을 넣기만 하는 화면 / 막 뜬 워커: 채점 모듈을 불러오지 않아야 함
+    "run_WORKER": 200,
+    "grading_daemon": 1500,
+    "run_CREATE_DASHBOARD": 2000,
+}
+
+# import 했을 때 불러오면 안 되는 모듈 (Word 엔진 / 해당 작업을 실제로 쓸 때만 불러와야 함)
+MUST_NOT_LOAD = {
+    "exam_functions": ["pythoncom", "win32com", "word_com", "docx_assembler", "openpyxl"],
+    "batch_grading": ["pythoncom", "win32com", "word_com", "openpyxl"],
+    "job_queue": ["pandas", "numpy", "openpyxl", "exam_functions", "run_CREATE_DASHBOARD", "pythoncom"],
+    "run_WORKER": ["pandas", "numpy", "openpyxl", "exam_functions", "run_CREATE_DASHBOARD", "pythoncom"],
+    "grading_daemon": ["exam_functions", "openpyxl", "pythoncom"],
+    "run_CREATE_DASHBOARD": ["pythoncom", "win32com", "word_com"],
+}
+
+REPEAT = 5                       # 모듈마다 새 프로세스에서 반복 측정하는 횟수
+# --------------------
+
+_CHILD = """
+import sys, time, json, importlib
+t = time.perf_counter()
+importlib.import_module(sys.argv[1])
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({"ms": ms, "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+
+def measure_import(module: str, watch: list, repeat: int = REPEAT) -> tuple[list, list]:
+    """새 파이썬 프로세스에서 module 을 import 하는 시간(ms) 목록과, watch 중 함께 불러온 모듈 목록"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in (here, os.environ.get("PYTHONPATH")) if p)}
+    times, loaded = [], []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", _CHILD, module, json.dumps(watch)], cwd=here, env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import 실패")
+        out = json.loads(proc.stdout.strip().splitlines()[-1])
+        times.append(out["ms"])
+        loaded = out["loaded"]
+    return times, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주요 모듈의 import 시간과 불필요하게 불러오는 모듈을 점검합니다.")
+    parser.add_argument("modules", nargs="*", help="점검할 모듈 (기본: IMPORT_BUDGETS_MS 전부)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    failed = []
+    print(f"--- import 시간 점검 (모듈마다 새 프로세스 {args.repeat}회, 중앙값) ---")
+    for module in args.modules or list(IMPORT_BUDGETS_MS):
+        budget = IMPORT_BUDGETS_MS.get(module)
+        watch = MUST_NOT_LOAD.get(module, [])
+        try:
+            times, loaded = measure_import(module, watch, max(1, args.repeat))
+        except Exception as e:
+            print(f"[실패] {module}: import 오류 - {e}")
+            failed.append(module)
+            continue
+        median = statistics.median(times)
+        problems = []
+        if budget is not None and median > budget:
+            problems.append(f"예산 {budget}ms 초과")
+        if loaded:
+            problems.append(f"불러오면 안 되는 모듈: {', '.join(loaded)}")
+        status = "실패" if problems else "통과"
+        print(f"[{status}] {module}: {median:.0f}ms (최소 {min(times):.0f}ms"
+              + (f", 예산 {budget}ms" if budget is not None else "") + ")"
+              + (f" - {'; '.join(problems)}" if problems else ""))
+        if problems:
+            failed.append(module)
+
+    if failed:
+        print(f"\n점검 실패: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n모든 모듈이 점검을 통과했습니다.")
@@ -0,0 +1,93 @@
+import os
+import time
+import shutil
+import pandas as pd
+from cohort_store import CohortStore, COHORT_STORE_NAME
+from results_warehouse import ResultsWarehouse
+from item_analysis import analyze_items, IA_COLS
+from output_writers import write_sheets
+from file_locks import atomic_path
+
+# --- 설정 (필수) ---
+
+# (필수) 채점 완료된 파일(..._graded.xlsx)들이 모여있는 폴더
+GRADED_RESULTS_DIR = r".\output"
+
+# (필수) 문항 분석 값(ia_* 컬럼)을 기록할 마스터 DB 파일. 이 파일에 덮어씁니다.
+MASTER_DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
+# (필수) 백업 파일 저장 경로
+BACKUP_DB_PATH = r".\db_backup.xlsx"
+
+# (필수) 분석 보고서 (문항별 값, 능력 분위별 선지 선택률, 시험지 형태별 KR-20)
+REPORT_PATH = r".\output\item_analysis_report.xlsx"
+
+# (선택) 채점 결과 모음 저장소. None 이면 GRADED_RESULTS_DIR 안의 cohort_results.sqlite (반 전체 대시보드와 같은 파일)
+COHORT_STORE_PATH = None
+
+# (선택) 채점 결과 저장소 폴더 (예: r".\output\results_warehouse"). 지정하면 채점 파일을 읽지 않고 이 저장소만 읽습니다.
+RESULTS_WAREHOUSE_DIR = None
+
+# 응답 수가 이보다 적은 문항은 DB 값을 바꾸지 않습니다.
+MIN_RESPONSES = 30
+# --------------------
+
+if __name__ == "__main__":
+    if not os.path.exists(MASTER_DB_PATH):
+        print(f"오류: 마스터 DB 파일 '{MASTER_DB_PATH}'을(를) 찾을 수 없습니다.")
+    elif not os.path.isdir(GRADED_RESULTS_DIR):
+        print(f"오류: '{GRADED_RESULTS_DIR}' 폴더를 찾을 수 없습니다.")
+    else:
+        print("--- 문항 분석 시작 ---")
+        t0 = time.perf_counter()
+
+        # 1. 채점 결과 모으기
+        if RESULTS_WAREHOUSE_DIR:
+            responses = ResultsWarehouse(RESULTS_WAREHOUSE_DIR).query(
+                columns=["exam_id", "student_id", "submitted_at", "problem_id", "student_answer_num", "is_correct"])
+            # 같은 시험 ID 로 다시 채점한 경우도 따로 세도록 (시험, 학생, 제출 시각) 을 한 번의 응시로 봅니다.
+            responses["file_id"] = responses.groupby(["exam_id", "student_id", "submitted_at"], sort=False).ngroup()
+            print(f"채점 결과 저장소 '{RESULTS_WAREHOUSE_DIR}' 에서 읽었습니다.")
+        else:
+            # 새로 생기거나 바뀐 파일만 읽음
+            with CohortStore(COHORT_STORE_PATH or os.path.join(GRADED_RESULTS_DIR, COHORT_STORE_NAME)) as store:
+                n_new, n_removed, errors = store.sync_dir(GRADED_RESULTS_DIR)
+                responses = store.items(graded_dir=GRADED_RESULTS_DIR)
+            print(f"채점 파일 반영: 새 파일 {n_new}개, 삭제 {n_removed}개, 읽기 실패 {len(errors)}개")
+            for path, err in errors[:10]:
+                print(f"  - {path}: {err}")
+
+        if responses.empty:
+            print("분석할 응답이 없습니다.")
+        else:
+            # 2. 분석
+            result = analyze_items(responses)
+            n_forms = int((result.forms["KR-20"].notna()).sum())
+            print(f"응답 {len(responses)}개, 문항 {len(result.items)}개, 시험지 형태 {len(result.forms)}개 "
+                  f"(KR-20 계산 {n_forms}개) - {time.perf_counter() - t0:.1f}초")
+            write_sheets(REPORT_PATH, {"items": result.items, "option_curves": result.curves,
+                                       "forms": result.forms}, "xlsx")
+            print(f"분석 보고서 저장: {REPORT_PATH}")
+
+            # 3. 응답이 충분한 문항만 마스터 DB 갱신
+            params = result.db_frame()
+            fitted = params[params['ia_n_responses'] >= MIN_RESPONSES].set_index('문제id')
+            print(f"응답 {MIN_RESPONSES}개 이상인 문항 {len(fitted)}개 / 전체 {len(params)}개를 갱신합니다.")
+            if fitted.empty:
+                print("갱신할 문항이 없습니다.")
+            else:
+                master_df = pd.read_excel(MASTER_DB_PATH)
+                shutil.copy2(MASTER_DB_PATH, BACKUP_DB_PATH)
+                print(f"원본 마스터 DB 파일을 '{BACKUP_DB_PATH}'(으)로 백업했습니다.")
+                ids = master_df['문제id'].astype(str)
+                rows = ids.isin(fitted.index)
+                for col in IA_COLS:
+                    if col not in master_df.columns:
+                        master_df[col] = float('nan')
+                    master_df.loc[rows, col] = ids[rows].map(fitted[col]).to_numpy()
+                with atomic_path(MASTER_DB_PATH) as tmp_path:
+                    master_df.to_excel(tmp_path, index=False)
+
+                print("\n--- 문항 분석 완료 ---")
+                print(f"마스터 DB 파일 '{MASTER_DB_PATH}'이(가) 새로운 값으로 갱신되었습니다.")
+                print(master_df.loc[rows, ['문제id', *IA_COLS]].head())
@@ -0,0 +1,85 @@
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from output_writers import OUTPUT_FORMATS, write_sheets
+from graded_reader import read_sheets, as_read, _dedupe_columns
+
+# --- 설정 (선택) ---
+
+# 점검할 출력 형식 (None 이면 output_writers.OUTPUT_FORMATS 전부)
+#  parquet 은 pyarrow 가 없으면 건너뜁니다.
+FORMATS = None
+# --------------------
+
+
+def sample_sheets() -> dict[str, pd.DataFrame]:
+    """채점 파일과 같은 모양의 시트들. 끝 열이 빈 행(theta 없는 meta 등), 빈 행, 중복 컬럼을 포함합니다."""
+    meta = pd.DataFrame([{"exam_id": "S001_20251023_1", "student_id": "S001", "student_name": "홍길동",
+                          "total_score": 12, "max_score": 20, "theta": None, "theta_se": None}])
+    answers = pd.DataFrame({
+        "item_id": ["I1", "I2", "I3", "I4"],
+        "passage_group_id": ["P1", "P1", "P2", None],
+        "student_answer": [1, 3, None, 2],
+        "is_correct": [1, 0, 0, None],
+        "a": [1.2, 0.8, np.nan, np.nan],
+        "memo": ["<정답>&", "", None, None],
+    })
+    empty_row = pd.DataFrame([["x", 1, None], [None, None, None], ["y", None, None]], columns=["k", "v", "v"])
+    return {"meta": meta, "answers": answers, "dup_cols": empty_row, "empty": pd.DataFrame(columns=["a", "b"])}
+
+
+def check_round_trip(output_format: str, sheets: dict[str, pd.DataFrame], directory: str) -> list[str]:
+    """시트들을 한 형식으로 썼다가 read_sheets 로 다시 읽어, 기준(as_read + 빈 행 제거)과 다른 점을 돌려줍니다."""
+    path = write_sheets(os.path.join(directory, f"roundtrip_{output_format}"), sheets, output_format)
+    frames = read_sheets(path, list(sheets))
+    problems = []
+    for name, df in sheets.items():
+        expected = df.copy()
+        expected.columns = _dedupe_columns(list(df.columns))     # 중복 컬럼은 .1, .2 ... 로 읽힘
+        expected = as_read(expected).dropna(how="all").reset_index(drop=True)
+        got = frames[name]
+        if list(got.columns) != list(expected.columns):
+            problems.append(f"{name}: 컬럼 {list(got.columns)} != {list(expected.columns)}")
+            continue
+        if got.shape != expected.shape:
+            problems.append(f"{name}: 크기 {got.shape} != {expected.shape}")
+            continue
+        for j in range(expected.shape[1]):
+            e = expected.iloc[:, j].astype(object).where(expected.iloc[:, j].notna(), None).tolist()
+            g = got.iloc[:, j].astype(object).where(got.iloc[:, j].notna(), None).tolist()
+            if [str(v) for v in e] != [str(v) for v in g]:
+                problems.append(f"{name}.{expected.columns[j]}: {g} != {e}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모든 출력 형식이 같은 시트 / 컬럼으로 다시 읽히는지 점검합니다.")
+    parser.add_argument("formats", nargs="*", help="점검할 형식 (기본: 전부)")
+    args = parser.parse_args()
+
+    failed = []
+    sheets = sample_sheets()
+    print("--- 출력 형식 왕복(쓰기 -> read_sheets) 점검 ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for output_format in args.formats or FORMATS or list(OUTPUT_FORMATS):
+            try:
+                problems = check_round_trip(output_format, sheets, tmp)
+            except ImportError as e:
+                print(f"[건너뜀] {output_format}: {e}")
+                continue
+            except Exception as e:
+                problems = [f"오류 - {e}"]
+            print(f"[{'실패' if problems else '통과'}] {output_format}")
+            for p in problems:
+                print(f"  - {p}")
+            if problems:
+                failed.append(output_format)
+
+    if failed:
+        print(f"\n점검 실패: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n모든 형식이 같은 시트 / 컬럼으로 읽힙니다.")
@@ -0,0 +1,46 @@
+import argparse
+from output_writers import find_outputs
+from results_warehouse import ResultsWarehouse, warehouse_dir
+
+# --- 설정 (필수) ---
+
+# (필수) 채점 결과 파일이 저장되는 출력 폴더. 저장소는 이 폴더의 results_warehouse 에 있습니다.
+#        (grade_exam / grade_class 가 채점할 때마다 자동으로 추가합니다.)
+OUTPUT_DIR = r".\output"
+
+# (선택) --backfill 로 가져올 기존 채점 파일(..._graded) 폴더. None 이면 OUTPUT_DIR
+BACKFILL_DIR = None
+# --------------------
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채점 결과 저장소를 관리합니다. (옵션이 없으면 현황만 출력)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--backfill", action="store_true", help="기존 채점 파일을 저장소로 가져오기 (이미 있는 채점은 건너뜀)")
+    parser.add_argument("--compact", action="store_true", help="날짜 파티션마다 조각 파일을 하나로 합치기")
+    args = parser.parse_args()
+
+    warehouse = ResultsWarehouse(warehouse_dir(args.output_dir))
+    if args.backfill:
+        graded_files = find_outputs(BACKFILL_DIR or args.output_dir, "*_graded")
+        print(f"--- 기존 채점 파일 {len(graded_files)}개 가져오기 ---")
+        n_added, errors = warehouse.ingest_graded_files(graded_files)
+        print(f"추가한 채점 {n_added}건, 읽기 실패 {len(errors)}건")
+        for path, err in errors[:10]:
+            print(f"  - {path}: {err}")
+    if args.compact:
+        print("--- 파티션 합치기 ---")
+        done = warehouse.compact()
+        for date, (n_files, n_rows) in done.items():
+            print(f"{date}: 파일 {n_files}개 -> 1개 ({n_rows}행)")
+        if not done:
+            print("합칠 파티션이 없습니다.")
+
+    stats = warehouse.stats()
+    print(f"\n--- 저장소 현황: {warehouse.root} ---")
+    if stats.empty:
+        print("저장된 채점 결과가 없습니다.")
+    else:
+        print(stats.to_string(index=False))
+        print(f"합계: 파티션 {len(stats)}개, 파일 {stats['files'].sum()}개, 행 {stats['rows'].sum()}개, "
+              f"{stats['bytes'].sum() / 1024:.1f} KB")
@@ -0,0 +1,45 @@
+import os
+import time
+from theta_estimation import score_graded_files
+from output_writers import find_outputs, write_sheets
+
+# --- 설정 (필수) ---
+
+# (필수) 채점 완료된 파일(..._graded.xlsx)들이 모여있는 폴더
+GRADED_RESULTS_DIR = r".\output"
+
+# (필수) 문항 모수(irt_difficulty_b, irt_discrimination_a)가 있는 DB
+DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
+# (필수) 결과 파일. 'latest' 시트는 run_BATCH_EXAM.py 의 학생 명단(ROSTER_PATH)으로 바로 쓸 수 있습니다.
+OUTPUT_PATH = r".\output\theta_scores.xlsx"
+
+MAX_WORKERS = None      # 채점 파일 읽기 프로세스 수 (None: CPU 코어 수)
+# --------------------
+
+if __name__ == "__main__":
+    graded_files = find_outputs(GRADED_RESULTS_DIR, "*_graded")
+
+    if not os.path.exists(DB_PATH):
+        print(f"오류: DB 파일을 찾을 수 없습니다. ({DB_PATH})")
+    elif not graded_files:
+        print(f"오류: '{GRADED_RESULTS_DIR}' 폴더에서 채점된 파일을 찾을 수 없습니다.")
+    else:
+        print(f"--- 채점 파일 {len(graded_files)}개 능력치(theta) 일괄 추정 ---")
+        t0 = time.perf_counter()
+        scores, errors = score_graded_files(graded_files, DB_PATH, max_workers=MAX_WORKERS)
+        elapsed = time.perf_counter() - t0
+        for file, err in errors:
+            print(f"경고: '{file}' 파일 처리 중 오류 발생 (건너뜀): {err}")
+
+        scores["student_id"] = scores["student_id"].astype(str)
+        latest = (scores.dropna(subset=["theta"]).sort_values("submitted_at", kind="stable")
+                  .drop_duplicates(subset=["student_id"], keep="last"))
+        latest = latest[["student_id", "student_name", "theta", "theta_se", "submitted_at", "exam_id"]]
+
+        os.makedirs(os.path.dirname(os.path.abspath(OUTPUT_PATH)), exist_ok=True)
+        write_sheets(OUTPUT_PATH, {"latest": latest, "scores": scores}, "xlsx")
+
+        print(f"시험 {len(scores)}건 / 학생 {len(latest)}명 추정 완료 ({elapsed:.2f}초)")
+        print(f"결과 저장: {OUTPUT_PATH}")
+        print(latest.head().to_string(index=False))
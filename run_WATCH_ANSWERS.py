@@ -0,0 +1,55 @@
+import argparse
+from grading_daemon import AnswerWatcher, POLL_SECONDS, DEBOUNCE_SECONDS
+from output_writers import OUTPUT_FORMATS
+
+# --- 설정 (필수) ---
+
+# (필수) 학생 답안 파일이 들어오는 폴더 (예: S001_20251023_1_answers.xlsx, 엑셀 첫 열에 1~5)
+ANSWERS_DIR = r".\answers"
+
+# (필수) 시험 메타 파일({exam_id}.xlsx)이 있는 폴더 (시험지 생성 시 OUTPUT_DIR)
+EXAM_META_DIR = r".\output"
+
+# (필수) 채점 결과(..._graded.xlsx)를 저장할 폴더
+GRADE_OUTPUT_DIR = r".\output"
+
+# (필수) 취약점 저장소(weakness.sqlite)를 둘 폴더
+WEAKNESS_DB_DIR = r".\output"
+
+# (선택) 문항 DB. 지정하면 채점 결과에 추정 능력치(theta)를 기록합니다. (None: 추정 안 함)
+DB_PATH = r".\data\db_with_irt_from_distractors.xlsx"
+
+# (필수) 처리 기록부. 이미 채점한 답안은 다시 시작해도 다시 채점하지 않습니다.
+JOURNAL_PATH = r".\output\grading_journal.sqlite"
+
+MAX_WORKERS = 2                 # 동시에 채점할 파일 수
+OUTPUT_FORMAT = "xlsx"          # 채점 결과 형식: xlsx / xlsx-stream / csv / parquet / json
+# --------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="답안 폴더를 감시하며 새 답안을 자동으로 채점합니다.")
+    parser.add_argument("--answers-dir", default=ANSWERS_DIR)
+    parser.add_argument("--meta-dir", default=EXAM_META_DIR)
+    parser.add_argument("--output-dir", default=GRADE_OUTPUT_DIR)
+    parser.add_argument("--weakness-dir", default=WEAKNESS_DB_DIR)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--journal", default=JOURNAL_PATH)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default=OUTPUT_FORMAT, help="채점 결과 파일 형식")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="폴더 확인 간격(초)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="파일 크기가 이 시간 동안 그대로여야 처리(초)")
+    parser.add_argument("--once", action="store_true", help="지금 있는 답안만 채점하고 종료")
+    args = parser.parse_args()
+
+    with AnswerWatcher(args.answers_dir, args.meta_dir, args.output_dir, args.journal,
+                       weakness_dir=args.weakness_dir, db_path=args.db or None, max_workers=args.workers,
+                       output_format=args.format,
+                       debounce_seconds=0 if args.once else args.debounce) as watcher:
+        if args.once:
+            print("--- 현재 답안 일괄 채점 ---")
+            results = watcher.drain()
+            n_ok = sum(r["status"] == "ok" for r in results)
+            print(f"--- 완료: 성공 {n_ok} / 처리 {len(results)} ---")
+        else:
+            print("--- 답안 폴더 감시 시작 (종료: Ctrl+C) ---")
+            watcher.run(poll_seconds=args.interval)
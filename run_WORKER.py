@@ -0,0 +1,45 @@
+import argparse
+import multiprocessing as mp
+from job_queue import JobWorker, JOB_HANDLERS, POLL_SECONDS, default_worker_id
+
+# --- 설정 (필수) ---
+
+# (필수) 작업 큐 파일. 화면(app.py)의 JOB_QUEUE_PATH 와 같은 파일이어야 합니다.
+#        다른 PC 에서 워커를 띄울 때는 공유 폴더의 같은 파일과 같은 상대 경로(data/, output/)를 쓰세요.
+JOB_QUEUE_PATH = r".\output\jobs.sqlite"
+
+WORKERS = 2                     # 이 PC 에서 띄울 워커 프로세스 수 (MS Word 엔진 작업은 1~2 권장)
+KINDS = None                    # 처리할 작업 종류 목록 (None: 전부) 예: ["grade", "dashboard"]
+# --------------------
+
+
+def _run_worker(queue_path, kinds, poll_seconds, once):
+    with JobWorker(queue_path, worker_id=default_worker_id(), kinds=kinds) as worker:
+        worker.run(poll_seconds=poll_seconds, once=once)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="작업 큐의 시험지 생성/채점/대시보드 작업을 처리합니다.")
+    parser.add_argument("--queue", default=JOB_QUEUE_PATH)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--kinds", nargs="+", choices=list(JOB_HANDLERS), default=KINDS)
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="대기 작업 확인 간격(초)")
+    parser.add_argument("--once", action="store_true", help="지금 대기 중인 작업만 처리하고 종료")
+    args = parser.parse_args()
+
+    n_workers = max(1, args.workers)
+    print(f"--- 워커 {n_workers}개 시작 (큐: {args.queue}, 종료: Ctrl+C) ---")
+    if n_workers == 1:
+        _run_worker(args.queue, args.kinds, args.interval, args.once)
+    else:
+        procs = [mp.Process(target=_run_worker, args=(args.queue, args.kinds, args.interval, args.once))
+                 for _ in range(n_workers)]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            for p in procs:
+                p.join()
+    print("--- 워커 종료 ---")
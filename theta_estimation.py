@@ -0,0 +1,224 @@
+# 채점된 응답과 DB의 문항 모수로 학생 능력(theta)을 추정하는 모듈입니다. (EAP)
+# - 모형: P = 1 / (1 + exp(-a * (theta - b)))  (irt_model 과 같은 2PL)
+# - 사전분포 N(0, 1) 을 고정 구적 격자(-4 ~ 4)에 올려 사후분포의 평균을 theta, 표준편차를 표준오차로 씁니다.
+#   전부 정답/오답인 학생도 값이 발산하지 않습니다.
+# - 문항별 log P / log(1-P) 를 격자 위에서 미리 계산한 표(ThetaScorer)를 만들어 두고,
+#   응답은 표에서 행을 골라 더하기만 하므로 학생 수천 명을 한 번의 배열 연산으로 채점합니다.
+import os
+import glob
+import logging
+import numpy as np
+import pandas as pd
+
+from item_bank import get_item_bank
+from graded_reader import read_graded_files, SOURCE_COL
+from output_writers import find_outputs
+from irt_model import _quadrature, MISSING
+
+# --- 로깅 설정 ---
+log_theta = logging.getLogger("theta_estimation")
+
+THETA_N_QUAD = 81           # 능력 격자 점 수 (0.1 간격)
+CHUNK_STUDENTS = 20000      # 응답 행렬에서 한 번에 사후분포를 계산하는 행(시험) 수
+CHUNK_RESPONSES = 200000    # 긴 형식 응답에서 한 번에 모으는 응답 수 (약 130MB)
+THETA_COLS = ["theta", "theta_se", "theta_n_items"]
+SCORE_COLUMNS = {"grading": ["problem_id", "answer_num", "is_correct"],
+                 "summary": ["exam_id", "student_id", "student_name", "submitted_at"]}
+
+
+class ThetaScorer:
+    """
+    문항 모수로 만든 (정오답, 문항, 격자점) 로그우도 표를 들고 있는 EAP 계산기입니다.
+    모수가 없거나(NaN) a <= 0 인 문항, 표에 없는 문제id 는 추정에서 제외됩니다.
+    """
+
+    def __init__(self, item_ids, a, b, n_quad: int = THETA_N_QUAD):
+        self.item_ids = [str(i) for i in item_ids]
+        self._index = {pid: j for j, pid in enumerate(self.item_ids)}
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        self.valid = np.isfinite(a) & np.isfinite(b) & (a > 0)
+
+        self.nodes, w = _quadrature(n_quad)
+        self.log_prior = np.log(w)
+        z = np.where(self.valid, a, 0.0)[:, None] * (self.nodes[None, :] - np.where(self.valid, b, 0.0)[:, None])
+        # _table[y, j] = 문항 j 에 y(0=오답, 1=정답)로 응답했을 때의 격자별 로그우도
+        # 마지막 행(j = 문항 수)은 모르는 문항용 0 행입니다.
+        n_items = len(self.item_ids)
+        self._table = np.zeros((2, n_items + 1, len(self.nodes)))
+        self._table[0, :n_items] = np.where(self.valid[:, None], -np.logaddexp(0.0, z), 0.0)
+        self._table[1, :n_items] = np.where(self.valid[:, None], -np.logaddexp(0.0, -z), 0.0)
+        self._counts = np.append(self.valid, False).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def index(self, problem_ids) -> np.ndarray:
+        """문제id -> 표의 열 번호. 모르는 문제는 len(self) (로그우도 0 행)"""
+        unknown = len(self.item_ids)
+        return np.fromiter((self._index.get(str(pid), unknown) for pid in problem_ids), dtype=np.int64)
+
+    def _posterior(self, L: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        L = L + self.log_prior
+        L -= L.max(axis=1, keepdims=True)
+        post = np.exp(L)
+        post /= post.sum(axis=1, keepdims=True)
+        theta = post @ self.nodes
+        var = post @ (self.nodes ** 2) - theta ** 2
+        return theta, np.sqrt(np.maximum(var, 0.0))
+
+    def score_long(self, rows, items, correct, n_rows: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        긴 형식 응답(행 번호, 문항 열 번호, 정답 여부)을 행별로 모아 EAP 를 계산합니다.
+        반환: (theta, theta_se, 추정에 쓰인 문항 수). 쓸 수 있는 응답이 없는 행은 NaN
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        items = np.asarray(items, dtype=np.int64)
+        correct = (np.asarray(correct) == 1).astype(np.int64)
+        theta = np.full(n_rows, np.nan)
+        se = np.full(n_rows, np.nan)
+        n_used = np.bincount(rows, weights=self._counts[items], minlength=n_rows).astype(np.int64)
+        if len(rows) == 0:
+            return theta, se, n_used
+
+        order = np.argsort(rows, kind="stable")
+        rows, items, correct = rows[order], items[order], correct[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        bounds = np.r_[starts, len(rows)]
+        # 응답 수가 CHUNK_RESPONSES 안팎이 되도록 학생 단위로 끊어 (응답 x 격자) 배열 크기를 제한합니다.
+        per_block = max(1, CHUNK_RESPONSES * len(starts) // len(rows))
+        for i in range(0, len(starts), per_block):
+            blk = starts[i:i + per_block]
+            s, e = blk[0], bounds[i + len(blk)]
+            L = np.add.reduceat(self._table[correct[s:e], items[s:e]], blk - s, axis=0)
+            theta[rows[blk]], se[rows[blk]] = self._posterior(L)
+
+        empty = n_used == 0
+        theta[empty], se[empty] = np.nan, np.nan
+        return theta, se, n_used
+
+    def score_matrix(self, matrix, item_ids=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        응답 행렬(1/0/-1, irt_model.ResponseMatrix 와 같은 형식)의 행별 EAP.
+        item_ids 를 주지 않으면 열 순서가 self.item_ids 와 같다고 봅니다.
+        """
+        idx = self.index(item_ids) if item_ids is not None else np.arange(len(self.item_ids))
+        logp, log1mp, used = self._table[1, idx], self._table[0, idx], self._counts[idx]
+        n_rows = matrix.shape[0]
+        theta, se, n_used = np.full(n_rows, np.nan), np.full(n_rows, np.nan), np.zeros(n_rows, dtype=np.int64)
+        for lo in range(0, n_rows, CHUNK_STUDENTS):
+            X = np.asarray(matrix[lo:lo + CHUNK_STUDENTS])
+            Y = (X == 1).astype(np.float64)
+            M = (X != MISSING).astype(np.float64)
+            theta[lo:lo + len(X)], se[lo:lo + len(X)] = self._posterior(Y @ logp + (M - Y) @ log1mp)
+            n_used[lo:lo + len(X)] = M @ used
+        empty = n_used == 0
+        theta[empty], se[empty] = np.nan, np.nan
+        return theta, se, n_used
+
+
+_SCORER_CACHE: dict[str, tuple[object, ThetaScorer]] = {}
+
+
+def get_theta_scorer(db_path: str) -> ThetaScorer:
+    """DB 의 문항 모수로 ThetaScorer 를 만듭니다. DB 파일이 바뀌지 않으면 같은 객체를 재사용합니다."""
+    bank = get_item_bank(db_path)
+    cached = _SCORER_CACHE.get(bank.source)
+    if cached and cached[0] is bank:
+        return cached[1]
+    ids = list(dict.fromkeys(bank.problem_ids))
+    a, b = bank.item_params(ids)
+    scorer = ThetaScorer(ids, a, b)
+    _SCORER_CACHE[bank.source] = (bank, scorer)
+    return scorer
+
+
+def estimate_theta(db_path: str, problem_ids, is_correct) -> dict:
+    """학생 한 명의 응답 벡터로 {theta, theta_se, theta_n_items} 를 계산합니다."""
+    scorer = get_theta_scorer(db_path)
+    items = scorer.index(problem_ids)
+    theta, se, n_used = scorer.score_long(np.zeros(len(items), dtype=np.int64), items, is_correct, 1)
+    if n_used[0] == 0:
+        return {"theta": None, "theta_se": None, "theta_n_items": 0}
+    return {"theta": round(float(theta[0]), 4), "theta_se": round(float(se[0]), 4), "theta_n_items": int(n_used[0])}
+
+
+def score_graded_frames(grading: pd.DataFrame, summary: pd.DataFrame, db_path: str) -> pd.DataFrame:
+    """
+    read_graded_files 로 읽은 grading / summary 시트(source_file 포함)로 시험별 theta 를 계산합니다.
+    정답이 비어 있는 문항은 제외하고, 미응답은 오답으로 봅니다. (grade_exam 채점 기준과 동일)
+    """
+    scorer = get_theta_scorer(db_path)
+    out = summary.drop_duplicates(subset=[SOURCE_COL]).reset_index(drop=True)
+    row_of = pd.Series(np.arange(len(out)), index=out[SOURCE_COL])
+
+    keyed = grading[grading["answer_num"].notna() & (grading["answer_num"].astype(str).str.strip() != "")]
+    keyed = keyed[keyed[SOURCE_COL].isin(row_of.index)]
+    theta, se, n_used = scorer.score_long(
+        row_of[keyed[SOURCE_COL]].to_numpy(), scorer.index(keyed["problem_id"]),
+        pd.to_numeric(keyed["is_correct"], errors="coerce").fillna(0).to_numpy(), len(out)
+    )
+    out["theta"], out["theta_se"], out["theta_n_items"] = np.round(theta, 4), np.round(se, 4), n_used
+    return out
+
+
+def score_graded_files(graded_paths, db_path: str, max_workers: int | None = None) -> tuple[pd.DataFrame, list]:
+    """
+    채점 파일 여러 개의 theta 를 한 번에 계산합니다.
+    반환: (시험별 DataFrame[source_file, exam_id, student_id, student_name, submitted_at, theta, theta_se, theta_n_items],
+           [(파일 경로, 오류 메시지), ...])
+    """
+    frames, errors = read_graded_files(graded_paths, sheets=list(SCORE_COLUMNS), columns=SCORE_COLUMNS,
+                                       max_workers=max_workers)
+    summary = frames["summary"]
+    if summary.empty:
+        return pd.DataFrame(columns=[SOURCE_COL] + SCORE_COLUMNS["summary"] + THETA_COLS), errors
+    return score_graded_frames(frames["grading"], summary, db_path), errors
+
+
+def latest_thetas(graded_paths, db_path: str | None = None, student_ids=None) -> pd.DataFrame:
+    """
+    채점 파일들의 summary 시트에서 학생별 가장 최근(submitted_at) theta 를 찾습니다.
+    theta 가 기록되지 않은 예전 채점 파일은 db_path 가 있으면 다시 계산합니다.
+    반환: student_id 를 인덱스로 하는 DataFrame[student_name, theta, theta_se, submitted_at, source_file]
+    """
+    cols = ["student_id", "student_name", "submitted_at", "theta", "theta_se"]
+    frames, errors = read_graded_files(graded_paths, sheets=["summary"], columns={"summary": cols})
+    for path, err in errors:
+        log_theta.warning(f"채점 파일 읽기 실패 (건너뜀): {path} ({err})")
+    summary = frames["summary"]
+    if summary.empty or "student_id" not in summary.columns:
+        return pd.DataFrame(columns=cols[1:] + [SOURCE_COL]).rename_axis("student_id")
+
+    summary["student_id"] = summary["student_id"].astype(str)
+    if student_ids is not None:
+        summary = summary[summary["student_id"].isin({str(s) for s in student_ids})]
+    for c in ("theta", "theta_se"):
+        summary[c] = pd.to_numeric(summary[c], errors="coerce") if c in summary.columns else np.nan
+
+    missing = summary["theta"].isna()
+    if db_path and missing.any():
+        rescored, _ = score_graded_files(summary.loc[missing, SOURCE_COL].unique(), db_path)
+        fill = rescored.set_index(SOURCE_COL)
+        for c in ("theta", "theta_se"):
+            summary.loc[missing, c] = summary.loc[missing, SOURCE_COL].map(fill[c]).to_numpy()
+
+    summary = summary.dropna(subset=["theta"]).sort_values("submitted_at", kind="stable")
+    latest = summary.drop_duplicates(subset=["student_id"], keep="last").set_index("student_id")
+    return latest[[c for c in cols[1:] if c in latest.columns] + [SOURCE_COL]]
+
+
+def latest_theta(graded_dir: str, student_id: str, db_path: str | None = None) -> tuple[float | None, float | None]:
+    """
+    학생의 가장 최근 채점 결과에서 추정한 (theta, theta_se). 없으면 (None, None)
+    파일 이름이 학생 ID 로 시작하는 채점 파일을 먼저 찾고, 없으면 폴더 전체를 봅니다.
+    """
+    paths = find_outputs(graded_dir, f"{glob.escape(str(student_id))}_*_graded") or find_outputs(graded_dir, "*_graded")
+    if not paths:
+        return None, None
+    latest = latest_thetas(paths, db_path=db_path, student_ids=[student_id])
+    if str(student_id) not in latest.index:
+        return None, None
+    row = latest.loc[str(student_id)]
+    se = row.get("theta_se")
+    return float(row["theta"]), (float(se) if pd.notna(se) else None)
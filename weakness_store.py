@@ -0,0 +1,210 @@
+# 학생별 취약 지문유형 / 취약 문제유형 기록을 누적 보관하는 저장소입니다. (SQLite)
+# - weak_passages : (student_id, exam_id, 지문유형) 별 한 행 (submitted_at, exam_count)
+# - weak_problems : (student_id, exam_id, 문제유형) 별 한 행 (submitted_at)
+# - legacy_imports: 기존 user_weakness_{student_id}.xlsx 를 옮겨 온 학생 목록
+# 시험 한 번의 기록은 한 트랜잭션으로 추가만 하므로(기존 기록을 읽어 다시 쓰지 않음) 기록이 쌓여도 비용이 일정하고,
+# 같은 학생의 채점이 동시에 끝나도 서로의 기록을 덮어쓰지 않습니다.
+# 사람이 볼 엑셀 파일(user_weakness_{student_id}.xlsx)은 export_xlsx 로 필요할 때만 만듭니다.
+import os
+import sqlite3
+import logging
+from datetime import datetime
+import pandas as pd
+
+from file_locks import atomic_path
+
+# --- 로깅 설정 ---
+log_weak = logging.getLogger("weakness_store")
+
+WEAKNESS_DB_NAME = "weakness.sqlite"
+SQLITE_TIMEOUT = 30.0           # 다른 프로세스가 쓰는 중이면 이 시간(초)까지 기다림
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS weak_passages (
+    student_id TEXT NOT NULL,
+    exam_id TEXT NOT NULL,
+    passage_type TEXT NOT NULL,
+    submitted_at TEXT,
+    exam_count INTEGER,
+    PRIMARY KEY (student_id, exam_id, passage_type)
+);
+CREATE TABLE IF NOT EXISTS weak_problems (
+    student_id TEXT NOT NULL,
+    exam_id TEXT NOT NULL,
+    problem_type TEXT NOT NULL,
+    submitted_at TEXT,
+    PRIMARY KEY (student_id, exam_id, problem_type)
+);
+CREATE INDEX IF NOT EXISTS ix_weak_passages_type ON weak_passages (student_id, passage_type);
+CREATE INDEX IF NOT EXISTS ix_weak_problems_type ON weak_problems (student_id, problem_type);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    student_id TEXT PRIMARY KEY,
+    path TEXT,
+    imported_at TEXT
+);
+"""
+
+# 엑셀 보기(기존 user_weakness 파일)의 시트 / 컬럼
+PASSAGE_SHEET_COLS = {"passage_type": "지문유형코드", "exam_id": "exam_id", "submitted_at": "submitted_at",
+                      "exam_count": "exam_count"}
+PROBLEM_SHEET_COLS = {"problem_type": "문제유형코드", "exam_id": "exam_id", "submitted_at": "submitted_at"}
+
+
+def weakness_store_path(weakness_dir: str) -> str:
+    """취약점 폴더 안의 저장소 파일 경로"""
+    return os.path.join(weakness_dir, WEAKNESS_DB_NAME)
+
+
+def legacy_xlsx_path(weakness_dir: str, student_id: str) -> str:
+    return os.path.join(weakness_dir, f"user_weakness_{student_id}.xlsx")
+
+
+class WeaknessStore:
+    """학생별 취약점 누적 저장소"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.weakness_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(self.weakness_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=SQLITE_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")        # 읽기와 쓰기가 서로 막지 않도록
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 기존 엑셀 파일 옮기기 ---
+    def _import_legacy(self, student_id: str) -> None:
+        """학생의 기존 user_weakness_{student_id}.xlsx 가 있으면 처음 한 번만 저장소로 옮깁니다."""
+        if self.conn.execute("SELECT 1 FROM legacy_imports WHERE student_id = ?", (student_id,)).fetchone():
+            return
+        path = legacy_xlsx_path(self.weakness_dir, student_id)
+        passages = problems = pd.DataFrame()
+        if os.path.exists(path):
+            try:
+                sheets = pd.read_excel(path, sheet_name=["weak_passages", "weak_problems"], dtype=object)
+                passages, problems = sheets["weak_passages"], sheets["weak_problems"]
+            except Exception as e:
+                log_weak.warning(f"기존 취약점 파일({path})을 읽지 못해 옮기지 않습니다. (오류: {e})")
+                path = None
+        else:
+            path = None
+
+        with self.conn:
+            if not passages.empty:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO weak_passages VALUES (?, ?, ?, ?, ?)",
+                    [(student_id, str(r.get("exam_id", "")), str(r["지문유형코드"]), _text(r.get("submitted_at")),
+                      _int(r.get("exam_count"))) for r in passages.to_dict("records") if pd.notna(r.get("지문유형코드"))])
+            if not problems.empty:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO weak_problems VALUES (?, ?, ?, ?)",
+                    [(student_id, str(r.get("exam_id", "")), str(r["문제유형코드"]), _text(r.get("submitted_at")))
+                     for r in problems.to_dict("records") if pd.notna(r.get("문제유형코드"))])
+            self.conn.execute("INSERT OR IGNORE INTO legacy_imports VALUES (?, ?, ?)",
+                              (student_id, path, datetime.now().isoformat(timespec="seconds")))
+        if path:
+            log_weak.info(f"기존 취약점 파일을 저장소로 옮김: {path} (지문 {len(passages)}행, 문제 {len(problems)}행)")
+
+    # --- 기록 / 조회 ---
+    def record(
+        self, student_id: str, exam_id: str, submitted_at: str | None, exam_count: int | None,
+        passage_types, problem_types
+    ) -> tuple[int, int]:
+        """시험 한 번의 취약 지문유형 / 문제유형을 추가합니다. 반환: 새로 추가된 (지문 행 수, 문제 행 수)"""
+        student_id, exam_id = str(student_id), str(exam_id)
+        self._import_legacy(student_id)
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO weak_passages VALUES (?, ?, ?, ?, ?)",
+                                  [(student_id, exam_id, str(t), submitted_at, exam_count) for t in passage_types])
+            n_passages = self.conn.total_changes - before
+            self.conn.executemany("INSERT OR IGNORE INTO weak_problems VALUES (?, ?, ?, ?)",
+                                  [(student_id, exam_id, str(t), submitted_at) for t in problem_types])
+            n_problems = self.conn.total_changes - before - n_passages
+        return n_passages, n_problems
+
+    def has_student(self, student_id: str) -> bool:
+        student_id = str(student_id)
+        self._import_legacy(student_id)
+        return bool(self.conn.execute("SELECT 1 FROM weak_passages WHERE student_id = ? UNION ALL "
+                                      "SELECT 1 FROM weak_problems WHERE student_id = ? LIMIT 1",
+                                      (student_id, student_id)).fetchone())
+
+    def weak_sets(self, student_id: str) -> tuple[set, set]:
+        """(취약 지문유형 집합, 취약 문제유형 집합) - 시험지 생성용"""
+        student_id = str(student_id)
+        self._import_legacy(student_id)
+        passages = {r[0] for r in self.conn.execute(
+            "SELECT DISTINCT passage_type FROM weak_passages WHERE student_id = ?", (student_id,))}
+        problems = {r[0] for r in self.conn.execute(
+            "SELECT DISTINCT problem_type FROM weak_problems WHERE student_id = ?", (student_id,))}
+        return passages, problems
+
+    def frames(self, student_id: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """학생의 전체 기록 (weak_passages, weak_problems 시트와 같은 컬럼, 기록 순서)"""
+        student_id = str(student_id)
+        self._import_legacy(student_id)
+        passages = pd.read_sql_query(
+            f"SELECT {', '.join(PASSAGE_SHEET_COLS)} FROM weak_passages WHERE student_id = ? ORDER BY rowid",
+            self.conn, params=(student_id,)).rename(columns=PASSAGE_SHEET_COLS)
+        problems = pd.read_sql_query(
+            f"SELECT {', '.join(PROBLEM_SHEET_COLS)} FROM weak_problems WHERE student_id = ? ORDER BY rowid",
+            self.conn, params=(student_id,)).rename(columns=PROBLEM_SHEET_COLS)
+        return passages, problems
+
+    def students(self) -> list[str]:
+        return [r[0] for r in self.conn.execute(
+            "SELECT student_id FROM weak_passages UNION SELECT student_id FROM weak_problems ORDER BY 1")]
+
+    def export_xlsx(self, student_id: str, output_dir: str | None = None) -> str:
+        """학생의 기록을 user_weakness_{student_id}.xlsx (weak_passages / weak_problems 시트)로 저장합니다."""
+        passages, problems = self.frames(student_id)
+        output_dir = output_dir or self.weakness_dir
+        os.makedirs(output_dir, exist_ok=True)
+        path = legacy_xlsx_path(output_dir, student_id)
+        with atomic_path(path) as tmp_path, pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+            passages.to_excel(writer, index=False, sheet_name="weak_passages")
+            problems.to_excel(writer, index=False, sheet_name="weak_problems")
+        return path
+
+
+def _text(v) -> str | None:
+    return None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v)
+
+
+def _int(v) -> int | None:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_weak_sets(path: str, student_id: str | None = None) -> tuple[set, set]:
+    """
+    (취약 지문유형 집합, 취약 문제유형 집합)을 읽습니다.
+    path 가 저장소(.sqlite)면 student_id 의 기록을, 기존 취약점 엑셀 파일이면 그 파일의 두 시트를 읽습니다.
+    """
+    if path.lower().endswith((".xlsx", ".xls")):
+        sheets = pd.read_excel(path, sheet_name=["weak_passages", "weak_problems"])
+        return set(sheets["weak_passages"]["지문유형코드"]), set(sheets["weak_problems"]["문제유형코드"])
+    if student_id is None:
+        raise ValueError("취약점 저장소에서 읽으려면 student_id 가 필요합니다.")
+    with WeaknessStore(path) as store:
+        return store.weak_sets(student_id)
+
+
+def export_weakness_xlsx(weakness_dir: str, student_id: str, output_dir: str | None = None) -> str | None:
+    """저장소의 학생 기록을 엑셀 파일로 내보냅니다. 저장소가 없으면 None"""
+    db_path = weakness_store_path(weakness_dir)
+    if not os.path.exists(db_path):
+        log_weak.error(f"취약점 저장소를 찾을 수 없습니다: {db_path}")
+        return None
+    with WeaknessStore(db_path) as store:
+        return store.export_xlsx(student_id, output_dir)
@@ -0,0 +1,144 @@
+# MS Word(COM) 로 시험지를 조립하는 엔진입니다. (Windows + MS Word 전용)
+# exam_functions 는 시험지 엔진이 "word" 일 때만 이 모듈을 불러오고, pythoncom / win32com 도
+# Word 를 실제로 띄울 때(start_word) 처음 불러오므로 다른 OS 에서도 나머지 기능은 그대로 동작합니다.
+import os
+import logging
+import traceback
+
+# --- 로깅 설정 ---
+log_word = logging.getLogger("word_com")
+
+
+# ---------- Word 유틸 ----------
+def cm_to_pt(v: float) -> float:
+    return (72.0 / 2.54) * float(v)
+
+def start_word(visible=True):
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+        import win32com.client as win32
+        word = win32.gencache.EnsureDispatch("Word.Application")
+    except Exception:
+        log_word.error("Word Application 로드 실패. win32com 캐시를 정리하거나 Office 설치 복구가 필요할 수 있습니다.")
+        log_word.error(traceback.format_exc())
+        return None, None
+    word.Visible = visible
+    wd = win32.constants
+    word.Options.PasteFormatBetweenDocuments = wd.wdKeepSourceFormatting
+    word.Options.PasteFormatBetweenStyledDocuments = wd.wdKeepSourceFormatting
+    word.Options.PasteAdjustTableFormatting = True
+    return word, wd
+
+def ensure_style(doc, name, wd, font="학교안심 바른바탕 R", size=11, bold=False, align=None, space_after=6):
+    try:
+        s = doc.Styles(name)
+    except Exception:
+        s = doc.Styles.Add(Name=name, Type=wd.wdStyleTypeParagraph)
+    s.Font.Name = font; s.Font.Size = size; s.Font.Bold = bold
+    if align is not None:
+        s.ParagraphFormat.Alignment = align
+    s.ParagraphFormat.SpaceAfter = space_after
+    return s
+
+def end_range(doc, wd):
+    rng = doc.Range()
+    rng.Collapse(wd.wdCollapseEnd)
+    return rng
+
+def insert_paragraph(doc, wd, text, style_name=None):
+    rng = end_range(doc, wd)
+    rng.InsertAfter(text)
+    rng.InsertParagraphAfter()
+    if style_name:
+        doc.Paragraphs.Last.Range.Style = style_name
+
+def insert_docx_with_source_format(doc, wd, path, word_app):
+    if not os.path.exists(path):
+        log_word.warning(f"파일 없음: {path}")
+        return False
+    src = None
+    try:
+        src = word_app.Documents.Open(
+            FileName=os.path.abspath(path), ReadOnly=True,
+            AddToRecentFiles=False, Visible=False
+        )
+        src.Content.Copy()
+        dest = end_range(doc, wd)
+        dest.PasteAndFormat(wd.wdFormatOriginalFormatting)
+        return True
+    except Exception:
+        log_word.error(f"삽입 실패({path}):")
+        log_word.error(traceback.format_exc())
+        return False
+    finally:
+        if src is not None:
+            try: src.Close(False)
+            except Exception: pass
+
+def set_two_columns_current_section(doc, wd, line_between=False, count=2):
+    try:
+        last_para = doc.Paragraphs.Last
+        if last_para.Range.Text.strip() != "":
+            last_para.Range.InsertParagraphAfter()
+        rng_for_break = end_range(doc, wd)
+        rng_for_break.InsertBreak(wd.wdSectionBreakContinuous)
+        sec = doc.Sections.Last
+        sec.PageSetup.TextColumns.SetCount(count)
+        sec.PageSetup.TextColumns.LineBetween = bool(line_between)
+    except Exception:
+        log_word.error("2단 나누기 설정 중 오류 발생:")
+        log_word.error(traceback.format_exc())
+
+# ---------- Word 문서 생성 (안정화) ----------
+def create_exam_docx(tasks, title, subtitle, student_name, two_columns, out_path, word_app=None):
+    # word_app=(word, wd) 를 넘기면 이미 실행 중인 Word 를 재사용하고 종료하지 않습니다. (일괄 생성용)
+    owns_word = word_app is None
+    word, wd = start_word(visible=True) if owns_word else word_app
+    if not word: return None
+    
+    doc = None
+    try:
+        doc = word.Documents.Add()
+        ps = doc.Sections(1).PageSetup
+        ps.TopMargin = cm_to_pt(1.5); ps.BottomMargin = cm_to_pt(1.5)
+        ps.LeftMargin = cm_to_pt(1.5); ps.RightMargin = cm_to_pt(1.5)
+
+        ensure_style(doc, "제목", wd, font="학교안심 바른바탕 B", size=24, bold=True, align=wd.wdAlignParagraphCenter, space_after=12)
+        ensure_style(doc, "소제목", wd, font="학교안심 바른바탕 R", size=16, align=wd.wdAlignParagraphLeft, space_after=6)
+        ensure_style(doc, "문항", wd, font="학교안심 바른바탕 R", size=11, align=wd.wdAlignParagraphLeft, space_after=6)
+
+        insert_paragraph(doc, wd, title, style_name="제목")
+        if subtitle: insert_paragraph(doc, wd, subtitle, style_name="소제목")
+        insert_paragraph(doc, wd, f"학년: ____  반: ____  번호: ____  이름: {student_name}")
+        end_range(doc, wd).InsertParagraphAfter()
+
+        if two_columns:
+            set_two_columns_current_section(doc, wd, line_between=False, count=2)
+
+        passage_number, problem_number_in_passage = 1, 1
+        for tag, path in tasks:
+            if tag.startswith("지문 "):
+                if problem_number_in_passage > 1: passage_number += 1
+                insert_paragraph(doc, wd, f"[{passage_number}]", style_name="문항")
+                insert_docx_with_source_format(doc, wd, path, word_app=word)
+                problem_number_in_passage = 1
+            else:
+                insert_paragraph(doc, wd, f"{passage_number}-{problem_number_in_passage})", style_name="문항")
+                insert_docx_with_source_format(doc, wd, path, word_app=word)
+                problem_number_in_passage += 1
+
+        doc.SaveAs(out_path)
+        log_word.info(f"시험지 생성 완료: {out_path}")
+    except Exception:
+        log_word.error("Word 문서 생성 프로세스에서 예외 발생:")
+        log_word.error(traceback.format_exc())
+        out_path = None
+    finally:
+        if doc:
+            try: doc.Close(False)
+            except Exception: pass
+        if word and owns_word:
+            try: word.Quit()
+            except Exception: pass
+    return out_path